@@ -1,5 +1,9 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.exceptions import RequestValidationError
 from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
@@ -7,12 +11,36 @@ from dotenv import load_dotenv
 # Load .env file FIRST before importing routes
 load_dotenv()
 
-from app.routes import transcription, comparison, tajweed
+from app.routes import transcription, comparison, comparison_sessions, tajweed, recitation, identification
+from app.services.registry import registry
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Load and warm up models in the background at startup so /health answers
+    immediately while /ready stays 503 until the instance can serve traffic.
+    """
+    warm_up_task = None
+    if os.getenv("EAGER_MODEL_LOAD", "true").lower() == "true":
+        warm_up_task = asyncio.create_task(asyncio.to_thread(registry.warm_up))
+    else:
+        registry.mark_ready()
+    yield
+    if warm_up_task is not None and not warm_up_task.done():
+        # The loading thread cannot be interrupted; just stop waiting for it
+        warm_up_task.cancel()
+    registry.shutdown()
 
 app = FastAPI(
     title="Iqra API",
     description="AI Speech-to-Text + Qur'an text comparison service",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add exception handler for validation errors to see what's wrong
@@ -41,10 +69,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress large responses (e.g. whole-page comparisons) for mobile links;
+# brotli when brotli-asgi is installed and accepted, gzip otherwise
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+if BrotliMiddleware is not None:
+    app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MIN_SIZE, gzip_fallback=True)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_SIZE, compresslevel=6)
+
 # Include routers
 app.include_router(transcription.router, prefix="/transcribe_audio", tags=["transcription"])
 app.include_router(comparison.router, prefix="/compare_verse", tags=["comparison"])
+app.include_router(comparison_sessions.router, prefix="/compare_verse/sessions", tags=["comparison"])
 app.include_router(tajweed.router, prefix="/add_tajweed", tags=["tajweed"])
+app.include_router(recitation.router, prefix="/recite", tags=["recitation"])
+app.include_router(identification.router, prefix="/identify_verse", tags=["identification"])
 
 @app.get("/")
 async def root():
@@ -52,15 +91,25 @@ async def root():
 
 @app.get("/health")
 async def health():
+    """Liveness: the process is up, models may still be loading."""
     return {"status": "healthy"}
 
+@app.get("/ready")
+async def ready():
+    """Readiness: models are loaded and warmed up, safe to route traffic here."""
+    return JSONResponse(
+        status_code=200 if registry.ready else 503,
+        content=registry.readiness()
+    )
+
 @app.get("/test-whisper")
 async def test_whisper():
     """Test endpoint to check if Whisper is loaded."""
     from app.routes.transcription import get_transcription_service
-    service = get_transcription_service()
+    service = await get_transcription_service()
     return {
         "use_whisper": service.use_whisper,
+        "engine": service.engine.name if service.engine else None,
         "model_loaded": service.model is not None,
         "whisper_available": hasattr(service, 'model') and service.model is not None,
         "status": "Whisper is loaded and ready!" if (service.use_whisper and service.model is not None) else "Using mock (Whisper not available)"
@@ -72,7 +121,7 @@ async def debug_transcription():
     from app.routes.transcription import get_transcription_service
     import asyncio
     
-    service = get_transcription_service()
+    service = await get_transcription_service()
     
     # Create dummy audio bytes
     dummy_audio = b"fake audio data for testing" * 100
@@ -1,44 +1,211 @@
+import asyncio
+import json
+import os
+from typing import Dict, List, Literal
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel
-from app.services.comparison_service import ComparisonService
+from app.services.registry import registry
+from app.services.compact_format import compact_word_comparisons
+from app.services.quran_corpus import CorpusUnavailableError, VerseReferenceError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 router = APIRouter()
-comparison_service = ComparisonService()
+
+# Largest number of pairs accepted by /compare_verse/batch
+MAX_BATCH_SIZE = int(os.getenv("COMPARISON_BATCH_LIMIT", "1000"))
 
 class ComparisonRequest(BaseModel):
     recognized_text: str
-    verse_text: str
-    verse_reference: str = ""  # Optional: e.g., "2:255"
+    verse_text: str = ""  # Optional when verse_reference is given
+    verse_reference: str = ""  # Optional: e.g., "2:255" or "1:1-7"
+
+class CompareVerseRequest(ComparisonRequest):
+    format: Literal["full", "compact"] = "full"  # "compact": columnar word_comparisons
+
+def json_response(content: Dict) -> Response:
+    """
+    Serialize with orjson when it is installed. Returning a Response also
+    skips FastAPI's jsonable_encoder copy of the result.
+    """
+    if orjson is not None:
+        return Response(orjson.dumps(content), media_type="application/json")
+    return JSONResponse(content)
+
+async def resolve_verse(verse_text: str, verse_reference: str) -> Dict:
+    """
+    Find the verse to compare against: verse_text when given, otherwise the
+    corpus passage for verse_reference.
+    
+    Returns:
+        Dict with 'text', 'reference' and, for corpus passages, the
+        pre-normalized 'tokens' (None when the text came from the client)
+    
+    Raises:
+        HTTPException: 400 if neither resolves, 503 if the corpus is missing
+    """
+    if verse_text and verse_text.strip():
+        return {"text": verse_text, "reference": verse_reference or "", "tokens": None}
+    if not verse_reference:
+        raise HTTPException(status_code=400, detail="verse_text or verse_reference is required")
+    try:
+        corpus = await registry.fetch(registry.corpus)
+        passage = corpus.lookup(verse_reference)
+    except VerseReferenceError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except CorpusUnavailableError as e:
+        raise HTTPException(status_code=503, detail=f"Verse lookup is unavailable: {e}")
+    return {"text": passage["text"], "reference": passage["reference"], "tokens": passage["tokens"]}
+
+def compare_with_verse(recognized_text: str, verse: Dict) -> Dict:
+    """Compare against a resolved verse, reusing corpus tokens when present."""
+    comparison_service = registry.comparison()
+    if verse["tokens"] is None:
+        return comparison_service.compare(recognized_text, verse["text"])
+    return comparison_service.compare_tokens(comparison_service.tokenize(recognized_text), list(verse["tokens"]))
+
+class BatchComparisonRequest(BaseModel):
+    items: List[ComparisonRequest]
+    stream: bool = False  # Return NDJSON, one line per item, as chunks finish
 
 @router.post("")
-async def compare_verse(request: ComparisonRequest):
+async def compare_verse(request: CompareVerseRequest):
     """
     Compares recognized text to a given Qur'an verse and returns match/mismatch data.
+    The verse is either sent as verse_text or looked up from verse_reference.
+    With "format": "compact", word_comparisons is returned as parallel arrays
+    (see compact_format).
     """
     try:
-        if not request.recognized_text or not request.verse_text:
+        if not request.recognized_text:
             raise HTTPException(
                 status_code=400,
-                detail="Both recognized_text and verse_text are required"
+                detail="recognized_text is required"
             )
-        
-        comparison_result = comparison_service.compare(
-            recognized_text=request.recognized_text,
-            verse_text=request.verse_text
-        )
-        
-        return {
+        verse = await resolve_verse(request.verse_text, request.verse_reference)
+
+        # Long passages take a while to align; keep the event loop free
+        comparison_result = await asyncio.to_thread(compare_with_verse, request.recognized_text, verse)
+
+        response = {
             "success": True,
-            "match_percentage": comparison_result["match_percentage"],
-            "word_comparisons": comparison_result["word_comparisons"],
-            "total_words": comparison_result["total_words"],
-            "matched_words": comparison_result["matched_words"],
-            "mismatched_words": comparison_result["mismatched_words"]
+            "verse_reference": verse["reference"],
+            "verse_text": verse["text"],
+            **comparison_result
         }
-    
+        if request.format == "compact":
+            response["format"] = "compact"
+            response["word_comparisons"] = compact_word_comparisons(comparison_result["word_comparisons"])
+        return json_response(response)
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error comparing texts: {str(e)}"
         )
 
+@router.post("/stream")
+async def compare_verse_stream(request: ComparisonRequest):
+    """
+    Compares a long recitation (e.g. a whole surah) with its verse text and
+    streams the result as NDJSON while the alignment advances.
+
+    Each line is a word comparison with "type": "word", in recitation
+    order; extra recognized words appear where they were recited, with
+    "position": null. The last line has "type": "summary" and the same
+    totals as /compare_verse.
+    """
+    if not request.recognized_text:
+        raise HTTPException(status_code=400, detail="recognized_text is required")
+    verse = await resolve_verse(request.verse_text, request.verse_reference)
+
+    comparison_service = await registry.fetch(registry.comparison)
+    recognized_words = comparison_service.tokenize(request.recognized_text)
+    if verse["tokens"] is not None:
+        verse_words = list(verse["tokens"])
+    else:
+        verse_words = comparison_service.tokenize(verse["text"])
+
+    def lines():
+        # A plain generator: Starlette iterates it in a worker thread
+        matched_words = 0
+        for entry in comparison_service.iter_compare_tokens(recognized_words, verse_words):
+            if entry["match"]:
+                matched_words += 1
+            yield json.dumps({"type": "word", **entry}, ensure_ascii=False) + "\n"
+        total_words = len(verse_words)
+        yield json.dumps({
+            "type": "summary",
+            "verse_reference": verse["reference"],
+            "match_percentage": round(matched_words / total_words * 100, 2) if total_words else 0.0,
+            "total_words": total_words,
+            "matched_words": matched_words,
+            "mismatched_words": total_words - matched_words
+        }, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@router.post("/batch")
+async def compare_verse_batch(request: BatchComparisonRequest):
+    """
+    Compares many recognized texts to their verses in one call.
+
+    Work is split into chunks that run on a process pool. Results keep the
+    request order and carry their 'index'; an item that cannot be compared
+    gets "success": false and an 'error' instead of failing the batch.
+    With "stream": true the response is NDJSON, one result per line.
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="At least one item is required")
+    if len(request.items) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {len(request.items)} items; the limit is {MAX_BATCH_SIZE}"
+        )
+
+    comparer = await registry.fetch(registry.batch_comparer)
+    pairs = []
+    references = []
+    errors = {}
+    for index, item in enumerate(request.items):
+        try:
+            verse = await resolve_verse(item.verse_text, item.verse_reference)
+        except HTTPException as e:
+            # Reported on the item itself; the empty verse is never compared
+            errors[index] = e.detail
+            verse = {"text": (), "reference": item.verse_reference, "tokens": None}
+        # Corpus passages are already tokenized; the comparer accepts tokens as a tuple
+        pairs.append((item.recognized_text, verse["tokens"] if verse["tokens"] is not None else verse["text"]))
+        references.append(verse["reference"])
+
+    def finish(result):
+        index = result["index"]
+        if index in errors:
+            result = {"index": index, "success": False, "error": errors[index]}
+        result["verse_reference"] = references[index]
+        return result
+
+    if request.stream:
+        async def lines():
+            async for chunk in comparer.iter_chunks(pairs):
+                yield "".join(json.dumps(finish(result), ensure_ascii=False) + "\n" for result in chunk)
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    try:
+        results = await comparer.compare_many(pairs)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error comparing texts: {str(e)}"
+        )
+    return json_response({
+        "success": True,
+        "count": len(results),
+        "results": [finish(result) for result in results]
+    })
@@ -0,0 +1,88 @@
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from app.services.registry import registry
+from app.services.comparison_sessions import ComparisonSession
+from app.routes.comparison import resolve_verse
+
+router = APIRouter()
+
+class SessionRequest(BaseModel):
+    verse_text: str = ""  # Optional when verse_reference is given
+    verse_reference: str = ""  # Optional: e.g., "2:255" or "1:1-7"
+    recognized_text: str = ""  # Optional: words recognized so far
+
+class SessionWordsRequest(BaseModel):
+    recognized_text: str = ""
+    # Replace recognized words [start:end] instead of appending
+    start: Optional[int] = Field(None, ge=0)
+    end: Optional[int] = Field(None, ge=0)
+
+async def get_session(session_id: str) -> ComparisonSession:
+    sessions = await registry.fetch(registry.comparison_sessions)
+    session = sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail=f"Comparison session '{session_id}' not found or expired")
+    return session
+
+@router.post("")
+async def create_session(request: SessionRequest):
+    """
+    Starts an incremental comparison against a verse, e.g. while a
+    recitation is still being transcribed. Returns the 'session_id' and the
+    full comparison of the words recognized so far.
+    """
+    verse = await resolve_verse(request.verse_text, request.verse_reference)
+    comparison_service = await registry.fetch(registry.comparison)
+    verse_words = list(verse["tokens"]) if verse["tokens"] is not None else comparison_service.tokenize(verse["text"])
+
+    sessions = await registry.fetch(registry.comparison_sessions)
+    session = sessions.create(verse_words, verse["text"], verse["reference"])
+    if request.recognized_text:
+        await asyncio.to_thread(session.append, comparison_service.tokenize(request.recognized_text))
+    return {
+        "success": True,
+        "verse_reference": verse["reference"],
+        "verse_text": verse["text"],
+        **session.result()
+    }
+
+@router.post("/{session_id}/words")
+async def update_session(session_id: str, request: SessionWordsRequest):
+    """
+    Appends recognized words to a session, or replaces recognized words
+    [start:end] (e.g. a re-recorded ayah; end defaults to the last word).
+
+    Only the affected part of the alignment is recomputed. The response is
+    a delta: the 'changed' word comparisons, the current 'extra_words' and
+    the updated totals.
+    """
+    session = await get_session(session_id)
+    comparison_service = await registry.fetch(registry.comparison)
+    words = comparison_service.tokenize(request.recognized_text)
+    if request.start is None:
+        delta = await asyncio.to_thread(session.append, words)
+    else:
+        if request.end is not None and request.end < request.start:
+            raise HTTPException(status_code=400, detail="end must not be before start")
+        delta = await asyncio.to_thread(session.replace, request.start, request.end, words)
+    return {"success": True, **delta}
+
+@router.get("/{session_id}")
+async def session_result(session_id: str):
+    """Returns the full comparison of a session, as /compare_verse would."""
+    session = await get_session(session_id)
+    return {
+        "success": True,
+        "verse_reference": session.reference,
+        "verse_text": session.verse_text,
+        **session.result()
+    }
+
+@router.delete("/{session_id}")
+async def delete_session(session_id: str):
+    sessions = await registry.fetch(registry.comparison_sessions)
+    if not sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail=f"Comparison session '{session_id}' not found or expired")
+    return {"success": True}
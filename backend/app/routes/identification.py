@@ -0,0 +1,52 @@
+import asyncio
+from fastapi import APIRouter, HTTPException
+from pydantic import BaseModel, Field
+from app.services.registry import registry
+from app.services.quran_corpus import CorpusUnavailableError
+
+router = APIRouter()
+
+class IdentificationRequest(BaseModel):
+    recognized_text: str
+    top_k: int = Field(5, ge=1, le=20)
+
+def identify(recognized_text: str, top_k: int) -> dict:
+    """Look up candidate verses, then compare the transcript with each one."""
+    corpus = registry.corpus()
+    comparison_service = registry.comparison()
+    recognized_words = comparison_service.tokenize(recognized_text)
+
+    candidates = registry.verse_index().search(recognized_text, top_k=top_k)
+    best = None
+    for candidate in candidates:
+        passage = corpus.lookup(candidate["reference"])
+        comparison = comparison_service.compare_tokens(recognized_words, list(passage["tokens"]))
+        candidate["match_percentage"] = comparison["match_percentage"]
+        if best is None or (comparison["match_percentage"], candidate["score"]) > (best[0]["match_percentage"], best[0]["score"]):
+            best = (candidate, comparison)
+
+    return {
+        "success": True,
+        "candidates": candidates,
+        "best": {**best[0], "comparison": best[1]} if best else None
+    }
+
+@router.post("")
+async def identify_verse(request: IdentificationRequest):
+    """
+    Identifies which ayah (or range of ayat) was recited from the transcript alone.
+
+    Returns the top_k candidates from the n-gram index with their index score
+    and match percentage, plus the full comparison for the best match.
+    """
+    if not request.recognized_text or not request.recognized_text.strip():
+        raise HTTPException(status_code=400, detail="recognized_text is required")
+    try:
+        return await asyncio.to_thread(identify, request.recognized_text, request.top_k)
+    except CorpusUnavailableError as e:
+        raise HTTPException(status_code=503, detail=f"Verse identification is unavailable: {e}")
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error identifying verse: {str(e)}"
+        )
@@ -0,0 +1,126 @@
+import asyncio
+import time
+from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi.responses import JSONResponse
+from app.services.registry import registry
+from app.services.inference_pool import InferenceQueueFullError, InferenceTimeoutError
+from app.routes.comparison import resolve_verse, compare_with_verse
+
+router = APIRouter()
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+async def _timed(fn, *args):
+    """
+    Run a stage, returning (result, milliseconds). Coroutine functions are
+    awaited; blocking functions run in a worker thread.
+    """
+    started = time.perf_counter()
+    if asyncio.iscoroutinefunction(fn):
+        result = await fn(*args)
+    else:
+        result = await asyncio.to_thread(fn, *args)
+    return result, _elapsed_ms(started)
+
+@router.post("")
+async def recite(
+    audio_file: UploadFile = File(...),
+    verse_text: Optional[str] = Form(None),
+    verse_reference: Optional[str] = Form(None),
+    decoding_mode: Optional[str] = Form(None),
+):
+    """
+    Transcribe a recitation and check it against a verse in one request.
+    The verse is sent as verse_text or looked up from verse_reference.
+
+    Replaces calling /transcribe_audio and then /compare_verse. Once the
+    transcription is available, comparison and tajweed run concurrently.
+    The response carries the same fields as both endpoints plus per-stage
+    timings in milliseconds.
+    """
+    started = time.perf_counter()
+    try:
+        verse = await resolve_verse(verse_text, verse_reference)
+
+        audio_bytes = await audio_file.read()
+        if len(audio_bytes) == 0:
+            raise HTTPException(
+                status_code=400,
+                detail="Audio file is empty. Please record again."
+            )
+        if len(audio_bytes) < 100:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Audio file too small ({len(audio_bytes)} bytes). Please record again."
+            )
+        print(f"[API] Recitation request: {audio_file.filename}, {len(audio_bytes)} bytes, reference={verse_reference or '-'}")
+
+        transcription_service = await registry.fetch(registry.transcription)
+        transcribe_started = time.perf_counter()
+        try:
+            # Tajweed is applied below, alongside the comparison
+            transcription = await transcription_service.transcribe(
+                audio_bytes, audio_file.filename, decoding_mode=decoding_mode, postprocess=False
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        timings = {"transcribe_ms": _elapsed_ms(transcribe_started)}
+        recognized_text = transcription.get("text", "")
+
+        stages = [_timed(compare_with_verse, recognized_text, verse)]
+        if transcription_service.add_tajweed and recognized_text:
+            stages.append(_timed(transcription_service.postprocess, recognized_text))
+        results = await asyncio.gather(*stages)
+
+        comparison, timings["compare_ms"] = results[0]
+        response_data = {
+            "success": True,
+            "text": recognized_text,
+            "confidence": transcription.get("confidence", 0.0),
+        }
+        if len(results) > 1:
+            postprocessed, timings["tajweed_ms"] = results[1]
+            response_data.update(postprocessed)
+
+        if "decoding" in transcription:
+            response_data["decoding"] = transcription["decoding"]
+        if "vad" in transcription:
+            response_data["audio_removed_seconds"] = transcription["vad"]["removed_seconds"]
+            response_data["speech_detected"] = transcription["vad"]["speech"]
+
+        response_data["verse_reference"] = verse["reference"]
+        response_data["verse_text"] = verse["text"]
+        response_data["comparison"] = comparison
+        timings["total_ms"] = _elapsed_ms(started)
+        response_data["timings"] = timings
+
+        return JSONResponse(
+            content=response_data,
+            headers={"X-Cache": "HIT" if transcription.get("cached") else "MISS"}
+        )
+
+    except HTTPException:
+        raise
+    except InferenceQueueFullError as e:
+        print(f"[API] Rejecting recitation request: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Transcription service is busy. Please try again shortly.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except InferenceTimeoutError as e:
+        print(f"[API] Recitation transcription timed out: {e}")
+        raise HTTPException(
+            status_code=504,
+            detail="Transcription took too long. Please try a shorter recording."
+        )
+    except Exception as e:
+        print(f"[API] ERROR: {type(e).__name__}: {str(e)}")
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error processing recitation: {str(e)}"
+        )
@@ -1,13 +1,26 @@
+import asyncio
+import os
+from typing import List
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from app.services.tajweed_service import TajweedService
+from app.services.registry import registry
+from app.services.quran_corpus import VerseReferenceError
 
 router = APIRouter()
-tajweed_service = TajweedService()
+
+# Largest number of texts accepted by /add_tajweed/batch
+MAX_BATCH_SIZE = int(os.getenv("TAJWEED_BATCH_LIMIT", "500"))
 
 class TajweedRequest(BaseModel):
     text: str
 
+class TajweedBatchRequest(BaseModel):
+    texts: List[str]
+
+class TajweedRulesRequest(BaseModel):
+    text: str = ""  # Diacritized text, e.g. the output of /add_tajweed
+    verse_reference: str = ""  # Or a corpus passage: e.g., "2:255" or "1:1-7"
+
 @router.post("")
 async def add_tajweed(request: TajweedRequest):
     """
@@ -20,7 +33,8 @@ async def add_tajweed(request: TajweedRequest):
                 detail="Text is required"
             )
         
-        text_with_tajweed = tajweed_service.add_tajweed(request.text)
+        tajweed_pool = await registry.fetch(registry.tajweed_pool)
+        text_with_tajweed = await tajweed_pool.add_tajweed(request.text)
         
         return {
             "success": True,
@@ -28,9 +42,76 @@ async def add_tajweed(request: TajweedRequest):
             "original_text": request.text
         }
     
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
             detail=f"Error adding tajweed: {str(e)}"
         )
 
+@router.post("/batch")
+async def add_tajweed_batch(request: TajweedBatchRequest):
+    """
+    Add tajweed to many texts in one call.
+
+    Texts that differ only in diacritics are diacritized once, and Mishkal
+    runs are spread over the tajweed worker processes. Results keep the
+    request order and carry their 'index'; a text that cannot be
+    diacritized gets "success": false and an 'error' instead of failing
+    the batch.
+    """
+    if not request.texts:
+        raise HTTPException(status_code=400, detail="At least one text is required")
+    if len(request.texts) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch has {len(request.texts)} texts; the limit is {MAX_BATCH_SIZE}"
+        )
+
+    tajweed_pool = await registry.fetch(registry.tajweed_pool)
+    results = await tajweed_pool.add_tajweed_many(request.texts)
+    return {
+        "success": True,
+        "count": len(results),
+        "results": results
+    }
+
+def annotate_rules(text: str, verse_reference: str) -> dict:
+    """Rule spans for text or a corpus passage; may build the span index on first use."""
+    service = registry.tajweed_rules()
+    if not text:
+        if service.corpus is None:
+            raise HTTPException(
+                status_code=503,
+                detail="Qur'an corpus is not available; send the diacritized text instead"
+            )
+        try:
+            return service.annotate_reference(verse_reference)
+        except VerseReferenceError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    return service.annotate(text)
+
+@router.post("/rules")
+async def tajweed_rules(request: TajweedRulesRequest):
+    """
+    Where tajweed rules apply (idgham, ikhfa, iqlab, qalqala, madd lengths,
+    ghunna), as character spans into the returned 'text'.
+
+    Corpus passages and text made of whole ayat are served from the
+    precomputed span index; other text is annotated on demand.
+    """
+    if not request.text.strip() and not request.verse_reference:
+        raise HTTPException(status_code=400, detail="text or verse_reference is required")
+    text = request.text if request.text.strip() else ""
+    # Building the span index and annotating long text are CPU-bound; keep the event loop free
+    return await asyncio.to_thread(annotate_rules, text, request.verse_reference)
+
+@router.get("/stats")
+async def tajweed_stats():
+    """
+    Requests answered by each diacritization tier (corpus, sentence cache,
+    word cache, Mishkal, fallback) and their hit rates.
+    """
+    tajweed_service = await registry.fetch(registry.tajweed)
+    return tajweed_service.stats()
@@ -1,31 +1,29 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+import asyncio
+import json
+from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, WebSocket, WebSocketDisconnect
 from fastapi.responses import JSONResponse
 from dotenv import load_dotenv
-from app.services.transcription_service import TranscriptionService
+from app.services.registry import registry
+from app.services.inference_pool import InferenceQueueFullError, InferenceTimeoutError
+from app.services.stream_segmenter import StreamSegmenter
 
 # Ensure .env is loaded
 load_dotenv()
 
 router = APIRouter()
 
-# Lazy initialization - create service on first use to ensure .env is loaded
-_transcription_service = None
-
-def get_transcription_service():
-    """Get transcription service instance, creating it if needed."""
-    global _transcription_service
-    if _transcription_service is None:
-        # Ensure .env is loaded before creating service
-        load_dotenv()
-        _transcription_service = TranscriptionService()
-        print(f"[Route] TranscriptionService created: use_whisper={_transcription_service.use_whisper}, model={_transcription_service.model is not None}")
-    return _transcription_service
+async def get_transcription_service():
+    """Get the shared transcription service (created by the registry on first use)."""
+    return await registry.fetch(registry.transcription)
 
 @router.post("")
-async def transcribe_audio(audio_file: UploadFile = File(...)):
+async def transcribe_audio(audio_file: UploadFile = File(...), decoding_mode: Optional[str] = Form(None)):
     """
     Accepts an audio file and returns transcribed text.
-    Currently uses a mock implementation, can be replaced with Whisper.
+    decoding_mode picks "fast" (greedy), "adaptive" (greedy, beam search only
+    when quality is poor) or "accurate" (beam search); the server default
+    comes from WHISPER_DECODING_MODE.
     """
     try:
         print(f"[API] ========================================")
@@ -62,8 +60,13 @@ async def transcribe_audio(audio_file: UploadFile = File(...)):
         
         # Transcribe using service (lazy initialization)
         print(f"[API] Calling transcription service...")
-        transcription_service = get_transcription_service()
-        transcription_result = await transcription_service.transcribe(audio_bytes, audio_file.filename)
+        transcription_service = await get_transcription_service()
+        try:
+            transcription_result = await transcription_service.transcribe(
+                audio_bytes, audio_file.filename, decoding_mode=decoding_mode
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         print(f"[API] Transcription completed: {transcription_result.get('text', '')[:50]}...")
         
         response_data = {
@@ -76,11 +79,35 @@ async def transcribe_audio(audio_file: UploadFile = File(...)):
         if "original_text" in transcription_result:
             response_data["original_text"] = transcription_result["original_text"]
         
-        return JSONResponse(content=response_data)
+        if "decoding" in transcription_result:
+            response_data["decoding"] = transcription_result["decoding"]
+        
+        # Report how much silence was trimmed before inference
+        if "vad" in transcription_result:
+            response_data["audio_removed_seconds"] = transcription_result["vad"]["removed_seconds"]
+            response_data["speech_detected"] = transcription_result["vad"]["speech"]
+        
+        return JSONResponse(
+            content=response_data,
+            headers={"X-Cache": "HIT" if transcription_result.get("cached") else "MISS"}
+        )
     
     except HTTPException:
         # Re-raise HTTP exceptions as-is
         raise
+    except InferenceQueueFullError as e:
+        print(f"[API] Rejecting request: {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="Transcription service is busy. Please try again shortly.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
+    except InferenceTimeoutError as e:
+        print(f"[API] Transcription timed out: {e}")
+        raise HTTPException(
+            status_code=504,
+            detail="Transcription took too long. Please try a shorter recording."
+        )
     except Exception as e:
         print(f"[API] ERROR: {type(e).__name__}: {str(e)}")
         import traceback
@@ -90,3 +117,92 @@ async def transcribe_audio(audio_file: UploadFile = File(...)):
             detail=f"Error transcribing audio: {str(e)}"
         )
 
+
+@router.get("/stats")
+async def transcription_stats():
+    """
+    Returns inference pool queue depth, wait times, job, batching, cache and
+    decoding-mode counters, plus the ASR engine's latency and memory report.
+    """
+    transcription_service = await get_transcription_service()
+    return {
+        "engine": transcription_service.engine.report() if transcription_service.engine else None,
+        "inference_pool": transcription_service.inference_pool.stats(),
+        "batching": transcription_service.batcher.stats(),
+        "cache": transcription_service.cache.stats(),
+        "decoding": transcription_service.decoding_stats()
+    }
+
+@router.websocket("/stream")
+async def transcribe_stream(websocket: WebSocket):
+    """
+    Streaming transcription over a WebSocket.
+
+    The client sends binary frames of 16 kHz mono 16-bit little-endian PCM
+    while the user recites, then a text frame {"type": "end"}. The stream is
+    cut at pauses and each utterance is transcribed in the background:
+    - {"type": "partial", "segment": i, "start": s, "text": ...} per utterance
+    - {"type": "final", "text": ..., "original_text": ..., "segments": [...]}
+      once all utterances are done, post-processed like /transcribe_audio
+    """
+    await websocket.accept()
+    transcription_service = await get_transcription_service()
+    try:
+        segmenter = StreamSegmenter()
+    except RuntimeError as e:
+        await websocket.send_json({"type": "error", "detail": str(e)})
+        await websocket.close(code=1011)
+        return
+
+    send_lock = asyncio.Lock()
+    tasks = []
+
+    async def send(message):
+        async with send_lock:
+            await websocket.send_json(message)
+
+    async def transcribe_segment(index, start, audio):
+        try:
+            result = await transcription_service.transcribe_segment(audio)
+        except InferenceQueueFullError as e:
+            await send({"type": "error", "segment": index, "detail": "Transcription service is busy", "retry_after": e.retry_after})
+            return ""
+        except Exception as e:
+            print(f"[API] Stream segment {index} failed: {type(e).__name__}: {e}")
+            await send({"type": "error", "segment": index, "detail": f"Error transcribing segment: {str(e)}"})
+            return ""
+        await send({"type": "partial", "segment": index, "start": round(start, 2), "text": result["text"]})
+        return result["text"]
+
+    def schedule(segments):
+        for start, audio in segments:
+            print(f"[API] Stream segment {len(tasks)}: {len(audio) / segmenter.sample_rate:.2f}s at {start:.2f}s")
+            tasks.append(asyncio.ensure_future(transcribe_segment(len(tasks), start, audio)))
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            if message.get("bytes"):
+                schedule(segmenter.feed(message["bytes"]))
+            elif message.get("text"):
+                try:
+                    control = json.loads(message["text"])
+                except ValueError:
+                    control = {}
+                if control.get("type") == "end":
+                    break
+
+        schedule(segmenter.flush())
+        texts = await asyncio.gather(*tasks)
+
+        # Stitched transcript goes through the same post-processing as uploads
+        stitched = " ".join(text for text in texts if text)
+        final = await transcription_service.postprocess(stitched)
+        await send({"type": "final", "segments": list(texts), **final})
+        await websocket.close()
+    except WebSocketDisconnect:
+        print(f"[API] Stream client disconnected")
+        for task in tasks:
+            task.cancel()
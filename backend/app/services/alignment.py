@@ -0,0 +1,187 @@
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Edit operations, from the point of view of the reference (verse) text
+MATCH = "match"
+SUBSTITUTION = "substitution"
+INSERTION = "insertion"    # extra recognized word
+DELETION = "deletion"      # verse word that was not recited
+
+# (operation, verse index, recognized index, similarity)
+AlignmentStep = Tuple[str, Optional[int], Optional[int], float]
+
+_INF = float("inf")
+_DIAGONAL, _UP, _LEFT = 0, 1, 2
+
+
+def align_words(reference: List[str], hypothesis: List[str],
+                similarity: Callable[[str, str], float],
+                threshold: float, band: int = 10) -> List[AlignmentStep]:
+    """
+    Align two word sequences with a banded Needleman-Wunsch DP.
+
+    Gaps cost 1. Pairing two words costs 0 for identical words, 1 - similarity
+    when the similarity reaches threshold (a fuzzy match) and 1 otherwise
+    (a substitution). Only cells within band + |len(reference) -
+    len(hypothesis)| of the diagonal are filled, so the cost is
+    O(n * band) instead of O(n * m).
+
+    Args:
+        reference: Verse words
+        hypothesis: Recognized words
+        similarity: Scores a (verse word, recognized word) pair in [0, 1]
+        threshold: Minimum similarity for a pair to count as a match
+        band: How far the alignment may drift from the diagonal beyond
+            the length difference
+
+    Returns:
+        Alignment steps in order; every verse and recognized index appears
+        exactly once
+    """
+    n, m = len(reference), len(hypothesis)
+    width = max(0, band) + abs(n - m)
+
+    def pair(i: int, j: int) -> Tuple[float, float]:
+        verse_word, recognized_word = reference[i], hypothesis[j]
+        if verse_word == recognized_word:
+            return 0.0, 1.0
+        score = similarity(verse_word, recognized_word)
+        return (1.0 - score if score >= threshold else 1.0), score
+
+    # Row i covers columns lo[i]..lo[i] + len(cost[i]) - 1
+    lo = [max(0, i - width) for i in range(n + 1)]
+    cost: List[List[float]] = []
+    back: List[bytearray] = []
+    scores: List[List[float]] = []
+
+    for i in range(n + 1):
+        start, stop = lo[i], min(m, i + width)
+        row = [_INF] * (stop - start + 1)
+        moves = bytearray(len(row))
+        row_scores = [0.0] * len(row)
+        prev = cost[i - 1] if i else None
+        prev_lo = lo[i - 1] if i else 0
+
+        for j in range(start, stop + 1):
+            k = j - start
+            if i == 0:
+                row[k] = float(j)
+                moves[k] = _LEFT
+                continue
+
+            best, move = _INF, _DIAGONAL
+            if j > 0 and 0 <= j - 1 - prev_lo < len(prev):
+                pair_cost, score = pair(i - 1, j - 1)
+                best = prev[j - 1 - prev_lo] + pair_cost
+                row_scores[k] = score
+            if 0 <= j - prev_lo < len(prev) and prev[j - prev_lo] + 1.0 < best:
+                best, move = prev[j - prev_lo] + 1.0, _UP
+            if k > 0 and row[k - 1] + 1.0 < best:
+                best, move = row[k - 1] + 1.0, _LEFT
+            row[k] = best
+            moves[k] = move
+
+        cost.append(row)
+        back.append(moves)
+        scores.append(row_scores)
+
+    steps: List[AlignmentStep] = []
+    i, j = n, m
+    while i > 0 or j > 0:
+        k = j - lo[i]
+        move = back[i][k] if i > 0 else _LEFT
+        if move == _DIAGONAL:
+            score = scores[i][k]
+            operation = MATCH if score >= threshold else SUBSTITUTION
+            steps.append((operation, i - 1, j - 1, score))
+            i, j = i - 1, j - 1
+        elif move == _UP:
+            steps.append((DELETION, i - 1, None, 0.0))
+            i -= 1
+        else:
+            steps.append((INSERTION, None, j - 1, 0.0))
+            j -= 1
+
+    steps.reverse()
+    return steps
+
+
+def _find_anchor(reference: List[str], hypothesis: List[str], i: int, j: int,
+                 size: int, lookahead: int) -> Optional[Tuple[int, int]]:
+    """
+    Find the earliest run of `size` identical words that occurs exactly once
+    in both lookahead windows, or None.
+    """
+    def positions(words: List[str], start: int) -> Dict[Tuple[str, ...], List[int]]:
+        grams: Dict[Tuple[str, ...], List[int]] = {}
+        stop = min(len(words), start + lookahead)
+        for p in range(start, stop - size + 1):
+            grams.setdefault(tuple(words[p:p + size]), []).append(p)
+        return grams
+
+    hypothesis_grams = positions(hypothesis, j)
+    if not hypothesis_grams:
+        return None
+    for gram, reference_positions in positions(reference, i).items():
+        # dicts keep insertion order, so grams come in reference order
+        hypothesis_positions = hypothesis_grams.get(gram)
+        if len(reference_positions) == 1 and hypothesis_positions is not None and len(hypothesis_positions) == 1:
+            return reference_positions[0], hypothesis_positions[0]
+    return None
+
+
+def align_stream(reference: List[str], hypothesis: List[str],
+                 similarity: Callable[[str, str], float], threshold: float,
+                 band: int = 10, anchor_size: int = 3,
+                 lookahead: int = 256) -> Iterator[AlignmentStep]:
+    """
+    Align long passages incrementally, yielding steps in order.
+
+    Identical words are consumed directly. At the first difference the
+    next anchor is searched for: a run of anchor_size identical words that
+    is unique within the next `lookahead` words of both texts. Only the gap
+    up to the anchor is aligned with align_words, after which the texts are
+    back in sync, so skipped or repeated phrases of up to `lookahead` words
+    do not shift the rest of the alignment. Without an anchor, a lookahead
+    window is aligned and its first half committed.
+
+    Work is linear in the passage length (each DP covers at most
+    lookahead x lookahead words) and memory is bounded by the lookahead.
+    """
+    n, m = len(reference), len(hypothesis)
+    i = j = 0
+
+    def aligned(ref_end: int, hyp_end: int) -> List[AlignmentStep]:
+        steps = align_words(reference[i:ref_end], hypothesis[j:hyp_end], similarity, threshold, band)
+        return [
+            (operation,
+             verse_index + i if verse_index is not None else None,
+             recognized_index + j if recognized_index is not None else None,
+             score)
+            for operation, verse_index, recognized_index, score in steps
+        ]
+
+    while i < n or j < m:
+        if i < n and j < m and reference[i] == hypothesis[j]:
+            yield (MATCH, i, j, 1.0)
+            i += 1
+            j += 1
+            continue
+
+        ref_end, hyp_end = min(n, i + lookahead), min(m, j + lookahead)
+        anchor = _find_anchor(reference, hypothesis, i, j, anchor_size, lookahead)
+        if anchor is not None:
+            steps = aligned(*anchor)
+        elif ref_end == n and hyp_end == m:
+            steps = aligned(n, m)
+        else:
+            # Commit only the first half: its alignment cannot depend much
+            # on words beyond the window
+            steps = aligned(ref_end, hyp_end)
+            steps = steps[:max(1, len(steps) // 2)]
+
+        for step in steps:
+            yield step
+            if step[1] is not None:
+                i = step[1] + 1
+            if step[2] is not None:
+                j = step[2] + 1
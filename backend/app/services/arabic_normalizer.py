@@ -0,0 +1,87 @@
+from typing import Dict, Iterable, List
+
+# Normalization levels, each including the previous one:
+#   diacritics - drop harakat, tanween, shadda, sukun, superscript alef,
+#                Qur'anic annotation marks and tatweel; letters are untouched
+#                (tajweed needs the real spelling)
+#   standard   - also unify alef forms (أ إ آ ٱ → ا), alef maksura (ى → ي)
+#                and ta marbuta (ة → ه), which ASR output mixes freely
+#   search     - also fold hamza carriers (ؤ → و, ئ → ي) and drop lone hamza,
+#                for fuzzy lookup where spelling varies most
+LEVELS = ("diacritics", "standard", "search")
+
+# Harakat, tanween, shadda, sukun and Qur'anic marks (U+064B-U+065F),
+# superscript alef (U+0670), honorific/annotation signs (U+0610-U+061A),
+# small high/low Qur'anic letters, pause and hizb marks (U+06D6-U+06ED)
+# and the extended Qur'anic marks used by some mushaf encodings
+_MARKS = (
+    [chr(code) for code in range(0x0610, 0x061B)]
+    + [chr(code) for code in range(0x064B, 0x0660)]
+    + ["\u0670"]
+    + [chr(code) for code in range(0x06D6, 0x06EE)]
+    + [chr(code) for code in range(0x08D3, 0x0900) if code != 0x08E2]
+)
+# Note the superscript (dagger) alef is dropped, so Uthmani ٱلْكِتَٰبُ becomes
+# الكتب while الرَّحْمَٰنِ becomes الرحمن, as in the simple script
+_TATWEEL = "ـ"
+
+_STANDARD = {
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا", "ٲ": "ا", "ٳ": "ا",
+    "ى": "ي",
+    "ة": "ه",
+}
+_SEARCH = {
+    "ؤ": "و",
+    "ئ": "ي",
+    "ء": None,
+}
+
+
+def _build_tables() -> Dict[str, Dict[int, object]]:
+    removed = {char: None for char in _MARKS + [_TATWEEL]}
+    diacritics = str.maketrans(removed)
+    standard = str.maketrans({**removed, **_STANDARD})
+    search = str.maketrans({**removed, **_STANDARD, **_SEARCH})
+    return {"diacritics": diacritics, "standard": standard, "search": search}
+
+
+_TABLES = _build_tables()
+
+# Joins batch items; never produced by the tables and not whitespace
+_SEPARATOR = "\x00"
+
+
+def normalize(text: str, level: str = "standard") -> str:
+    """
+    Normalize Arabic text with one str.translate pass plus whitespace cleanup.
+
+    Args:
+        text: Text to normalize
+        level: "diacritics", "standard" or "search"
+
+    Returns:
+        Normalized text with runs of whitespace collapsed to single spaces
+    """
+    table = _TABLES.get(level)
+    if table is None:
+        raise ValueError(f"Unknown normalization level '{level}'. Choose one of: {', '.join(LEVELS)}")
+    return " ".join(text.translate(table).split())
+
+
+def normalize_batch(texts: Iterable[str], level: str = "standard") -> List[str]:
+    """
+    Normalize many strings at once.
+
+    The strings are translated as one joined string, which avoids the
+    per-call overhead of str.translate for short texts such as words.
+    """
+    texts = list(texts)
+    table = _TABLES.get(level)
+    if table is None:
+        raise ValueError(f"Unknown normalization level '{level}'. Choose one of: {', '.join(LEVELS)}")
+    if not texts:
+        return []
+    joined = _SEPARATOR.join(texts)
+    if joined.count(_SEPARATOR) != max(0, len(texts) - 1):
+        return [normalize(text, level) for text in texts]
+    return [" ".join(part.split()) for part in joined.translate(table).split(_SEPARATOR)]
@@ -0,0 +1,391 @@
+import hashlib
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+# resource is POSIX-only; peak memory is simply not reported elsewhere
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class EngineUnavailableError(Exception):
+    """Raised when an ASR engine's runtime is not installed."""
+
+
+def _memory_mb() -> Dict:
+    """Current and peak resident memory of this process, in MB."""
+    current = None
+    try:
+        with open("/proc/self/statm") as statm:
+            current = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        pass
+    peak = None
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is bytes on macOS, kilobytes elsewhere
+        peak = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return {
+        "rss": round(current, 1) if current is not None else None,
+        "peak": round(peak, 1) if peak is not None else None,
+    }
+
+
+class ASREngine:
+    """
+    Base class for speech recognition engines.
+
+    Subclasses implement _load, _transcribe and optionally _transcribe_batch.
+    The public methods time every call so all engines report latency and
+    memory in the same format (see report()).
+
+    Options passed to transcribe use openai-whisper's transcribe() keywords;
+    engines translate the ones they support.
+    """
+
+    name = "base"
+    # Whether a loaded engine can be inherited by forked server workers
+    # (see preload_engine); engines that start native threads at load cannot
+    fork_safe = True
+
+    def __init__(self, model_name: str = "small"):
+        self.model_name = model_name
+        self.model = None
+        self.load_seconds = 0.0
+        self.load_memory_mb = 0.0
+        self._latencies: List[float] = []
+        self._audio_seconds = 0.0
+
+    def load(self) -> None:
+        """Load model weights, recording load time and memory growth."""
+        before = _memory_mb()["rss"] or 0.0
+        started = time.perf_counter()
+        self._load()
+        self.load_seconds = time.perf_counter() - started
+        self.load_memory_mb = (_memory_mb()["rss"] or 0.0) - before
+        print(f"[ASR] Engine '{self.name}' loaded model '{self.model_name}' in {self.load_seconds:.2f}s")
+
+    def set_threads(self, count: int) -> None:
+        """Limit the intra-op threads inference may use in this process."""
+
+    def transcribe(self, audio, options: Dict) -> Dict:
+        """
+        Transcribe one 16 kHz float32 recording.
+
+        Returns:
+            Dict with at least 'text'
+        """
+        started = time.perf_counter()
+        result = self._transcribe(audio, options)
+        self._record(started, len(audio))
+        return result
+
+    def transcribe_batch(self, audios: List, options: Dict) -> List:
+        """
+        Transcribe several recordings in one call.
+
+        Returns:
+            One result dict (or Exception) per recording, in order
+        """
+        started = time.perf_counter()
+        results = self._transcribe_batch(audios, options)
+        self._record(started, sum(len(audio) for audio in audios))
+        return results
+
+    def report(self) -> Dict:
+        """Latency and memory figures in the same format for every engine."""
+        latencies = sorted(self._latencies)
+        count = len(latencies)
+        processing = sum(latencies)
+
+        def percentile(fraction):
+            return round(latencies[min(count - 1, int(fraction * count))] * 1000, 1) if count else 0.0
+
+        return {
+            "engine": self.name,
+            "model": self.model_name,
+            "load_seconds": round(self.load_seconds, 3),
+            "memory_mb": {**_memory_mb(), "load_delta": round(self.load_memory_mb, 1)},
+            "latency_ms": {
+                "count": count,
+                "avg": round(processing / count * 1000, 1) if count else 0.0,
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "max": round(latencies[-1] * 1000, 1) if count else 0.0,
+            },
+            "audio_seconds": round(self._audio_seconds, 2),
+            "real_time_factor": round(processing / self._audio_seconds, 4) if self._audio_seconds else 0.0,
+        }
+
+    def _record(self, started: float, samples: int) -> None:
+        self._latencies.append(time.perf_counter() - started)
+        # Keep the sample window bounded on long-running servers
+        if len(self._latencies) > 1000:
+            del self._latencies[:500]
+        self._audio_seconds += samples / 16000
+
+    def _load(self) -> None:
+        raise NotImplementedError
+
+    def _transcribe(self, audio, options: Dict) -> Dict:
+        raise NotImplementedError
+
+    def _transcribe_batch(self, audios: List, options: Dict) -> List:
+        results = []
+        for audio in audios:
+            try:
+                results.append(self._transcribe(audio, options))
+            except Exception as e:
+                results.append(e)
+        return results
+
+
+class WhisperEngine(ASREngine):
+    """Reference openai-whisper (PyTorch) engine."""
+
+    name = "whisper"
+
+    def _load(self) -> None:
+        try:
+            import whisper
+        except ImportError:
+            raise EngineUnavailableError("openai-whisper is not installed")
+        self._whisper = whisper
+
+        try:
+            self.model = whisper.load_model(self.model_name)
+        except Exception as load_error:
+            print(f"[ASR] ❌ ERROR loading model '{self.model_name}': {load_error}")
+            print(f"[ASR] Trying 'small' model as fallback...")
+            try:
+                self.model = whisper.load_model("small")
+                self.model_name = "small"
+            except Exception as fallback_error:
+                print(f"[ASR] ❌ Fallback also failed: {fallback_error}")
+                raise load_error
+
+    def set_threads(self, count: int) -> None:
+        import torch
+        torch.set_num_threads(count)
+
+    def _transcribe(self, audio, options: Dict) -> Dict:
+        return self.model.transcribe(audio, **options)
+
+    def _transcribe_batch(self, audios: List, options: Dict) -> List:
+        """
+        Decode several recordings with a single encoder/decoder pass.
+
+        Each clip is padded to Whisper's 30 s window and stacked into one
+        log-mel batch. Clips longer than the window are transcribed on their
+        own with model.transcribe.
+        """
+        import torch
+        whisper = self._whisper
+
+        results: List = [None] * len(audios)
+        mels = []
+        batch_indices = []
+        n_mels = getattr(self.model.dims, "n_mels", 80)
+
+        for i, audio in enumerate(audios):
+            try:
+                if len(audio) > whisper.audio.N_SAMPLES:
+                    results[i] = self._transcribe(audio, options)
+                    continue
+                mels.append(whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=n_mels))
+                batch_indices.append(i)
+            except Exception as e:
+                results[i] = e
+
+        if mels:
+            print(f"[ASR] Decoding batch of {len(mels)} recording(s)")
+            decoding_options = whisper.DecodingOptions(
+                language=options.get("language"),
+                task=options.get("task", "transcribe"),
+                fp16=options.get("fp16", False),
+                temperature=options.get("temperature", 0.0),
+                beam_size=options.get("beam_size"),
+                prompt=options.get("initial_prompt"),
+                without_timestamps=True,
+            )
+            decoded = whisper.decode(self.model, torch.stack(mels).to(self.model.device), decoding_options)
+            for i, item in zip(batch_indices, decoded):
+                # Same silence rule model.transcribe applies to a segment
+                is_silence = item.no_speech_prob > 0.6 and item.avg_logprob < -1.0
+                results[i] = {
+                    "text": "" if is_silence else item.text,
+                    "language": item.language,
+                    "avg_logprob": item.avg_logprob,
+                    "compression_ratio": item.compression_ratio,
+                    "no_speech_prob": item.no_speech_prob,
+                }
+
+        return results
+
+
+class QuantizedWhisperEngine(WhisperEngine):
+    """
+    openai-whisper with its Linear layers dynamically quantized to int8.
+
+    Attention and MLP projections (most of the CPU time) run as int8 GEMMs;
+    convolutions and the token embedding stay float32.
+    """
+
+    name = "whisper-int8"
+
+    def _load(self) -> None:
+        super()._load()
+        import torch
+
+        # Whisper wraps nn.Linear in a subclass that quantize_dynamic skips,
+        # so swap in plain nn.Linear modules carrying the same weights first
+        for module in list(self.model.modules()):
+            for child_name, child in list(module.named_children()):
+                if isinstance(child, torch.nn.Linear) and type(child) is not torch.nn.Linear:
+                    plain = torch.nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+                    plain.load_state_dict(child.state_dict())
+                    setattr(module, child_name, plain)
+
+        self.model = torch.quantization.quantize_dynamic(
+            self.model.cpu().float(), {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+    def _transcribe(self, audio, options: Dict) -> Dict:
+        # Quantized kernels are CPU/float32 only
+        return self.model.transcribe(audio, **{**options, "fp16": False})
+
+
+class FasterWhisperEngine(ASREngine):
+    """CTranslate2 runtime (faster-whisper) with int8 weights on CPU."""
+
+    name = "faster-whisper"
+    # CTranslate2 starts its worker threads when the model is created, and
+    # threads do not survive fork; the thread count is fixed at load time
+    fork_safe = False
+
+    def _load(self) -> None:
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise EngineUnavailableError("faster-whisper is not installed")
+        self.model = WhisperModel(
+            self.model_name,
+            device="cpu",
+            compute_type=os.getenv("ASR_COMPUTE_TYPE", "int8"),
+            cpu_threads=int(os.getenv("ASR_CPU_THREADS", "0")),
+        )
+
+    def _transcribe(self, audio, options: Dict) -> Dict:
+        segments, info = self.model.transcribe(
+            audio,
+            language=options.get("language"),
+            task=options.get("task", "transcribe"),
+            temperature=options.get("temperature", 0.0),
+            beam_size=options.get("beam_size") or 1,
+            best_of=options.get("best_of") or 1,
+            condition_on_previous_text=options.get("condition_on_previous_text", True),
+            initial_prompt=options.get("initial_prompt"),
+        )
+        segments = list(segments)
+        return {
+            "text": "".join(segment.text for segment in segments),
+            "language": info.language,
+            "language_probability": info.language_probability,
+            "segments": [
+                {
+                    "text": segment.text,
+                    "avg_logprob": segment.avg_logprob,
+                    "compression_ratio": segment.compression_ratio,
+                    "no_speech_prob": segment.no_speech_prob,
+                }
+                for segment in segments
+            ],
+        }
+
+
+class FakeEngine(ASREngine):
+    """
+    Deterministic engine for tests and load testing without a model.
+    Returns FAKE_ASR_TEXT (or a fixed verse) for any non-empty audio.
+    """
+
+    name = "fake"
+
+    def _load(self) -> None:
+        self.model = self
+        self.text = os.getenv("FAKE_ASR_TEXT", "بسم الله الرحمن الرحيم")
+
+    def _transcribe(self, audio, options: Dict) -> Dict:
+        return {
+            "text": self.text if len(audio) else "",
+            "language": options.get("language", "ar"),
+            "audio_sha1": hashlib.sha1(audio.tobytes()).hexdigest(),
+        }
+
+
+ENGINES = {
+    WhisperEngine.name: WhisperEngine,
+    QuantizedWhisperEngine.name: QuantizedWhisperEngine,
+    FasterWhisperEngine.name: FasterWhisperEngine,
+    FakeEngine.name: FakeEngine,
+}
+
+
+def create_engine(name: Optional[str] = None, model_name: Optional[str] = None) -> ASREngine:
+    """
+    Create (but do not load) the engine selected by name or ASR_ENGINE.
+
+    Raises:
+        ValueError: for an unknown engine name
+    """
+    name = name or os.getenv("ASR_ENGINE", "whisper")
+    model_name = model_name or os.getenv("WHISPER_MODEL", "small")
+    if name not in ENGINES:
+        raise ValueError(f"Unknown ASR engine '{name}'. Choose one of: {', '.join(sorted(ENGINES))}")
+    return ENGINES[name](model_name)
+
+
+# Engines loaded in the server's master process before it forks its
+# workers, keyed by (engine name, model name)
+_preloaded: Dict[Tuple[str, str], ASREngine] = {}
+
+
+def preload_engine(name: Optional[str] = None, model_name: Optional[str] = None) -> Optional[ASREngine]:
+    """
+    Load an engine for forked server workers to inherit: they share its
+    weights copy-on-write instead of each loading a copy (see server_mode).
+
+    Returns:
+        The loaded engine, or None when the engine is not fork_safe and
+        each worker has to load its own
+    """
+    engine = create_engine(name, model_name)
+    if not engine.fork_safe:
+        print(f"[ASR] Engine '{engine.name}' cannot be shared across fork; each worker loads its own")
+        return None
+    key = (engine.name, engine.model_name)
+    # Load single-threaded: a thread pool started here would not exist in the workers
+    engine.set_threads(1)
+    engine.load()
+    _preloaded[key] = engine
+    return engine
+
+
+def load_engine(engine: ASREngine) -> ASREngine:
+    """
+    Load engine, or return the matching engine preloaded before fork.
+    ASR_CPU_THREADS, when set, limits its intra-op threads in this process.
+    """
+    preloaded = _preloaded.get((engine.name, engine.model_name))
+    if preloaded is not None:
+        print(f"[ASR] Using engine '{engine.name}' preloaded before fork")
+        engine = preloaded
+    else:
+        engine.load()
+    threads = int(os.getenv("ASR_CPU_THREADS", "0"))
+    if threads > 0:
+        engine.set_threads(threads)
+    return engine
@@ -0,0 +1,167 @@
+import io
+import os
+import subprocess
+import tempfile
+import wave
+from typing import Optional
+
+# numpy ships with Whisper; keep it optional so mock mode works without it
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+# Whisper expects 16 kHz mono float32 audio
+SAMPLE_RATE = 16000
+
+
+class AudioDecodeError(Exception):
+    """Raised when uploaded audio cannot be decoded."""
+
+
+def detect_audio_format(audio_bytes: bytes, filename: Optional[str] = None) -> str:
+    """
+    Guess the container format from the filename, falling back to magic bytes.
+
+    Returns:
+        One of "wav", "m4a" or "mp3" (defaults to "wav")
+    """
+    file_ext = "wav"
+    if filename:
+        if filename.endswith('.m4a'):
+            file_ext = "m4a"
+        elif filename.endswith('.mp3'):
+            file_ext = "mp3"
+        elif filename.endswith('.wav'):
+            file_ext = "wav"
+
+    # If no extension, try to detect from content
+    if not filename or '.' not in filename:
+        # Check for common audio file signatures
+        if audio_bytes[:4] == b'ftyp' or (len(audio_bytes) > 4 and audio_bytes[4:8] == b'ftyp'):
+            file_ext = "m4a"  # MP4/M4A container
+            print(f"[AudioDecoder] Detected M4A format from content")
+        elif audio_bytes[:4] == b'RIFF':
+            file_ext = "wav"
+            print(f"[AudioDecoder] Detected WAV format from content")
+        elif audio_bytes[:3] == b'ID3' or (len(audio_bytes) > 1 and audio_bytes[:2] == b'\xff\xfb'):
+            file_ext = "mp3"
+            print(f"[AudioDecoder] Detected MP3 format from content")
+
+    return file_ext
+
+
+def decode_audio(audio_bytes: bytes, format_hint: str = "wav", sample_rate: int = SAMPLE_RATE):
+    """
+    Decode uploaded audio bytes into a mono float32 array at sample_rate.
+
+    16-bit/8-bit/32-bit PCM WAV already at the target rate is decoded natively.
+    Everything else is piped through ffmpeg without touching the disk; MP4/M4A
+    needs a seekable input (the moov atom is often at the end), so on Linux it
+    is handed to ffmpeg through an anonymous in-memory file instead of stdin.
+
+    Args:
+        audio_bytes: Uploaded file content
+        format_hint: Container guess from detect_audio_format
+        sample_rate: Output sample rate
+
+    Returns:
+        numpy float32 array with samples in [-1.0, 1.0]
+    """
+    if not NUMPY_AVAILABLE:
+        raise AudioDecodeError("numpy is required to decode audio")
+
+    if audio_bytes[:4] == b'RIFF':
+        audio = _decode_pcm_wav(audio_bytes, sample_rate)
+        if audio is not None:
+            return audio
+
+    if format_hint == "m4a":
+        if hasattr(os, "memfd_create"):
+            return _decode_with_ffmpeg_memfd(audio_bytes, sample_rate)
+        return _decode_with_ffmpeg_tempfile(audio_bytes, sample_rate, ".m4a")
+
+    return _run_ffmpeg("pipe:0", sample_rate, input_bytes=audio_bytes)
+
+
+def _decode_pcm_wav(audio_bytes: bytes, sample_rate: int):
+    """Decode plain PCM WAV at the target rate, or return None to use ffmpeg."""
+    try:
+        with wave.open(io.BytesIO(audio_bytes), "rb") as wav:
+            channels = wav.getnchannels()
+            width = wav.getsampwidth()
+            rate = wav.getframerate()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None
+
+    # Resampling is left to ffmpeg, which filters properly before decimating
+    if rate != sample_rate:
+        return None
+
+    if width == 2:
+        audio = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768.0
+    elif width == 1:
+        audio = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width == 4:
+        audio = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648.0
+    else:
+        return None
+
+    if channels > 1:
+        usable = len(audio) - len(audio) % channels
+        audio = audio[:usable].reshape(-1, channels).mean(axis=1)
+
+    return audio.astype(np.float32, copy=False)
+
+
+def _run_ffmpeg(input_path: str, sample_rate: int, input_bytes: bytes = None, pass_fds=()):
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+    if input_bytes is None:
+        cmd.append("-nostdin")
+    cmd += [
+        "-threads", "0",
+        "-i", input_path,
+        "-f", "s16le",
+        "-ac", "1",
+        "-acodec", "pcm_s16le",
+        "-ar", str(sample_rate),
+        "pipe:1",
+    ]
+    try:
+        process = subprocess.run(
+            cmd,
+            input=input_bytes,
+            capture_output=True,
+            check=True,
+            pass_fds=pass_fds,
+        )
+    except FileNotFoundError:
+        raise AudioDecodeError("ffmpeg is not installed")
+    except subprocess.CalledProcessError as e:
+        raise AudioDecodeError(f"ffmpeg failed to decode audio: {e.stderr.decode(errors='replace').strip()}")
+
+    return np.frombuffer(process.stdout, dtype="<i2").astype(np.float32) / 32768.0
+
+
+def _decode_with_ffmpeg_memfd(audio_bytes: bytes, sample_rate: int):
+    fd = os.memfd_create("iqra-upload")
+    try:
+        view = memoryview(audio_bytes)
+        while view:
+            view = view[os.write(fd, view):]
+        os.lseek(fd, 0, os.SEEK_SET)
+        return _run_ffmpeg(f"/dev/fd/{fd}", sample_rate, pass_fds=(fd,))
+    finally:
+        os.close(fd)
+
+
+def _decode_with_ffmpeg_tempfile(audio_bytes: bytes, sample_rate: int, suffix: str):
+    # Platforms without memfd: the directory is removed even if ffmpeg fails
+    with tempfile.TemporaryDirectory(prefix="iqra-") as tmp_dir:
+        tmp_path = os.path.join(tmp_dir, f"upload{suffix}")
+        with open(tmp_path, "wb") as tmp_file:
+            tmp_file.write(audio_bytes)
+        return _run_ffmpeg(tmp_path, sample_rate)
@@ -0,0 +1,143 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from app.services.comparison_service import ComparisonService
+
+# ComparisonService attributes copied from the parent service to the workers,
+# so batch results equal /compare_verse for the same input
+SETTINGS = (
+    "similarity_threshold",
+    "alignment_band",
+    "long_passage_words",
+    "stream_lookahead",
+    "char_diff",
+    "normalization_level",
+)
+
+# One ComparisonService per worker process, created on first use
+_worker_service: Optional[ComparisonService] = None
+
+
+def _compare_chunk(verses: Dict[int, List[str]], items: List[Tuple[int, str, int]],
+                   settings: Dict) -> List[Dict]:
+    """
+    Compare one chunk of a batch. Runs in a worker process (or a thread for
+    small batches), so everything it needs is passed in picklable form.
+
+    Args:
+        verses: Tokenized verses used by this chunk, keyed by verse id
+        items: (batch index, recognized text, verse id) per comparison
+        settings: Values of SETTINGS on the parent ComparisonService
+    """
+    global _worker_service
+    if _worker_service is None:
+        _worker_service = ComparisonService()
+    service = _worker_service
+    for name, value in settings.items():
+        setattr(service, name, value)
+
+    results = []
+    for index, recognized_text, verse_id in items:
+        try:
+            if not verses[verse_id]:
+                raise ValueError("verse_text is required")
+            result = service.compare_tokens(service.tokenize(recognized_text), verses[verse_id])
+            results.append({"index": index, "success": True, **result})
+        except Exception as e:
+            results.append({"index": index, "success": False, "error": str(e)})
+    return results
+
+
+class BatchComparer:
+    """
+    Compares many (recognized text, verse text) pairs off the event loop.
+
+    Each distinct verse in a batch is normalized and tokenized once. Pairs are
+    split into chunks of chunk_size that run on a process pool, so large
+    rescoring jobs use every core without blocking other requests. Batches
+    that fit in one chunk run in a thread instead, avoiding the pickling
+    round trip.
+    """
+
+    def __init__(self, comparison_service: ComparisonService,
+                 max_workers: Optional[int] = None, chunk_size: int = 64):
+        self.comparison_service = comparison_service
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = max(1, chunk_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that already runs threads (the event
+            # loop, the inference pool) can copy held locks into the child
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+            print(f"[BatchComparer] Started process pool with {self.max_workers} worker(s)")
+        return self._executor
+
+    def _chunks(self, pairs: List[Tuple[str, str]]) -> List[Tuple[Dict, List]]:
+        """Tokenize distinct verses once and cut the batch into chunks."""
+        verse_ids: Dict[str, int] = {}
+        verse_tokens: List[List[str]] = []
+        items = []
+        for index, (recognized_text, verse_text) in enumerate(pairs):
+            verse_id = verse_ids.get(verse_text)
+            if verse_id is None:
+                verse_id = verse_ids[verse_text] = len(verse_tokens)
+                if isinstance(verse_text, tuple):
+                    verse_tokens.append(list(verse_text))
+                else:
+                    verse_tokens.append(self.comparison_service.tokenize(verse_text))
+            items.append((index, recognized_text, verse_id))
+
+        chunks = []
+        for start in range(0, len(items), self.chunk_size):
+            chunk_items = items[start:start + self.chunk_size]
+            # Only ship the verses this chunk refers to
+            verses = {verse_id: verse_tokens[verse_id] for _, _, verse_id in chunk_items}
+            chunks.append((verses, chunk_items))
+        return chunks
+
+    async def iter_chunks(self, pairs: List[Tuple[str, str]]) -> AsyncIterator[List[Dict]]:
+        """
+        Compare pairs, yielding result chunks in batch order as they finish.
+        Every result carries its 'index' in the batch. A verse may be given
+        as text or as a tuple of already normalized words.
+        """
+        chunks = self._chunks(pairs)
+        settings = {name: getattr(self.comparison_service, name) for name in SETTINGS}
+
+        if len(chunks) <= 1:
+            for verses, items in chunks:
+                yield await asyncio.to_thread(_compare_chunk, verses, items, settings)
+            return
+
+        loop = asyncio.get_running_loop()
+        pool = self._pool()
+        futures = [
+            loop.run_in_executor(pool, _compare_chunk, verses, items, settings)
+            for verses, items in chunks
+        ]
+        try:
+            for future in futures:
+                yield await future
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def compare_many(self, pairs: List[Tuple[str, str]]) -> List[Dict]:
+        """Compare pairs and return one result per pair, in order."""
+        results = []
+        async for chunk in self.iter_chunks(pairs):
+            results.extend(chunk)
+        return results
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
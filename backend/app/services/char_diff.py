@@ -0,0 +1,116 @@
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+SUBSTITUTE = "substitute"
+INSERT = "insert"        # extra recognized letter
+DELETE = "delete"        # verse letter that was not recited
+
+# (operation, verse position, recognized position, expected letter, found letter)
+CharEdit = Tuple[str, int, int, Optional[str], Optional[str]]
+
+# Misread words recur much like word pairs do in the similarity cache
+CHAR_DIFF_CACHE_SIZE = 16384
+
+
+def _columns(reference: str, hypothesis: str) -> Tuple[List[int], List[int]]:
+    """
+    Vertical delta vectors of the edit-distance matrix, one pair per column.
+
+    Bit-parallel (Myers 1999, in Hyyrö's global edit distance form): bit i
+    of positive[j] / negative[j] is set when D[i + 1][j] - D[i][j] is +1 /
+    -1, so a whole column of len(reference) cells is computed with a
+    handful of integer operations. Python ints have no width limit, so any
+    word length works.
+    """
+    n = len(reference)
+    mask = (1 << n) - 1
+    peq: Dict[str, int] = {}
+    for i, char in enumerate(reference):
+        peq[char] = peq.get(char, 0) | (1 << i)
+
+    # Column 0 is D[i][0] = i: every vertical delta is +1
+    pv, mv = mask, 0
+    positive, negative = [pv], [mv]
+    for char in hypothesis:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        # Row 0 is D[0][j] = j, so the horizontal delta entering the column is +1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+        positive.append(pv)
+        negative.append(mv)
+    return positive, negative
+
+
+def edit_distance(reference: str, hypothesis: str) -> int:
+    """Levenshtein distance between two words."""
+    if not reference:
+        return len(hypothesis)
+    positive, negative = _columns(reference, hypothesis)
+    return len(hypothesis) + positive[-1].bit_count() - negative[-1].bit_count()
+
+
+@lru_cache(maxsize=CHAR_DIFF_CACHE_SIZE)
+def char_edits(reference: str, hypothesis: str) -> Tuple[CharEdit, ...]:
+    """
+    Minimal letter edits turning reference (the verse word) into hypothesis
+    (the recognized word).
+
+    The distance matrix is never materialized: D[i][j] is recovered from the
+    column delta vectors by popcount while tracing back, so the whole diff
+    costs O(len(reference) + len(hypothesis)) big-int operations. Results
+    are cached since the same misreadings recur across requests.
+
+    Returns:
+        Edits in order. Positions index the verse and recognized word;
+        an insertion's verse position is the letter it comes before.
+    """
+    positive, negative = _columns(reference, hypothesis)
+
+    def distance(i: int, j: int) -> int:
+        below = (1 << i) - 1
+        return j + (positive[j] & below).bit_count() - (negative[j] & below).bit_count()
+
+    edits: List[CharEdit] = []
+    i, j = len(reference), len(hypothesis)
+    current = distance(i, j)
+    while i > 0 or j > 0:
+        if i > 0 and j > 0:
+            same = reference[i - 1] == hypothesis[j - 1]
+            diagonal = distance(i - 1, j - 1)
+            if diagonal + (0 if same else 1) == current:
+                if not same:
+                    edits.append((SUBSTITUTE, i - 1, j - 1, reference[i - 1], hypothesis[j - 1]))
+                i, j, current = i - 1, j - 1, diagonal
+                continue
+        if i > 0 and distance(i - 1, j) + 1 == current:
+            edits.append((DELETE, i - 1, j, reference[i - 1], None))
+            i, current = i - 1, current - 1
+        else:
+            edits.append((INSERT, i, j - 1, None, hypothesis[j - 1]))
+            j, current = j - 1, current - 1
+
+    edits.reverse()
+    return tuple(edits)
+
+
+def char_diff(reference: str, hypothesis: str) -> List[Dict]:
+    """
+    char_edits as JSON-ready dicts with 'op', 'position' (in the verse
+    word), 'recognized_position', 'expected' and 'found'.
+    """
+    return [
+        {
+            "op": operation,
+            "position": position,
+            "recognized_position": recognized_position,
+            "expected": expected,
+            "found": found,
+        }
+        for operation, position, recognized_position, expected, found in char_edits(reference, hypothesis)
+    ]
@@ -0,0 +1,66 @@
+from typing import Dict, List
+
+# One letter per alignment operation in the compact format
+OPERATION_CODES = {"match": "m", "substitution": "s", "deletion": "d", "insertion": "i"}
+
+
+def compact_word_comparisons(word_comparisons: List[Dict]) -> Dict:
+    """
+    Columnar form of a word_comparisons list, for large payloads.
+
+    Instead of one dict per word repeating every key, each field is a
+    parallel array indexed by position (so position itself is dropped).
+    'match' is a string of '1'/'0' flags and 'operation' a string of
+    one-letter codes (m, s, d, i), which compress well. 'char_diff' only
+    lists words that have letter edits, keyed by position, each edit as
+    [op, position, recognized_position, expected, found].
+    """
+    verse, recognized, similarity, recognized_index = [], [], [], []
+    match, operation = [], []
+    char_diff = {}
+    for position, entry in enumerate(word_comparisons):
+        verse.append(entry["verse"])
+        recognized.append(entry["recognized"])
+        similarity.append(entry["similarity"])
+        recognized_index.append(entry["recognized_index"])
+        match.append("1" if entry["match"] else "0")
+        operation.append(OPERATION_CODES[entry["operation"]])
+        edits = entry.get("char_diff")
+        if edits:
+            char_diff[str(position)] = [
+                [edit["op"], edit["position"], edit["recognized_position"], edit["expected"], edit["found"]]
+                for edit in edits
+            ]
+    return {
+        "count": len(word_comparisons),
+        "verse": verse,
+        "recognized": recognized,
+        "similarity": similarity,
+        "recognized_index": recognized_index,
+        "match": "".join(match),
+        "operation": "".join(operation),
+        "char_diff": char_diff,
+    }
+
+
+def expand_word_comparisons(compact: Dict) -> List[Dict]:
+    """Inverse of compact_word_comparisons."""
+    operations = {code: name for name, code in OPERATION_CODES.items()}
+    entries = []
+    for position in range(compact["count"]):
+        entry = {
+            "position": position,
+            "recognized": compact["recognized"][position],
+            "verse": compact["verse"][position],
+            "match": compact["match"][position] == "1",
+            "similarity": compact["similarity"][position],
+            "operation": operations[compact["operation"][position]],
+            "recognized_index": compact["recognized_index"][position],
+        }
+        edits = compact["char_diff"].get(str(position))
+        entry["char_diff"] = [
+            {"op": op, "position": at, "recognized_position": recognized_at, "expected": expected, "found": found}
+            for op, at, recognized_at, expected, found in edits or []
+        ]
+        entries.append(entry)
+    return entries
@@ -1,18 +1,121 @@
-from typing import Dict, List
-import re
+from typing import Dict, Iterator, List, Optional
+import os
 from difflib import SequenceMatcher
+from functools import lru_cache
+from app.services.alignment import align_stream, align_words, AlignmentStep, MATCH, SUBSTITUTION
+from app.services.arabic_normalizer import normalize
+from app.services.char_diff import char_diff
+
+# Qur'an vocabulary is finite, so word pairs repeat across requests and users
+SIMILARITY_CACHE_SIZE = int(os.getenv("SIMILARITY_CACHE_SIZE", "65536"))
+
+
+def word_similarity(word1: str, word2: str) -> float:
+    """
+    Calculate similarity between two words (0.0 to 1.0).
+    Uses multiple methods for better accuracy.
+    """
+    if not word1 or not word2:
+        return 0.0
+    
+    # Exact match
+    if word1 == word2:
+        return 1.0
+    
+    # Normalize for comparison (remove extra spaces)
+    word1 = word1.strip()
+    word2 = word2.strip()
+    
+    # Use SequenceMatcher for similarity
+    similarity = SequenceMatcher(None, word1, word2).ratio()
+    
+    # Boost similarity if words are similar length
+    length_ratio = min(len(word1), len(word2)) / max(len(word1), len(word2)) if max(len(word1), len(word2)) > 0 else 0
+    similarity = (similarity * 0.7) + (length_ratio * 0.3)
+    
+    # Check for common prefixes/suffixes
+    if word1.startswith(word2[:min(3, len(word2))]) or word2.startswith(word1[:min(3, len(word1))]):
+        similarity = max(similarity, 0.6)
+    
+    return similarity
+
+
+@lru_cache(maxsize=SIMILARITY_CACHE_SIZE)
+def thresholded_similarity(word1: str, word2: str, threshold: float) -> float:
+    """
+    word_similarity for callers that only need to know whether a pair
+    reaches threshold.
+    
+    Pairs that provably cannot reach it are rejected from cheap upper bounds
+    (length ratio, then SequenceMatcher's quick ratios) before the full
+    score is computed. Results are cached per (word1, word2, threshold).
+    
+    Returns:
+        The exact similarity when it is >= threshold, otherwise some
+        value below threshold
+    """
+    word1 = word1.strip()
+    word2 = word2.strip()
+    if not word1 or not word2:
+        return 0.0
+    if word1 == word2:
+        return 1.0
+    
+    shorter, longer = sorted((len(word1), len(word2)))
+    length_ratio = shorter / longer
+    prefix_floor = 0.6 if (word1.startswith(word2[:3]) or word2.startswith(word1[:3])) else 0.0
+    if prefix_floor >= threshold:
+        return word_similarity(word1, word2)
+    
+    # ratio() <= quick_ratio() <= real_quick_ratio() = 2 * shorter / total
+    bound = 0.7 * (2.0 * shorter / (shorter + longer)) + 0.3 * length_ratio
+    if bound < threshold:
+        return max(bound, prefix_floor)
+    
+    matcher = SequenceMatcher(None, word1, word2)
+    bound = 0.7 * matcher.quick_ratio() + 0.3 * length_ratio
+    if bound < threshold:
+        return max(bound, prefix_floor)
+    
+    return max(0.7 * matcher.ratio() + 0.3 * length_ratio, prefix_floor)
+
+
+def similarity_cache_stats() -> Dict:
+    """Hit/miss counters of the shared similarity cache."""
+    info = thresholded_similarity.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        "entries": info.currsize,
+        "max_entries": info.maxsize,
+        "hits": info.hits,
+        "misses": info.misses,
+        "hit_rate": round(info.hits / lookups, 4) if lookups else 0.0,
+    }
+
 
 class ComparisonService:
     """
     Service for comparing recognized text with Qur'an verse text.
-    Uses fuzzy matching to reduce false negatives.
+    Uses fuzzy matching to reduce false negatives and a word-level edit
+    distance alignment to find missing and extra words.
     """
     
     def __init__(self):
         # Similarity threshold for considering words as matches (0.0 to 1.0)
         self.similarity_threshold = 0.75  # 75% similarity = match
-        # Allow reordering of words within a small window
-        self.max_word_distance = 2  # Words can be 2 positions apart and still match
+        # How far (in words) the alignment may drift from the diagonal beyond
+        # the length difference; bounds the work to O(words * band)
+        self.alignment_band = 10
+        # Passages longer than this (in words, either side) are aligned in
+        # anchored chunks (alignment.align_stream) so drift after a skipped
+        # or repeated phrase stays local and the work stays linear
+        self.long_passage_words = 200
+        # Words each chunk looks ahead for a resync anchor
+        self.stream_lookahead = 256
+        # Add a letter-level 'char_diff' to every word pair that differs
+        self.char_diff = True
+        # arabic_normalizer level applied to both texts before comparing
+        self.normalization_level = "standard"
     
     def compare(self, recognized_text: str, verse_text: str) -> Dict:
         """
@@ -25,14 +128,23 @@ class ComparisonService:
         Returns:
             Dict with comparison results including word-by-word matches
         """
-        # Normalize texts (remove diacritics for more lenient matching)
-        normalized_recognized = self._normalize_text(recognized_text)
-        normalized_verse = self._normalize_text(verse_text)
-        
-        # Split into words
-        recognized_words = self._split_words(normalized_recognized)
-        verse_words = self._split_words(normalized_verse)
+        return self.compare_tokens(self.tokenize(recognized_text), self.tokenize(verse_text))
+    
+    def tokenize(self, text: str) -> List[str]:
+        """
+        Normalize text (remove diacritics for more lenient matching) and
+        split it into words. Callers comparing many texts against the same
+        verse tokenize the verse once and use compare_tokens.
+        """
+        return self._split_words(self._normalize_text(text))
+    
+    def compare_tokens(self, recognized_words: List[str], verse_words: List[str]) -> Dict:
+        """
+        Compare already tokenized texts (see tokenize).
         
+        Returns:
+            Same dict as compare
+        """
         # Use fuzzy matching with word alignment
         word_comparisons, matched_words, mismatched_words = self._fuzzy_compare_words(
             recognized_words, verse_words
@@ -49,128 +161,108 @@ class ComparisonService:
             "mismatched_words": mismatched_words
         }
     
+    def iter_compare_tokens(self, recognized_words: List[str], verse_words: List[str]) -> Iterator[Dict]:
+        """
+        Compare already tokenized texts incrementally, for long passages.
+        
+        Always uses the anchored chunk alignment and yields word comparisons
+        in alignment order as each chunk is resolved, so memory stays bounded
+        by the chunk size rather than the passage length. Extra recognized
+        words come inline where they were recited, with "position": None.
+        
+        Yields:
+            Word comparison dicts as in compare's 'word_comparisons'
+        """
+        for step in self.align(recognized_words, verse_words, stream=True):
+            yield self.word_comparison(step, recognized_words, verse_words)
+    
+    def align(self, recognized_words: List[str], verse_words: List[str], stream: Optional[bool] = None) -> Iterator[AlignmentStep]:
+        """
+        Alignment steps of verse_words against recognized_words. stream=None
+        picks the anchored chunk alignment for long passages only.
+        """
+        threshold = self.similarity_threshold
+        def similarity(verse_word: str, recognized_word: str) -> float:
+            return thresholded_similarity(verse_word, recognized_word, threshold)
+        
+        if stream is None:
+            stream = max(len(verse_words), len(recognized_words)) > self.long_passage_words
+        if stream:
+            return align_stream(
+                verse_words, recognized_words, similarity, threshold=threshold,
+                band=self.alignment_band, lookahead=self.stream_lookahead
+            )
+        return iter(align_words(verse_words, recognized_words, similarity, threshold=threshold, band=self.alignment_band))
+    
+    def word_comparison(self, step: AlignmentStep, recognized_words: List[str], verse_words: List[str]) -> Dict:
+        """
+        Turn one alignment step into a word comparison entry.
+        """
+        operation, verse_index, recognized_index, similarity = step
+        if operation == SUBSTITUTION:
+            # The alignment only knows the score is below threshold
+            similarity = self._word_similarity(verse_words[verse_index], recognized_words[recognized_index])
+        recognized = recognized_words[recognized_index] if recognized_index is not None else ""
+        verse = verse_words[verse_index] if verse_index is not None else ""
+        entry = {
+            "position": verse_index,
+            "recognized": recognized,
+            "verse": verse,
+            "match": operation == MATCH,
+            "similarity": round(similarity * 100, 1),
+            "operation": operation,
+            "recognized_index": recognized_index
+        }
+        if self.char_diff:
+            # Letter edits only make sense when both words are present
+            entry["char_diff"] = char_diff(verse, recognized) if verse and recognized and verse != recognized else []
+        return entry
+    
     def _fuzzy_compare_words(self, recognized_words: List[str], verse_words: List[str]) -> tuple:
         """
-        Compare words using fuzzy matching algorithm.
-        Allows for minor spelling variations and word order flexibility.
+        Compare words using a banded edit-distance alignment.
+        Similar words (fuzzy matches) align at a small cost, so minor
+        spelling variations still count as matches, while missing and extra
+        words are found by position rather than by string.
         
         Returns:
             (word_comparisons, matched_words, mismatched_words)
         """
-        word_comparisons = []
+        # One entry per verse word, in verse order
+        word_comparisons = [None] * len(verse_words)
+        inserted = []
         matched_words = 0
-        mismatched_words = 0
-        
-        # Track which verse words have been matched
-        verse_matched = [False] * len(verse_words)
         
-        # First pass: exact and high-similarity matches
-        for i, verse_word in enumerate(verse_words):
-            best_match_idx = None
-            best_similarity = 0.0
-            
-            # Look for matches in a window around the expected position
-            start_idx = max(0, i - self.max_word_distance)
-            end_idx = min(len(recognized_words), i + self.max_word_distance + 1)
-            
-            for j in range(start_idx, end_idx):
-                if j < len(recognized_words):
-                    recognized_word = recognized_words[j]
-                    
-                    # Calculate similarity
-                    similarity = self._word_similarity(verse_word, recognized_word)
-                    
-                    if similarity > best_similarity:
-                        best_similarity = similarity
-                        best_match_idx = j
-            
-            # Check if match is good enough
-            is_match = best_similarity >= self.similarity_threshold
-            
-            if is_match and best_match_idx is not None:
+        for step in self.align(recognized_words, verse_words):
+            entry = self.word_comparison(step, recognized_words, verse_words)
+            if entry["position"] is None:
+                inserted.append(entry)
+                continue
+            if entry["match"]:
                 matched_words += 1
-                verse_matched[i] = True
-                recognized_word = recognized_words[best_match_idx]
-            else:
-                mismatched_words += 1
-                recognized_word = None
-            
-            word_comparisons.append({
-                "position": i,
-                "recognized": recognized_word or "",
-                "verse": verse_word,
-                "match": is_match,
-                "similarity": round(best_similarity * 100, 1) if best_match_idx is not None else 0.0
-            })
-        
-        # Second pass: handle unmatched recognized words
-        unmatched_recognized = []
-        for j, recognized_word in enumerate(recognized_words):
-            # Check if this word was matched in first pass
-            was_matched = False
-            for comp in word_comparisons:
-                if comp.get("recognized") == recognized_word and comp.get("match"):
-                    # Find which position this matched word came from
-                    if j < len(recognized_words):
-                        was_matched = True
-                        break
-            
-            if not was_matched:
-                unmatched_recognized.append((j, recognized_word))
+            word_comparisons[entry["position"]] = entry
         
-        # Add unmatched recognized words as extra
-        for j, recognized_word in unmatched_recognized:
-            word_comparisons.append({
-                "position": len(word_comparisons),
-                "recognized": recognized_word,
-                "verse": "",
-                "match": False,
-                "similarity": 0.0
-            })
+        # Extra recognized words follow the verse words
+        for entry in inserted:
+            entry["position"] = len(word_comparisons)
+            word_comparisons.append(entry)
         
+        mismatched_words = len(verse_words) - matched_words
         return word_comparisons, matched_words, mismatched_words
     
     def _word_similarity(self, word1: str, word2: str) -> float:
         """
         Calculate similarity between two words (0.0 to 1.0).
-        Uses multiple methods for better accuracy.
         """
-        if not word1 or not word2:
-            return 0.0
-        
-        # Exact match
-        if word1 == word2:
-            return 1.0
-        
-        # Normalize for comparison (remove extra spaces)
-        word1 = word1.strip()
-        word2 = word2.strip()
-        
-        # Use SequenceMatcher for similarity
-        similarity = SequenceMatcher(None, word1, word2).ratio()
-        
-        # Boost similarity if words are similar length
-        length_ratio = min(len(word1), len(word2)) / max(len(word1), len(word2)) if max(len(word1), len(word2)) > 0 else 0
-        similarity = (similarity * 0.7) + (length_ratio * 0.3)
-        
-        # Check for common prefixes/suffixes
-        if word1.startswith(word2[:min(3, len(word2))]) or word2.startswith(word1[:min(3, len(word1))]):
-            similarity = max(similarity, 0.6)
-        
-        return similarity
+        return word_similarity(word1, word2)
     
     def _normalize_text(self, text: str) -> str:
         """
-        Normalize Arabic text by removing diacritics and extra whitespace.
+        Normalize Arabic text: remove diacritics and extra whitespace and
+        unify letter variants that recitations and transcripts spell
+        differently (see arabic_normalizer).
         """
-        # Remove Arabic diacritics (tashkeel)
-        diacritics = "ًٌٍَُِّْٰۖۗۘۙۚۛۜ"
-        normalized = "".join(char for char in text if char not in diacritics)
-        
-        # Remove extra whitespace
-        normalized = re.sub(r'\s+', ' ', normalized).strip()
-        
-        return normalized
+        return normalize(text, self.normalization_level)
     
     def _split_words(self, text: str) -> List[str]:
         """
@@ -0,0 +1,248 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from app.services.alignment import AlignmentStep, DELETION, MATCH
+from app.services.comparison_service import ComparisonService
+
+
+class ComparisonSession:
+    """
+    Comparison of a growing or edited recitation against one verse.
+
+    The session keeps the alignment steps and the word comparison entries.
+    An edit keeps the alignment up to the last exact match safely before it
+    and realigns from there: against a verse window just longer than the
+    new words (the rest of the verse counts as not recited yet), and only
+    until the new alignment rejoins the old one at an exact match after the
+    edit. Appending words while streaming, or re-recording one ayah, costs
+    about the size of the edit rather than of the passage.
+    """
+
+    def __init__(self, session_id: str, service: ComparisonService, verse_words: List[str],
+                 verse_text: str = "", reference: str = "", lookahead: int = 32):
+        self.id = session_id
+        self.service = service
+        self.verse_words = list(verse_words)
+        self.verse_text = verse_text
+        self.reference = reference
+        # Verse words aligned beyond the recognized words, so a skipped
+        # phrase this long is still found while appending
+        self.lookahead = lookahead
+        self.recognized_words: List[str] = []
+        # Alignment of verse words [0:covered); the words after that have
+        # not been reached and are implicitly deletions
+        self.steps: List[AlignmentStep] = []
+        self.covered = 0
+        self.entries: List[Dict] = [
+            service.word_comparison((DELETION, index, None, 0.0), [], self.verse_words)
+            for index in range(len(self.verse_words))
+        ]
+        self.insertions: Dict[int, Dict] = {}
+        self.matched_words = 0
+        self.version = 0
+        self.lock = threading.Lock()
+        self.last_used = time.monotonic()
+
+    def append(self, words: List[str]) -> Dict:
+        """Add recognized words at the end, e.g. a new streaming segment."""
+        with self.lock:
+            end = len(self.recognized_words)
+            return self._replace(end, end, words)
+
+    def replace(self, start: int, end: Optional[int], words: List[str]) -> Dict:
+        """
+        Replace recognized words [start:end] (to the end when end is None),
+        e.g. after re-recording one ayah.
+
+        Returns:
+            The delta: 'changed' entries (verse positions whose comparison
+            changed, including a shifted recognized_index), the current
+            'extra_words' and the updated totals
+        """
+        with self.lock:
+            return self._replace(start, len(self.recognized_words) if end is None else end, words)
+
+    def _replace(self, start: int, end: int, words: List[str]) -> Dict:
+        service = self.service
+        verse = self.verse_words
+        start = max(0, min(start, len(self.recognized_words)))
+        end = max(start, min(end, len(self.recognized_words)))
+        shift = len(words) - (end - start)
+        recognized = self.recognized_words[:start] + list(words) + self.recognized_words[end:]
+
+        # Keep everything up to the last exact match the edit cannot affect
+        keep = verse_start = recognized_start = 0
+        for index in range(len(self.steps) - 1, -1, -1):
+            operation, verse_index, recognized_index, _ = self.steps[index]
+            if operation == MATCH and recognized_index < start - service.alignment_band:
+                keep, verse_start, recognized_start = index + 1, verse_index + 1, recognized_index + 1
+                break
+        old = self.steps[keep:]
+        # Exact matches after the edit, where the new alignment may rejoin the old one
+        rejoin = {
+            verse_index: index for index, (operation, verse_index, recognized_index, _) in enumerate(old)
+            if operation == MATCH and recognized_index >= end
+        }
+
+        edited_end = start + len(words)
+        verse_end = min(len(verse), verse_start + len(recognized) - recognized_start + self.lookahead)
+        new_steps: List[AlignmentStep] = []
+        suffix: List[AlignmentStep] = []
+        rejoined = False
+        steps = service.align(recognized[recognized_start:], verse[verse_start:verse_end], stream=True)
+        for operation, verse_index, recognized_index, similarity in steps:
+            if verse_index is not None:
+                verse_index += verse_start
+            if recognized_index is not None:
+                recognized_index += recognized_start
+            new_steps.append((operation, verse_index, recognized_index, similarity))
+            if operation == MATCH and recognized_index >= edited_end and verse_index in rejoin:
+                index = rejoin[verse_index]
+                if old[index][2] + shift == recognized_index:
+                    suffix = [
+                        (operation, verse_index, recognized_index + shift if recognized_index is not None else None, similarity)
+                        for operation, verse_index, recognized_index, similarity in old[index + 1:]
+                    ]
+                    rejoined = True
+                    break
+        removed = {
+            recognized_index: self.insertions.pop(recognized_index)
+            for _, verse_index, recognized_index, _ in old if verse_index is None
+        }
+        touched = {}
+        if not rejoined:
+            # Verse words past the window are back to not recited (yet)
+            for _, verse_index, recognized_index, _ in old:
+                if verse_index is not None and verse_index >= verse_end and recognized_index is not None:
+                    touched[verse_index] = service.word_comparison((DELETION, verse_index, None, 0.0), recognized, verse)
+        for step in new_steps:
+            entry = service.word_comparison(step, recognized, verse)
+            if step[1] is None:
+                self.insertions[step[2]] = entry
+            else:
+                touched[step[1]] = entry
+        if rejoined:
+            # Unchanged past the rejoin point except for the shifted recognized indices
+            for _, verse_index, recognized_index, _ in suffix:
+                if verse_index is None:
+                    self.insertions[recognized_index] = dict(removed[recognized_index - shift], recognized_index=recognized_index)
+                elif recognized_index is not None and shift:
+                    touched[verse_index] = dict(self.entries[verse_index], recognized_index=recognized_index)
+
+        changed = []
+        for position in sorted(touched):
+            entry = touched[position]
+            previous = self.entries[position]
+            if entry != previous:
+                self.matched_words += int(entry["match"]) - int(previous["match"])
+                self.entries[position] = entry
+                changed.append(entry)
+
+        self.steps = self.steps[:keep] + new_steps + suffix
+        if not rejoined:
+            self.covered = verse_end
+        self.recognized_words = recognized
+        self.version += 1
+        return {
+            "session_id": self.id,
+            "version": self.version,
+            "changed": changed,
+            "extra_words": self._extra_words(),
+            **self._totals()
+        }
+
+    def result(self) -> Dict:
+        """The full comparison, in the same format as ComparisonService.compare."""
+        with self.lock:
+            return {
+                "session_id": self.id,
+                "version": self.version,
+                "word_comparisons": self.entries + self._extra_words(),
+                **self._totals()
+            }
+
+    def _extra_words(self) -> List[Dict]:
+        extra = []
+        for recognized_index in sorted(self.insertions):
+            extra.append(dict(self.insertions[recognized_index], position=len(self.entries) + len(extra)))
+        return extra
+
+    def _totals(self) -> Dict:
+        total_words = len(self.verse_words)
+        return {
+            "match_percentage": round(self.matched_words / total_words * 100, 2) if total_words else 0.0,
+            "total_words": total_words,
+            "matched_words": self.matched_words,
+            "mismatched_words": total_words - self.matched_words,
+            "recognized_words": len(self.recognized_words)
+        }
+
+
+class ComparisonSessionStore:
+    """
+    Sessions by id, bounded by count (least recently used is evicted) and
+    by idle time.
+    """
+
+    def __init__(self, service: ComparisonService, max_sessions: int = 1000, idle_seconds: float = 900.0):
+        self.service = service
+        self.max_sessions = max(1, max_sessions)
+        self.idle_seconds = idle_seconds
+        self._sessions: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    def create(self, verse_words: List[str], verse_text: str = "", reference: str = "") -> ComparisonSession:
+        session = ComparisonSession(uuid.uuid4().hex, self.service, verse_words, verse_text, reference)
+        with self._lock:
+            self._expire(time.monotonic())
+            self._sessions[session.id] = session
+            self._created += 1
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+                self._evictions += 1
+        return session
+
+    def get(self, session_id: str) -> Optional[ComparisonSession]:
+        """Return a live session and mark it used, or None."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            session = self._sessions.get(session_id)
+            if session is not None and now - session.last_used > self.idle_seconds:
+                del self._sessions[session_id]
+                self._expirations += 1
+                session = None
+            if session is not None:
+                session.last_used = now
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _expire(self, now: float) -> None:
+        # Sessions are kept in order of last use, so idle ones are at the front
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            if now - session.last_used <= self.idle_seconds:
+                break
+            self._sessions.popitem(last=False)
+            self._expirations += 1
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "idle_seconds": self.idle_seconds,
+                "created": self._created,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+            }
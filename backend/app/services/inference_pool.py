@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+
+class InferenceQueueFullError(Exception):
+    """Raised when the inference pool cannot admit another job."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Inference queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class InferenceTimeoutError(Exception):
+    """Raised when an inference job does not finish within its timeout."""
+
+
+class InferencePool:
+    """
+    Bounded executor for blocking model inference.
+
+    Jobs run on a dedicated thread pool so the event loop stays responsive.
+    At most max_workers jobs run at once and at most max_queue jobs wait
+    behind them; anything beyond that is rejected immediately so callers
+    can answer with 503 instead of piling up requests.
+    """
+
+    def __init__(self, max_workers: int = 1, max_queue: int = 8,
+                 job_timeout: float = 120.0, name: str = "inference"):
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.job_timeout = job_timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix=name
+        )
+        self._lock = threading.Lock()
+        self._admitted = 0
+        self._running = 0
+        self._submitted = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._timeouts = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+        self._last_wait = 0.0
+        self._total_run = 0.0
+
+    async def run(self, fn: Callable, *args, timeout: float = None, **kwargs):
+        """
+        Run fn(*args, **kwargs) on the pool and await its result.
+
+        Raises:
+            InferenceQueueFullError: if the pool is at capacity
+            InferenceTimeoutError: if the job exceeds its timeout
+        """
+        with self._lock:
+            if self._admitted >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise InferenceQueueFullError(self._retry_after())
+            self._admitted += 1
+            self._submitted += 1
+
+        submitted_at = time.perf_counter()
+
+        def job():
+            started_at = time.perf_counter()
+            wait = started_at - submitted_at
+            with self._lock:
+                self._running += 1
+                self._last_wait = wait
+                self._total_wait += wait
+                self._max_wait = max(self._max_wait, wait)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._total_run += time.perf_counter() - started_at
+
+        future = self._executor.submit(job)
+        # Release the slot when the job really finishes (or is cancelled
+        # before starting), not when the caller stops waiting for it
+        future.add_done_callback(self._release)
+
+        job_timeout = timeout if timeout is not None else self.job_timeout
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=job_timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timeouts += 1
+            raise InferenceTimeoutError(
+                f"Inference job did not finish within {job_timeout}s"
+            )
+        except Exception:
+            with self._lock:
+                self._failed += 1
+            raise
+
+    def _release(self, future) -> None:
+        with self._lock:
+            self._admitted -= 1
+            if not future.cancelled() and future.exception() is None:
+                self._completed += 1
+
+    def _retry_after(self) -> int:
+        """Estimate seconds until a slot frees up (caller holds the lock)."""
+        finished = self._completed + self._failed
+        avg_run = self._total_run / finished if finished else 1.0
+        queued = max(0, self._admitted - self._running)
+        return max(1, int(round(avg_run * (queued + 1) / self.max_workers)))
+
+    def stats(self) -> Dict:
+        """Return queue depth, wait times and job counters."""
+        with self._lock:
+            started = self._submitted - (self._admitted - self._running)
+            finished = self._completed + self._failed
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "job_timeout": self.job_timeout,
+                "running": self._running,
+                "queue_depth": self._admitted - self._running,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "timeouts": self._timeouts,
+                "wait_seconds": {
+                    "last": round(self._last_wait, 4),
+                    "avg": round(self._total_wait / started, 4) if started > 0 else 0.0,
+                    "max": round(self._max_wait, 4),
+                },
+                "run_seconds_avg": round(self._total_run / finished, 4) if finished else 0.0,
+            }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,87 @@
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+class MicroBatcher:
+    """
+    Collects requests that arrive within a short window into one batch.
+
+    Callers await submit(item); the batcher groups up to max_batch_size items
+    that arrive within max_wait_ms of the first one, hands the whole list to
+    process_batch and routes each result (or exception) back to its caller.
+    process_batch must return one entry per item, in order; an entry that is
+    an Exception instance is raised for that caller only.
+    """
+
+    def __init__(self, process_batch: Callable[[List[Any]], Awaitable[List[Any]]],
+                 max_batch_size: int = 8, max_wait_ms: float = 10.0):
+        self.process_batch = process_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._pending: List[tuple] = []
+        self._timer = None
+        self._batches = 0
+        self._items = 0
+        self._largest_batch = 0
+        self._total_batch_seconds = 0.0
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item for the next batch and wait for its result."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[tuple]) -> None:
+        items = [item for item, _ in batch]
+        started = time.perf_counter()
+        try:
+            results = await self.process_batch(items)
+            if len(results) != len(items):
+                raise RuntimeError(
+                    f"Batch returned {len(results)} results for {len(items)} items"
+                )
+        except Exception as e:
+            results = [e] * len(items)
+
+        self._batches += 1
+        self._items += len(items)
+        self._largest_batch = max(self._largest_batch, len(items))
+        self._total_batch_seconds += time.perf_counter() - started
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self) -> Dict:
+        """Return batch counters and the average batch size."""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": round(self.max_wait * 1000, 2),
+            "pending": len(self._pending),
+            "batches": self._batches,
+            "items": self._items,
+            "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+            "largest_batch": self._largest_batch,
+            "avg_batch_seconds": round(self._total_batch_seconds / self._batches, 4) if self._batches else 0.0,
+        }
@@ -0,0 +1,253 @@
+"""
+Read-only Qur'an text store.
+
+The corpus is built once from a Tanzil text export ("surah|ayah|text" per
+line, '#' comments) into a SQLite file holding every ayah's diacritized
+text, normalized text and tokens:
+
+    python -m app.services.quran_corpus quran-uthmani.txt data/quran.db
+
+At startup the whole table is read into flat in-memory arrays so a
+reference such as "2:255" or "1:1-7" resolves with index arithmetic.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from app.services.comparison_service import ComparisonService
+
+# Bump when tokenization changes; stale databases are re-tokenized on load
+TOKENIZER_VERSION = "2"
+
+
+class VerseReferenceError(ValueError):
+    """Raised for a malformed reference or one outside the corpus."""
+
+
+class CorpusUnavailableError(Exception):
+    """Raised when no corpus database has been built."""
+
+
+def parse_reference(reference: str) -> Tuple[int, int, Optional[int]]:
+    """
+    Parse "surah:ayah" or "surah:first-last".
+
+    Returns:
+        (surah, first_ayah, last_ayah); last_ayah is None for a single ayah
+    """
+    try:
+        surah, ayat = reference.strip().split(":")
+        if "-" in ayat:
+            first, last = ayat.split("-")
+            parsed = (int(surah), int(first), int(last))
+        else:
+            parsed = (int(surah), int(ayat), None)
+    except ValueError:
+        raise VerseReferenceError(f"Invalid verse reference '{reference}'. Use 'surah:ayah' or 'surah:first-last'")
+    if parsed[2] is not None and parsed[2] < parsed[1]:
+        raise VerseReferenceError(f"Invalid verse range '{reference}'")
+    return parsed
+
+
+def build_corpus_db(source_path: str, db_path: str) -> int:
+    """
+    Build the corpus database from a Tanzil text export.
+
+    Returns:
+        Number of ayat written
+    """
+    tokenizer = ComparisonService()
+    rows = []
+    with open(source_path, encoding="utf-8") as source:
+        for line in source:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            surah, ayah, text = line.split("|", 2)
+            tokens = tokenizer.tokenize(text)
+            rows.append((int(surah), int(ayah), text, " ".join(tokens)))
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    db = sqlite3.connect(db_path)
+    try:
+        db.execute(
+            "CREATE TABLE ayat (surah INTEGER NOT NULL, ayah INTEGER NOT NULL, "
+            "text TEXT NOT NULL, normalized TEXT NOT NULL, PRIMARY KEY (surah, ayah))"
+        )
+        db.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        db.executemany("INSERT INTO ayat VALUES (?, ?, ?, ?)", rows)
+        db.execute("INSERT INTO meta VALUES ('tokenizer_version', ?)", (TOKENIZER_VERSION,))
+        db.commit()
+    finally:
+        db.close()
+    return len(rows)
+
+
+class QuranCorpus:
+    """
+    In-memory view of the corpus database.
+
+    Ayat are stored in mushaf order in flat lists; surah_offsets[s] is the
+    list index of ayah s:1, so s:a lives at surah_offsets[s] + a - 1. Token
+    strings are interned because the vocabulary is small compared to the
+    number of words, which keeps the store to a few MB.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        started = time.perf_counter()
+        self.texts: List[str] = []
+        self.tokens: List[Tuple[str, ...]] = []
+        self.locations: List[Tuple[int, int]] = []
+        self.surah_offsets: Dict[int, int] = {}
+        self.surah_lengths: Dict[int, int] = {}
+
+        if not os.path.exists(db_path):
+            raise CorpusUnavailableError(f"Qur'an corpus database not found at {db_path}")
+        db = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        try:
+            version = db.execute("SELECT value FROM meta WHERE key = 'tokenizer_version'").fetchone()
+            rows = db.execute("SELECT surah, ayah, text, normalized FROM ayat ORDER BY surah, ayah").fetchall()
+        finally:
+            db.close()
+
+        tokenizer = None
+        if version is None or version[0] != TOKENIZER_VERSION:
+            print(f"[QuranCorpus] Database tokens are stale, re-tokenizing {len(rows)} ayat")
+            tokenizer = ComparisonService()
+
+        for surah, ayah, text, normalized in rows:
+            if surah not in self.surah_offsets:
+                self.surah_offsets[surah] = len(self.texts)
+                self.surah_lengths[surah] = 0
+            if ayah != self.surah_lengths[surah] + 1:
+                raise ValueError(f"Corpus is missing ayat before {surah}:{ayah}")
+            self.surah_lengths[surah] += 1
+            words = tokenizer.tokenize(text) if tokenizer else normalized.split()
+            self.texts.append(text)
+            self.locations.append((surah, ayah))
+            self.tokens.append(tuple(sys.intern(word) for word in words))
+
+        # Ayat by first token, for matching verbatim recitations (diacritize)
+        self.ayat_by_first_token: Dict[str, List[int]] = {}
+        for index, tokens in enumerate(self.tokens):
+            if tokens:
+                self.ayat_by_first_token.setdefault(tokens[0], []).append(index)
+
+        self.load_seconds = time.perf_counter() - started
+        print(f"[QuranCorpus] Loaded {len(self.texts)} ayat from {db_path} in {self.load_seconds * 1000:.1f}ms")
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def lookup(self, reference: str) -> Dict:
+        """
+        Resolve a reference such as "2:255" or "1:1-7".
+
+        Returns:
+            Dict with 'reference', 'surah', 'first_ayah', 'last_ayah',
+            diacritized 'text' and normalized 'tokens'
+
+        Raises:
+            VerseReferenceError: if the reference is malformed or not in the corpus
+        """
+        surah, first, last = parse_reference(reference)
+        last = last or first
+        if surah not in self.surah_offsets:
+            raise VerseReferenceError(f"Surah {surah} is not in the corpus")
+        if first < 1 or last > self.surah_lengths[surah]:
+            raise VerseReferenceError(
+                f"Surah {surah} has {self.surah_lengths[surah]} ayat; '{reference}' is out of range"
+            )
+
+        start = self.surah_offsets[surah] + first - 1
+        stop = start + last - first + 1
+        if stop - start == 1:
+            text, tokens = self.texts[start], self.tokens[start]
+        else:
+            text = " ".join(self.texts[start:stop])
+            tokens = tuple(word for ayah_tokens in self.tokens[start:stop] for word in ayah_tokens)
+        return {
+            "reference": f"{surah}:{first}" if first == last else f"{surah}:{first}-{last}",
+            "surah": surah,
+            "first_ayah": first,
+            "last_ayah": last,
+            "text": text,
+            "tokens": tokens,
+        }
+
+    def match_ayat(self, tokens: List[str]) -> Optional[List[int]]:
+        """
+        Split a verbatim recitation into whole ayat.
+
+        tokens (normalized as in the corpus) must split into whole ayat; each
+        position takes the longest ayah that matches there.
+
+        Returns:
+            Indexes of the ayat in order, or None when the tokens are not a
+            sequence of whole ayat
+        """
+        ayat = []
+        position = 0
+        while position < len(tokens):
+            best = None
+            for index in self.ayat_by_first_token.get(tokens[position], ()):
+                ayah = self.tokens[index]
+                if (best is None or len(ayah) > len(self.tokens[best])) and tuple(tokens[position:position + len(ayah)]) == ayah:
+                    best = index
+            if best is None:
+                return None
+            ayat.append(best)
+            position += len(self.tokens[best])
+        return ayat or None
+
+    def diacritize(self, tokens: List[str]) -> Optional[str]:
+        """
+        Canonical diacritized text of a verbatim recitation (see match_ayat).
+
+        Returns:
+            The ayat's diacritized texts joined by spaces, or None when the
+            tokens are not a sequence of whole ayat
+        """
+        ayat = self.match_ayat(tokens)
+        if ayat is None:
+            return None
+        return " ".join(self.texts[index] for index in ayat)
+
+    def stats(self) -> Dict:
+        """Size, load time and approximate memory of the store."""
+        seen = set()
+        size = sys.getsizeof(self.texts) + sys.getsizeof(self.tokens)
+        for text, tokens in zip(self.texts, self.tokens):
+            size += sys.getsizeof(text) + sys.getsizeof(tokens)
+            for word in tokens:
+                if id(word) not in seen:
+                    seen.add(id(word))
+                    size += sys.getsizeof(word)
+        return {
+            "ayat": len(self.texts),
+            "surahs": len(self.surah_offsets),
+            "vocabulary": len(seen),
+            "load_seconds": round(self.load_seconds, 4),
+            "memory_mb": round(size / (1024 * 1024), 2),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the Qur'an corpus database from a Tanzil text export.")
+    parser.add_argument("source", help="Tanzil text file (surah|ayah|text per line)")
+    parser.add_argument("db", nargs="?", default=os.getenv("QURAN_CORPUS_DB", "data/quran.db"))
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.db)), exist_ok=True)
+    count = build_corpus_db(args.source, args.db)
+    print(f"Wrote {count} ayat to {args.db}")
+    print(QuranCorpus(args.db).stats())
+
+
+if __name__ == "__main__":
+    main()
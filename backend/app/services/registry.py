@@ -0,0 +1,253 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, TypeVar
+
+from app.services.asr_engines import preload_engine
+from app.services.batch_comparison import BatchComparer
+from app.services.comparison_service import ComparisonService
+from app.services.comparison_sessions import ComparisonSessionStore
+from app.services.quran_corpus import CorpusUnavailableError, QuranCorpus
+from app.services.tajweed_pool import TajweedPool
+from app.services.tajweed_service import TajweedService
+from app.services.tajweed_span_index import TajweedRulesService, load_span_index
+from app.services.transcription_service import TranscriptionService
+from app.services.verse_index import VerseIndex
+
+T = TypeVar("T")
+
+
+class ServiceRegistry:
+    """
+    Process-wide home for the heavyweight services.
+
+    Routes fetch services from here so the Whisper model and the Mishkal
+    tagger are loaded once and shared. warm_up() loads everything and runs a
+    short inference; the app's lifespan hook calls it at startup and /ready
+    reports whether it has finished.
+
+    Each service is built under its own lock, so a slow build (the Whisper
+    model, the span index) only holds up callers of that service. Async
+    code fetches services with fetch(), which never blocks the event loop.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._tajweed: Optional[TajweedService] = None
+        self._tajweed_pool: Optional[TajweedPool] = None
+        self._tajweed_rules: Optional[TajweedRulesService] = None
+        self._comparison: Optional[ComparisonService] = None
+        self._batch_comparer: Optional[BatchComparer] = None
+        self._comparison_sessions: Optional[ComparisonSessionStore] = None
+        self._corpus: Optional[QuranCorpus] = None
+        self._verse_index: Optional[VerseIndex] = None
+        self._transcription: Optional[TranscriptionService] = None
+        self.status = "not_started"
+        self.error: Optional[str] = None
+        self.timings: Dict[str, float] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.status == "ready"
+
+    def _get(self, attribute: str, build: Callable[[], T]) -> T:
+        """Return the service in attribute, building it first when missing."""
+        service = getattr(self, attribute)
+        if service is not None:
+            return service
+        with self._lock:
+            lock = self._build_locks.setdefault(attribute, threading.Lock())
+        with lock:
+            # Another thread may have built it while this one waited
+            service = getattr(self, attribute)
+            if service is None:
+                service = build()
+                setattr(self, attribute, service)
+            return service
+
+    async def fetch(self, getter: Callable[[], T]) -> T:
+        """
+        Call a getter such as registry.corpus from async code. Built services
+        are returned at once; otherwise the getter runs in a worker thread, as
+        it may load a model or build an index.
+        """
+        service = getattr(self, f"_{getter.__name__}", None)
+        if service is not None:
+            return service
+        return await asyncio.to_thread(getter)
+
+    def tajweed(self) -> TajweedService:
+        """Shared TajweedService, created on first use."""
+        def build():
+            try:
+                # Verbatim Qur'an text is diacritized from the corpus
+                corpus = self.corpus()
+            except CorpusUnavailableError:
+                corpus = None
+            return TajweedService(corpus=corpus)
+        return self._get("_tajweed", build)
+
+    def tajweed_pool(self) -> TajweedPool:
+        """Shared TajweedPool; its worker processes start with warm_up or on the first Mishkal miss."""
+        return self._get("_tajweed_pool", lambda: TajweedPool(
+            self.tajweed(),
+            max_workers=int(os.getenv("TAJWEED_WORKERS", "2")),
+            chunk_size=int(os.getenv("TAJWEED_CHUNK_SIZE", "8"))
+        ))
+
+    def tajweed_rules(self) -> TajweedRulesService:
+        """
+        Shared TajweedRulesService. Its span index (TAJWEED_SPAN_INDEX) is
+        memory-mapped on first use, and built first when missing or stale.
+        """
+        def build():
+            corpus = index = None
+            try:
+                corpus = self.corpus()
+                index = load_span_index(corpus, os.getenv("TAJWEED_SPAN_INDEX", "data/tajweed_spans.bin"))
+            except CorpusUnavailableError:
+                pass
+            except OSError as e:
+                # e.g. a read-only data directory; rules are computed per request
+                print(f"[Registry] ⚠️  Tajweed span index unavailable: {e}")
+            return TajweedRulesService(corpus, index)
+        return self._get("_tajweed_rules", build)
+
+    def comparison(self) -> ComparisonService:
+        """Shared ComparisonService, created on first use."""
+        return self._get("_comparison", ComparisonService)
+
+    def batch_comparer(self) -> BatchComparer:
+        """Shared BatchComparer; its process pool starts on the first large batch."""
+        return self._get("_batch_comparer", lambda: BatchComparer(
+            self.comparison(),
+            max_workers=int(os.getenv("COMPARISON_WORKERS", "0")) or None,
+            chunk_size=int(os.getenv("COMPARISON_CHUNK_SIZE", "64"))
+        ))
+
+    def comparison_sessions(self) -> ComparisonSessionStore:
+        """Shared store of incremental comparison sessions."""
+        return self._get("_comparison_sessions", lambda: ComparisonSessionStore(
+            self.comparison(),
+            max_sessions=int(os.getenv("COMPARISON_SESSIONS_MAX", "1000")),
+            idle_seconds=float(os.getenv("COMPARISON_SESSION_IDLE_SECONDS", "900"))
+        ))
+
+    def corpus(self) -> QuranCorpus:
+        """
+        Shared read-only Qur'an corpus, loaded from QURAN_CORPUS_DB on first use.
+
+        Raises:
+            CorpusUnavailableError: if the database has not been built
+        """
+        return self._get("_corpus", lambda: QuranCorpus(os.getenv("QURAN_CORPUS_DB", "data/quran.db")))
+
+    def verse_index(self) -> VerseIndex:
+        """
+        Shared verse identification index, built from the corpus on first use.
+
+        Raises:
+            CorpusUnavailableError: if the corpus database has not been built
+        """
+        return self._get("_verse_index", lambda: VerseIndex(self.corpus()))
+
+    def transcription(self) -> TranscriptionService:
+        """Shared TranscriptionService, created on first use."""
+        def build():
+            service = TranscriptionService(tajweed_service=self.tajweed(), tajweed_pool=self.tajweed_pool())
+            print(f"[Registry] TranscriptionService created: use_whisper={service.use_whisper}, model={service.model is not None}")
+            return service
+        return self._get("_transcription", build)
+
+    def preload(self) -> None:
+        """
+        Load the large read-only state before a multi-process server forks
+        its workers (see server_mode): corpus, verse index, span index,
+        Mishkal and the ASR weights. The workers inherit it and share the
+        pages. Per-process state (caches, thread and process pools) is
+        still created in each worker by warm_up.
+        """
+        started = time.perf_counter()
+        try:
+            self.corpus()
+            self.verse_index()
+        except CorpusUnavailableError as e:
+            print(f"[Registry] ⚠️  {e}")
+        self.tajweed()
+        self.tajweed_rules()
+        try:
+            preload_engine()
+        except Exception as e:
+            # Each worker retries (and reports) when it creates its TranscriptionService
+            print(f"[Registry] ⚠️  ASR engine not preloaded: {type(e).__name__}: {e}")
+        self.timings["preload_seconds"] = round(time.perf_counter() - started, 3)
+        print(f"[Registry] ✅ Preloaded shared state in {self.timings['preload_seconds']}s")
+
+    def warm_up(self) -> None:
+        """Load all services and prime them with a synthetic request."""
+        self.status = "loading"
+        try:
+            started = time.perf_counter()
+            try:
+                self.corpus()
+                self.timings["corpus_load_seconds"] = round(time.perf_counter() - started, 3)
+                started = time.perf_counter()
+                self.verse_index()
+                self.timings["verse_index_build_seconds"] = round(time.perf_counter() - started, 3)
+            except CorpusUnavailableError as e:
+                # Comparisons by verse_text still work without it
+                print(f"[Registry] ⚠️  {e}")
+
+            started = time.perf_counter()
+            self.tajweed()
+            self.timings["tajweed_load_seconds"] = round(time.perf_counter() - started, 3)
+
+            started = time.perf_counter()
+            self.tajweed_pool().warm_up()
+            self.timings["tajweed_pool_start_seconds"] = round(time.perf_counter() - started, 3)
+
+            started = time.perf_counter()
+            self.tajweed_rules()
+            self.timings["tajweed_span_index_seconds"] = round(time.perf_counter() - started, 3)
+
+            started = time.perf_counter()
+            service = self.transcription()
+            self.timings["transcription_load_seconds"] = round(time.perf_counter() - started, 3)
+
+            started = time.perf_counter()
+            service.warm_up()
+            self.timings["warm_up_seconds"] = round(time.perf_counter() - started, 3)
+
+            self.status = "ready"
+            print(f"[Registry] ✅ Services ready: {self.timings}")
+        except Exception as e:
+            self.status = "failed"
+            self.error = f"{type(e).__name__}: {e}"
+            print(f"[Registry] ❌ Warm-up failed: {self.error}")
+            import traceback
+            traceback.print_exc()
+
+    def mark_ready(self) -> None:
+        """Used when eager loading is disabled and services load lazily."""
+        self.status = "ready"
+
+    def shutdown(self) -> None:
+        """Stop worker processes; they are restarted on next use."""
+        with self._lock:
+            if self._batch_comparer is not None:
+                self._batch_comparer.shutdown()
+            if self._tajweed_pool is not None:
+                self._tajweed_pool.shutdown()
+
+    def readiness(self) -> Dict:
+        return {
+            "status": self.status,
+            "error": self.error,
+            "timings": self.timings,
+            "corpus": self._corpus.stats() if self._corpus is not None else None
+        }
+
+
+registry = ServiceRegistry()
@@ -0,0 +1,73 @@
+"""
+Multi-process serving with shared model memory.
+
+Under gunicorn (backend/gunicorn.conf.py) the master process loads the
+large read-only state once (registry.preload: corpus, indexes, Mishkal,
+ASR weights) and then forks the workers, which share those pages
+copy-on-write instead of each loading a copy:
+
+- limit_process_pools sizes the batch comparison pool that each worker
+  starts, so N workers do not start N x cores comparison processes.
+- prepare_master runs before anything heavy is imported: native thread
+  pools stay single-threaded (threads do not survive fork) and automatic
+  garbage collection is paused so loading does not interleave garbage
+  with the shared objects.
+- preload loads the shared state and gc.freeze()s it, so collections in
+  the workers never write to (and so copy) those pages.
+- configure_worker runs in each worker after fork and gives it its share
+  of the cores for intra-op threads.
+"""
+import gc
+import os
+from typing import Optional
+
+# Read by OpenMP, MKL and OpenBLAS when they start their thread pools
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS")
+
+
+def worker_threads(workers: int, cpu_count: Optional[int] = None) -> int:
+    """
+    Intra-op threads per worker so that workers x threads does not exceed
+    the cores. WORKER_THREADS overrides it.
+    """
+    configured = int(os.getenv("WORKER_THREADS", "0"))
+    if configured > 0:
+        return configured
+    return max(1, (cpu_count or os.cpu_count() or 1) // max(1, workers))
+
+
+def limit_process_pools(workers: int, cpu_count: Optional[int] = None) -> None:
+    """
+    Default COMPARISON_WORKERS to each worker's share of the cores; every
+    server worker starts its own /compare_verse/batch process pool.
+    """
+    os.environ.setdefault("COMPARISON_WORKERS", str(max(1, (cpu_count or os.cpu_count() or 1) // max(1, workers))))
+
+
+def prepare_master() -> None:
+    """Call first in the master process, before the app is imported."""
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = "1"
+    # The server workers already run requests in parallel processes, and
+    # share the preloaded Mishkal; a Mishkal pool per worker would multiply processes
+    os.environ.setdefault("TAJWEED_WORKERS", "0")
+    gc.disable()
+
+
+def preload() -> None:
+    """Load the shared state in the master, just before the workers are forked."""
+    from app.services.registry import registry
+
+    registry.preload()
+    gc.collect()
+    # Everything allocated so far moves to the permanent generation
+    gc.freeze()
+
+
+def configure_worker(threads: int) -> None:
+    """Call in each worker right after fork."""
+    gc.enable()
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(threads)
+    # Applied to the engine when the worker creates its TranscriptionService
+    os.environ["ASR_CPU_THREADS"] = str(threads)
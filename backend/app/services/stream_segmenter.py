@@ -0,0 +1,117 @@
+from typing import List, Tuple
+
+# numpy ships with Whisper; streaming needs it to work on PCM frames
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+from app.services.audio_decoder import SAMPLE_RATE
+from app.services.vad import frame_levels_db
+
+
+class StreamSegmenter:
+    """
+    Splits a live 16-bit PCM stream into utterances at pauses.
+
+    Audio is fed in arbitrary-sized chunks and cut into fixed frames. A frame
+    is speech when its RMS level is above silence_threshold_db (dBFS). Once
+    speech has been followed by min_pause_ms of silence the utterance is
+    emitted; utterances are also force-cut at max_segment_s so each one fits
+    in a single Whisper window.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, frame_ms: int = 30,
+                 silence_threshold_db: float = -40.0, min_pause_ms: int = 600,
+                 min_speech_ms: int = 200, max_segment_s: float = 25.0,
+                 padding_ms: int = 150):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy is required for streaming transcription")
+        self.sample_rate = sample_rate
+        self.frame_samples = int(sample_rate * frame_ms / 1000)
+        self.silence_threshold_db = silence_threshold_db
+        self.pause_frames = max(1, min_pause_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.max_segment_frames = max(1, int(max_segment_s * 1000 / frame_ms))
+        self.padding_frames = padding_ms // frame_ms
+
+        self._remainder = b""
+        self._frames: List = []
+        self._speech_frames = 0
+        self._silence_run = 0
+        self._preroll: List = []
+        self._frame_index = 0
+        self._segment_start = 0
+
+    def feed(self, pcm_bytes: bytes) -> List[Tuple[float, "np.ndarray"]]:
+        """
+        Add little-endian int16 mono samples to the stream.
+
+        Returns:
+            List of finished (start_seconds, float32 audio) utterances
+        """
+        data = self._remainder + pcm_bytes
+        frame_bytes = self.frame_samples * 2
+        usable = len(data) - len(data) % frame_bytes
+        self._remainder = data[usable:]
+        if not usable:
+            return []
+
+        samples = np.frombuffer(data[:usable], dtype="<i2").astype(np.float32) / 32768.0
+        frames = samples.reshape(-1, self.frame_samples)
+        levels = frame_levels_db(samples, self.frame_samples)
+
+        finished = []
+        for frame, level in zip(frames, levels):
+            segment = self._push_frame(frame, level >= self.silence_threshold_db)
+            if segment is not None:
+                finished.append(segment)
+        return finished
+
+    def flush(self) -> List[Tuple[float, "np.ndarray"]]:
+        """Emit whatever utterance is still open at the end of the stream."""
+        segment = self._emit()
+        return [segment] if segment is not None else []
+
+    def _push_frame(self, frame, is_speech: bool):
+        self._frame_index += 1
+
+        if not self._frames:
+            if not is_speech:
+                # Keep a little audio before speech so onsets are not clipped
+                self._preroll.append(frame)
+                if len(self._preroll) > self.padding_frames:
+                    self._preroll.pop(0)
+                return None
+            self._segment_start = self._frame_index - 1 - len(self._preroll)
+            self._frames = self._preroll
+            self._preroll = []
+
+        self._frames.append(frame)
+        if is_speech:
+            self._speech_frames += 1
+            self._silence_run = 0
+        else:
+            self._silence_run += 1
+
+        if self._silence_run >= self.pause_frames or len(self._frames) >= self.max_segment_frames:
+            return self._emit()
+        return None
+
+    def _emit(self):
+        frames = self._frames
+        speech_frames = self._speech_frames
+        # Drop the pause itself, keeping a short tail of padding
+        trailing = max(0, self._silence_run - self.padding_frames)
+        self._frames = []
+        self._speech_frames = 0
+        self._silence_run = 0
+
+        if speech_frames < self.min_speech_frames:
+            return None
+        if trailing:
+            frames = frames[:-trailing]
+        start = self._segment_start * self.frame_samples / self.sample_rate
+        return start, np.concatenate(frames).astype(np.float32, copy=False)
@@ -0,0 +1,115 @@
+"""
+Word lexicon for the tajweed fallback used when Mishkal is unavailable.
+
+The lexicon file has one "word|diacritized word" per line ('#' comments).
+A lexicon covering the whole Qur'an vocabulary can be built from a
+diacritized Tanzil export ("surah|ayah|text" per line):
+
+    python -m app.services.tajweed_lexicon quran-uthmani.txt data/tajweed_lexicon.txt
+"""
+import argparse
+import os
+import re
+from collections import Counter
+from typing import Dict
+
+from app.services.arabic_normalizer import normalize
+
+DEFAULT_LEXICON_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "tajweed_lexicon.txt")
+
+# Runs of Arabic letters; everything else (spaces, punctuation, digits) is
+# left untouched, so words are only ever replaced whole
+_WORD = re.compile(r"[ء-غف-يٱ-ۓ]+")
+
+
+class TajweedLexicon:
+    """
+    Whole-word lookup of diacritized forms.
+
+    Words are looked up exactly first, then by their "standard" normalized
+    form so spelling variants (إياك / اياك) still match. Lookups are dict
+    hits, so the cost of apply() depends on the text length only, not on
+    the lexicon size.
+    """
+
+    def __init__(self, entries: Dict[str, str]):
+        self.entries: Dict[str, str] = {}
+        self.variants: Dict[str, str] = {}
+        for word, diacritized in entries.items():
+            word = normalize(word, "diacritics")
+            self.entries[word] = diacritized
+            self.variants.setdefault(normalize(word, "standard"), diacritized)
+
+    @classmethod
+    def load(cls, path: str) -> "TajweedLexicon":
+        """
+        Load a lexicon file. A missing file gives an empty lexicon.
+        """
+        entries: Dict[str, str] = {}
+        if not os.path.exists(path):
+            print(f"[TajweedLexicon] Warning: lexicon not found at {path}")
+            return cls(entries)
+        with open(path, encoding="utf-8") as source:
+            for line in source:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                word, diacritized = line.split("|", 1)
+                entries[word.strip()] = diacritized.strip()
+        return cls(entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, word: str) -> str:
+        """Diacritized form of an undiacritized word, or the word unchanged."""
+        diacritized = self.entries.get(word)
+        if diacritized is None:
+            diacritized = self.variants.get(normalize(word, "standard"), word)
+        return diacritized
+
+    def apply(self, text: str) -> str:
+        """Diacritize every known word of text, leaving the rest as is."""
+        return _WORD.sub(lambda match: self.lookup(match.group()), text)
+
+
+def build_lexicon(source_path: str, lexicon_path: str) -> int:
+    """
+    Build a lexicon from a diacritized Tanzil export, keeping each word's
+    most frequent diacritized form.
+
+    Returns:
+        Number of words written
+    """
+    forms: Dict[str, Counter] = {}
+    with open(source_path, encoding="utf-8") as source:
+        for line in source:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            text = line.split("|", 2)[2]
+            for diacritized in text.split():
+                word = normalize(diacritized, "diacritics")
+                if _WORD.fullmatch(word):
+                    forms.setdefault(word, Counter())[diacritized] += 1
+
+    with open(lexicon_path, "w", encoding="utf-8") as out:
+        out.write(f"# Built from {os.path.basename(source_path)} by app.services.tajweed_lexicon\n")
+        for word in sorted(forms):
+            out.write(f"{word}|{forms[word].most_common(1)[0][0]}\n")
+    return len(forms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the tajweed fallback lexicon from a diacritized Tanzil export.")
+    parser.add_argument("source", help="Tanzil text file (surah|ayah|text per line)")
+    parser.add_argument("lexicon", nargs="?", default=os.getenv("TAJWEED_LEXICON", "data/tajweed_lexicon.txt"))
+    args = parser.parse_args()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.lexicon)), exist_ok=True)
+    count = build_lexicon(args.source, args.lexicon)
+    print(f"Wrote {count} words to {args.lexicon}")
+
+
+if __name__ == "__main__":
+    main()
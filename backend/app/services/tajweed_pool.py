@@ -0,0 +1,187 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional, Tuple
+
+from app.services.tajweed_service import TajweedService
+
+# One TajweedService (and Mishkal tagger) per worker process, built by the initializer
+_worker_tajweed: Optional[TajweedService] = None
+
+# (tier, diacritized text, error) per text; error is None on success
+Outcome = Tuple[Optional[str], Optional[str], Optional[str]]
+
+
+def _init_worker() -> None:
+    """Import Mishkal and build its TashkeelClass once, when the worker starts."""
+    global _worker_tajweed
+    _worker_tajweed = TajweedService()
+
+
+def _diacritize_all(service: TajweedService, texts: List[str]) -> List[Outcome]:
+    outcomes = []
+    for text in texts:
+        try:
+            tier, diacritized = service.diacritize(text)
+            outcomes.append((tier, diacritized, None))
+        except Exception as e:
+            outcomes.append((None, None, str(e)))
+    return outcomes
+
+
+def _diacritize_chunk(texts: List[str]) -> List[Outcome]:
+    """Diacritize one chunk of lookup misses. Runs in a worker process."""
+    return _diacritize_all(_worker_tajweed, texts)
+
+
+class TajweedPool:
+    """
+    Runs Mishkal diacritization off the event loop.
+
+    Mishkal is pure Python and CPU bound, so threads would serialize on the
+    GIL; misses are sent to a process pool whose workers each load Mishkal
+    once at startup. The parent's TajweedService still answers the cheap
+    tiers (corpus, caches) first and caches what the workers return. When
+    Mishkal is unavailable, or max_workers is 0, misses run in a thread on
+    the parent's service instead.
+    """
+
+    def __init__(self, tajweed_service: TajweedService, max_workers: int = 2, chunk_size: int = 8):
+        self.tajweed_service = tajweed_service
+        self.max_workers = max(0, max_workers)
+        self.chunk_size = max(1, chunk_size)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether misses go to worker processes. The lexicon fallback is too cheap to ship."""
+        return self.max_workers > 0 and self.tajweed_service.available
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a process that already runs threads (the event
+                # loop, the inference pool) can copy held locks into the child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker
+                )
+                print(f"[TajweedPool] Started process pool with {self.max_workers} worker(s)")
+            return self._executor
+
+    def _reset(self, executor: ProcessPoolExecutor) -> None:
+        """Drop a broken pool so the next call starts a fresh one."""
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def warm_up(self) -> None:
+        """Start every worker and let it load Mishkal before real traffic arrives."""
+        if not self.enabled:
+            return
+        pool = self._pool()
+        futures = [pool.submit(_diacritize_chunk, ["بسم الله"]) for _ in range(self.max_workers)]
+        for future in futures:
+            future.result()
+
+    async def _diacritize(self, texts: List[str]) -> List[Outcome]:
+        chunks = [texts[start:start + self.chunk_size] for start in range(0, len(texts), self.chunk_size)]
+        if self.enabled:
+            loop = asyncio.get_running_loop()
+            pool = self._pool()
+            futures = [loop.run_in_executor(pool, _diacritize_chunk, chunk) for chunk in chunks]
+        else:
+            pool = None
+            futures = [asyncio.to_thread(_diacritize_all, self.tajweed_service, chunk) for chunk in chunks]
+
+        outcomes: List[Outcome] = []
+        for chunk, result in zip(chunks, await asyncio.gather(*futures, return_exceptions=True)):
+            if isinstance(result, Exception):
+                # A crashed worker fails only the texts it was given
+                print(f"[TajweedPool] Chunk failed: {type(result).__name__}: {result}")
+                if isinstance(result, BrokenProcessPool) and pool is not None:
+                    self._reset(pool)
+                outcomes.extend((None, None, f"{type(result).__name__}: {result}") for _ in chunk)
+            else:
+                outcomes.extend(result)
+        return outcomes
+
+    async def add_tajweed_many(self, texts: List[str]) -> List[Dict]:
+        """
+        Add tajweed to many texts.
+
+        Texts that are the same once their diacritics are removed are
+        diacritized once; the rest are answered from the service's tiers or
+        spread over the workers in chunks of chunk_size.
+
+        Returns:
+            One result per text, in order, each with its 'index'. Failures
+            get "success": false and an 'error' instead of failing the batch.
+        """
+        service = self.tajweed_service
+        results: List[Optional[Dict]] = [None] * len(texts)
+        answers: Dict[str, Tuple[Optional[str], Optional[str]]] = {}
+        misses: List[str] = []
+        stripped_texts: List[Optional[str]] = []
+        for index, text in enumerate(texts):
+            if not text or not text.strip():
+                results[index] = {"index": index, "success": False, "error": "Text is required"}
+                stripped_texts.append(None)
+                continue
+            stripped = service._remove_diacritics(text)
+            stripped_texts.append(stripped)
+            if stripped in answers:
+                continue
+            if not stripped.strip():
+                # Only diacritics: answered as is, without counting a tier hit
+                answers[stripped] = (stripped, None)
+                continue
+            diacritized = service.lookup(stripped)
+            answers[stripped] = (diacritized, None)
+            if diacritized is None:
+                misses.append(stripped)
+
+        for stripped, (tier, diacritized, error) in zip(misses, await self._diacritize(misses)):
+            if error is None:
+                service.remember(stripped, tier, diacritized)
+            answers[stripped] = (diacritized, error)
+
+        for index, stripped in enumerate(stripped_texts):
+            if stripped is None:
+                continue
+            diacritized, error = answers[stripped]
+            if error is not None:
+                results[index] = {"index": index, "success": False, "error": error}
+            else:
+                results[index] = {
+                    "index": index,
+                    "success": True,
+                    "text_with_tajweed": diacritized,
+                    "original_text": texts[index]
+                }
+        return results
+
+    async def add_tajweed(self, text: str) -> str:
+        """
+        TajweedService.add_tajweed without blocking the event loop.
+
+        Raises:
+            RuntimeError: if the worker diacritizing the text failed
+        """
+        if not text or not text.strip():
+            return text
+        result = (await self.add_tajweed_many([text]))[0]
+        if not result["success"]:
+            raise RuntimeError(result["error"])
+        return result["text_with_tajweed"]
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
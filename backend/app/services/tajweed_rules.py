@@ -0,0 +1,200 @@
+"""
+Tajweed rule engine.
+
+Finds where tajweed rules apply in diacritized Arabic text (Tanzil Uthmani
+or simple script, or the output of /add_tajweed) and reports them as
+(start, end, rule) character spans, end exclusive:
+
+- idgham: noon sakinah or tanween merged into ي ن م و ل ر across words,
+  and meem sakinah merged into a following meem
+- ikhfa: noon sakinah or tanween before the 15 ikhfa letters, and meem
+  sakinah before ba (ikhfa shafawi)
+- iqlab: noon sakinah or tanween before ba
+- qalqala: ق ط ب ج د with sukun, or as the last letter when stopping
+- madd_2 / madd_4 / madd_6: natural madd (2 counts), madd before a hamza
+  in the same or the next word or at a stop (4-5 counts, shown as 4), and
+  madd before a sukun or shadda in the same word (6 counts)
+- ghunna: noon or meem with shadda
+
+The text is read as a sequence of letters with their marks; a letter
+without any vowel mark counts as sakin only when its word is diacritized,
+so undiacritized input yields no spans rather than wrong ones. The end of
+the text is treated as a stop.
+"""
+from typing import List, NamedTuple, Optional, Tuple
+
+# Rule ids are the positions in this tuple (stored as one byte in the span index)
+RULES = ("idgham", "ikhfa", "iqlab", "qalqala", "madd_2", "madd_4", "madd_6", "ghunna")
+# Bump when the rules change; stale span indexes are rebuilt on load
+RULES_VERSION = 1
+
+# (start, end, rule) in characters, end exclusive
+Span = Tuple[int, int, str]
+
+FATHA, DAMMA, KASRA = "َ", "ُ", "ِ"
+TANWEEN = {"ً", "ٌ", "ٍ", "ࣰ", "ࣱ", "ࣲ"}
+SHADDA = "ّ"
+# Uthmani script writes sukun as the small high dotless head of khah
+SUKUN = {"ْ", "ۡ"}
+MADDAH = "ٓ"
+# Dagger alef, small waw and small yeh: a long vowel written as a mark
+MADD_MARKS = {"ٰ", "ۥ", "ۦ"}
+VOWELS = {FATHA, DAMMA, KASRA} | TANWEEN | MADD_MARKS | {SHADDA}
+
+NOON, MEEM, BA = "ن", "م", "ب"
+ALEF, ALEF_WASLA, ALEF_MAQSURA, WAW, YA = "ا", "ٱ", "ى", "و", "ي"
+HAMZAS = set("ءأإؤئآ")
+IDGHAM_LETTERS = set("ينمولر")
+IKHFA_LETTERS = set("تثجدذزسشصضطظفقك")
+QALQALA_LETTERS = set("قطبجد")
+# Alef or alef maqsura carrying a fathatan's seat, skipped when looking past tanween
+TANWEEN_SEATS = {ALEF, ALEF_MAQSURA}
+
+
+def _is_mark(char: str) -> bool:
+    return "ً" <= char <= "ٟ" or char == "ٰ" or "ۖ" <= char <= "ۭ" or "ࣰ" <= char <= "ࣳ"
+
+
+class _Letter(NamedTuple):
+    start: int
+    end: int        # after the letter's marks
+    char: str
+    marks: str
+    word: int       # index of the word the letter belongs to
+
+
+def _letters(text: str) -> List[_Letter]:
+    letters: List[_Letter] = []
+    word = 0
+    index = 0
+    in_word = False
+    while index < len(text):
+        char = text[index]
+        if char.isspace():
+            if in_word:
+                word += 1
+                in_word = False
+            index += 1
+            continue
+        end = index + 1
+        while end < len(text) and _is_mark(text[end]):
+            end += 1
+        if char == "ـ":
+            # Tatweel only carries marks
+            if letters and letters[-1].word == word:
+                previous = letters[-1]
+                letters[-1] = previous._replace(end=end, marks=previous.marks + text[index + 1:end])
+            index = end
+            continue
+        if not _is_mark(char):
+            letters.append(_Letter(index, end, char, text[index + 1:end], word))
+            in_word = True
+        index = end
+    return letters
+
+
+def find_rules(text: str) -> List[Span]:
+    """
+    Tajweed rule spans in diacritized text.
+
+    Returns:
+        (start, end, rule) spans sorted by start; spans may overlap, e.g.
+        an idgham into a doubled noon and that noon's ghunna
+    """
+    letters = _letters(text)
+    # Words with at least one vowel mark; unmarked letters elsewhere are not sakin
+    diacritized_words = {letter.word for letter in letters if any(mark in VOWELS or mark in SUKUN for mark in letter.marks)}
+    spans: List[Span] = []
+
+    def sakin(letter: _Letter) -> bool:
+        if any(mark in SUKUN for mark in letter.marks):
+            return True
+        return letter.word in diacritized_words and not any(mark in VOWELS for mark in letter.marks)
+
+    def following(index: int) -> Optional[_Letter]:
+        return letters[index + 1] if index + 1 < len(letters) else None
+
+    for index, letter in enumerate(letters):
+        marks = letter.marks
+        after = following(index)
+
+        # Noon sakinah and tanween
+        tanween = any(mark in TANWEEN for mark in marks)
+        if (tanween or (letter.char == NOON and sakin(letter))) and after is not None:
+            target = index + 1
+            if tanween:
+                while target < len(letters) and letters[target].word == letter.word and letters[target].char in TANWEEN_SEATS:
+                    target += 1
+            if target < len(letters):
+                nxt = letters[target]
+                rule = None
+                if nxt.char == BA:
+                    rule = "iqlab"
+                elif nxt.char in IKHFA_LETTERS:
+                    rule = "ikhfa"
+                elif nxt.char in IDGHAM_LETTERS and nxt.word != letter.word:
+                    # Within one word (الدنيا, بنيان) the noon is pronounced clearly
+                    rule = "idgham"
+                if rule:
+                    spans.append((letter.start, nxt.end, rule))
+
+        # Meem sakinah
+        if letter.char == MEEM and sakin(letter) and after is not None:
+            if after.char == BA:
+                spans.append((letter.start, after.end, "ikhfa"))
+            elif after.char == MEEM:
+                spans.append((letter.start, after.end, "idgham"))
+
+        if letter.char in (NOON, MEEM) and SHADDA in marks:
+            spans.append((letter.start, letter.end, "ghunna"))
+
+        # At the stop every final qalqala letter is read with sukun
+        if letter.char in QALQALA_LETTERS and letter.word in diacritized_words:
+            if after is None or (sakin(letter) and not tanween):
+                spans.append((letter.start, letter.end, "qalqala"))
+
+        madd = _madd(letters, index, sakin)
+        if madd is not None:
+            spans.append(madd)
+
+    spans.sort()
+    return spans
+
+
+def _madd(letters: List[_Letter], index: int, sakin) -> Optional[Span]:
+    """The madd span whose long vowel is letters[index], if any."""
+    letter = letters[index]
+    previous = letters[index - 1] if index > 0 and letters[index - 1].word == letter.word else None
+    if any(mark in MADD_MARKS for mark in letter.marks):
+        start = letter.start
+    elif previous is None or any(mark in VOWELS for mark in letter.marks if mark != MADDAH):
+        return None
+    elif letter.char in (ALEF, ALEF_MAQSURA) and FATHA in previous.marks:
+        start = previous.start
+    elif letter.char == WAW and DAMMA in previous.marks and sakin(letter):
+        start = previous.start
+    elif letter.char in (YA, ALEF_MAQSURA) and KASRA in previous.marks and sakin(letter):
+        start = previous.start
+    else:
+        return None
+
+    after = letters[index + 1] if index + 1 < len(letters) else None
+    if after is None:
+        length = "madd_2"
+    elif after.word == letter.word:
+        if after.char in HAMZAS:
+            length = "madd_4"        # muttasil
+        elif SHADDA in after.marks or any(mark in SUKUN for mark in after.marks):
+            length = "madd_6"        # lazim
+        elif index + 2 == len(letters):
+            length = "madd_4"        # arid lil-sukun at the stop
+        else:
+            length = "madd_4" if MADDAH in letter.marks else "madd_2"
+    elif after.char in HAMZAS:
+        length = "madd_4"            # munfasil
+    elif after.char in (ALEF, ALEF_WASLA) and not any(mark in VOWELS for mark in after.marks):
+        # A long vowel before hamzat al-wasl is shortened in connected recitation
+        return None
+    else:
+        length = "madd_4" if MADDAH in letter.marks else "madd_2"
+    return (start, letter.end, length)
@@ -1,12 +1,53 @@
-from typing import Optional
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from app.services.arabic_normalizer import normalize
+from app.services.quran_corpus import QuranCorpus
+from app.services.tajweed_lexicon import DEFAULT_LEXICON_PATH, TajweedLexicon
+
+# Where add_tajweed found its answer, cheapest first
+TIERS = ("corpus", "sentence_cache", "word_cache", "mishkal", "fallback")
+
+class _LRUCache:
+    """Small thread-safe LRU mapping of undiacritized to diacritized text."""
+    
+    def __init__(self, max_entries: int):
+        self.max_entries = max(0, max_entries)
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key: str, value: str) -> None:
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def __len__(self) -> int:
+        return len(self._entries)
 
 class TajweedService:
     """
     Service for adding tajweed (diacritics) to Arabic text.
     Uses Mishkal library for automatic diacritization.
+    
+    Mishkal is slow, so it only runs on a true miss of the cheaper tiers:
+    verbatim Qur'an text is looked up in the corpus (its diacritization is
+    fixed), then earlier Mishkal results are reused per sentence and, when
+    every word has been seen, per word.
     """
     
-    def __init__(self):
+    def __init__(self, corpus: Optional[QuranCorpus] = None):
         self.mishkal = None
         try:
             from mishkal.tashkeel import TashkeelClass
@@ -15,6 +56,16 @@ class TajweedService:
         except ImportError:
             print("Warning: Mishkal not available. Tajweed will use fallback method.")
             self.available = False
+        
+        # Word lexicon for the fallback, loaded once
+        self.lexicon = TajweedLexicon.load(os.getenv("TAJWEED_LEXICON", DEFAULT_LEXICON_PATH))
+        
+        # Tier 1: diacritized corpus; tier 2: past Mishkal results
+        self.corpus = corpus
+        self.sentence_cache = _LRUCache(int(os.getenv("TAJWEED_SENTENCE_CACHE_SIZE", "2048")))
+        self.word_cache = _LRUCache(int(os.getenv("TAJWEED_WORD_CACHE_SIZE", "20000")))
+        self._hits = {tier: 0 for tier in TIERS}
+        self._hits_lock = threading.Lock()
     
     def add_tajweed(self, text: str) -> str:
         """
@@ -28,91 +79,101 @@ class TajweedService:
         """
         if not text or not text.strip():
             return text
-        
+    
         # Remove existing diacritics first
         text = self._remove_diacritics(text)
-        
+        if not text.strip():
+            # Only diacritics: nothing to diacritize, and no tier to count
+            return text
+    
+        diacritized = self.lookup(text)
+        if diacritized is not None:
+            return diacritized
+        tier, diacritized = self.diacritize(text)
+        self.remember(text, tier, diacritized)
+        return diacritized
+    
+    def lookup(self, text: str) -> Optional[str]:
+        """
+        Answer from the cheap tiers (corpus, sentence cache, word cache)
+        and count the hit, or return None on a miss.
+    
+        Args:
+            text: Arabic text already stripped of diacritics
+        """
+        if self.corpus is not None:
+            diacritized = self.corpus.diacritize(normalize(text, "standard").split())
+            if diacritized is not None:
+                self._record("corpus")
+                return diacritized
+    
+        if self.available and self.mishkal:
+            diacritized = self.sentence_cache.get(text)
+            if diacritized is not None:
+                self._record("sentence_cache")
+                return diacritized
+    
+            cached_words = [self.word_cache.get(word) for word in text.split()]
+            if cached_words and all(cached_words):
+                self._record("word_cache")
+                return " ".join(cached_words)
+        return None
+    
+    def diacritize(self, text: str) -> Tuple[str, str]:
+        """
+        Diacritize a lookup miss with Mishkal, or the lexicon fallback when
+        Mishkal is unavailable or fails. Touches no shared state, so it can
+        run in a worker process (see tajweed_pool).
+    
+        Returns:
+            (tier, diacritized text), tier being "mishkal" or "fallback"
+        """
         if self.available and self.mishkal:
             try:
                 # Use Mishkal for diacritization
-                diacritized = self.mishkal.tashkeel(text)
-                return diacritized
+                return "mishkal", self.mishkal.tashkeel(text)
             except Exception as e:
                 print(f"Error in Mishkal diacritization: {e}")
-                return self._fallback_tajweed(text)
-        else:
-            return self._fallback_tajweed(text)
+        return "fallback", self._fallback_tajweed(text)
+    
+    def remember(self, text: str, tier: str, diacritized: str) -> None:
+        """Count a diacritize result and cache it when Mishkal produced it."""
+        self._record(tier)
+        if tier != "mishkal":
+            return
+        self.sentence_cache.set(text, diacritized)
+        words = text.split()
+        diacritized_words = diacritized.split()
+        if len(diacritized_words) == len(words):
+            for word, diacritized_word in zip(words, diacritized_words):
+                self.word_cache.set(word, diacritized_word)
+    
+    def _record(self, tier: str) -> None:
+        with self._hits_lock:
+            self._hits[tier] += 1
+    
+    def stats(self) -> Dict:
+        """Requests answered by each tier and the cache sizes."""
+        with self._hits_lock:
+            hits = dict(self._hits)
+        requests = sum(hits.values())
+        return {
+            "requests": requests,
+            "hits": hits,
+            "hit_rates": {tier: round(count / requests, 4) if requests else 0.0 for tier, count in hits.items()},
+            "corpus_loaded": self.corpus is not None,
+            "mishkal_available": self.available,
+            "sentence_cache_entries": len(self.sentence_cache),
+            "word_cache_entries": len(self.word_cache),
+        }
     
     def _remove_diacritics(self, text: str) -> str:
-        """Remove existing diacritics from text."""
-        diacritics = "ًٌٍَُِّْٰۖۗۘۙۚۛۜ"
-        return "".join(char for char in text if char not in diacritics)
+        """Remove existing diacritics from text, keeping the spelling intact."""
+        return normalize(text, "diacritics")
     
     def _fallback_tajweed(self, text: str) -> str:
         """
-        Fallback method: Add basic common diacritics based on patterns.
-        This is a simplified version - Mishkal provides better results.
+        Fallback method: look up each whole word in the tajweed lexicon.
+        This covers only the lexicon's vocabulary - Mishkal provides better results.
         """
-        # Common patterns for basic tajweed
-        # This is a very basic implementation
-        # For production, use Mishkal or a proper tajweed API
-        
-        # Common word patterns with diacritics
-        patterns = {
-            "بسم": "بِسْمِ",
-            "الله": "اللَّهِ",
-            "الرحمن": "الرَّحْمَٰنِ",
-            "الرحيم": "الرَّحِيمِ",
-            "الحمد": "الْحَمْدُ",
-            "رب": "رَبِّ",
-            "العالمين": "الْعَالَمِينَ",
-            "مالك": "مَالِكِ",
-            "يوم": "يَوْمِ",
-            "الدين": "الدِّينِ",
-            "إياك": "إِيَّاكَ",
-            "نعبد": "نَعْبُدُ",
-            "نستعين": "نَسْتَعِينُ",
-            "اهدنا": "اهْدِنَا",
-            "الصراط": "الصِّرَاطَ",
-            "المستقيم": "الْمُسْتَقِيمَ",
-            "صراط": "صِرَاطَ",
-            "الذين": "الَّذِينَ",
-            "أنعمت": "أَنْعَمْتَ",
-            "عليهم": "عَلَيْهِمْ",
-            "غير": "غَيْرِ",
-            "المغضوب": "الْمَغْضُوبِ",
-            "عليهم": "عَلَيْهِمْ",
-            "ولا": "وَلَا",
-            "الضالين": "الضَّالِّينَ",
-            "قل": "قُلْ",
-            "هو": "هُوَ",
-            "أحد": "أَحَدٌ",
-            "الصمد": "الصَّمَدُ",
-            "لم": "لَمْ",
-            "يلد": "يَلِدْ",
-            "يولد": "يُولَدْ",
-            "ولم": "وَلَمْ",
-            "يكن": "يَكُنْ",
-            "له": "لَهُ",
-            "كفوا": "كُفُوًا",
-            "أعوذ": "أَعُوذُ",
-            "برب": "بِرَبِّ",
-            "الفلق": "الْفَلَقِ",
-            "من": "مِنْ",
-            "شر": "شَرِّ",
-            "ما": "مَا",
-            "خلق": "خَلَقَ",
-            "الناس": "النَّاسِ",
-            "ملك": "مَلِكِ",
-            "إله": "إِلَٰهِ",
-        }
-        
-        # Try to match patterns
-        result = text
-        for pattern, diacritized in patterns.items():
-            if pattern in result:
-                # Simple replacement (this is basic - proper implementation needs word boundaries)
-                result = result.replace(pattern, diacritized)
-        
-        return result if result != text else text
-
+        return self.lexicon.apply(text)
@@ -0,0 +1,214 @@
+"""
+Precomputed tajweed rule spans for every ayah of the corpus.
+
+The rule engine (tajweed_rules) is run once over the corpus and its spans
+are written to a flat binary file that is memory-mapped at startup:
+
+    header   magic, format version, RULES_VERSION, ayah count, corpus CRC-32
+    offsets  ayah count + 1 uint32: first span record of each ayah
+    records  5 bytes per span: uint16 start, uint16 end, uint8 rule id
+
+Spans of ayah i are records[offsets[i]:offsets[i + 1]], so a lookup is two
+reads regardless of corpus size, and the pages are shared between worker
+processes. The file is rebuilt when the rules or the corpus change:
+
+    python -m app.services.tajweed_span_index data/quran.db data/tajweed_spans.bin
+"""
+import argparse
+import mmap
+import os
+import struct
+import tempfile
+import time
+import zlib
+from typing import Dict, List, Optional
+
+from app.services.arabic_normalizer import normalize
+from app.services.quran_corpus import QuranCorpus
+from app.services.tajweed_rules import RULES, RULES_VERSION, Span, find_rules
+
+MAGIC = b"TJSP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sHHII")
+OFFSET = struct.Struct("<I")
+RECORD = struct.Struct("<HHB")
+
+
+class SpanIndexStaleError(ValueError):
+    """Raised when a span index was built by other rules or from another corpus."""
+
+
+def corpus_checksum(corpus: QuranCorpus) -> int:
+    checksum = 0
+    for text in corpus.texts:
+        checksum = zlib.crc32(text.encode("utf-8") + b"\n", checksum)
+    return checksum
+
+
+def build_span_index(corpus: QuranCorpus, path: str) -> int:
+    """
+    Run the rule engine over every ayah and write the span index.
+
+    Returns:
+        Number of spans written
+    """
+    offsets = [0]
+    records = bytearray()
+    for text in corpus.texts:
+        for start, end, rule in find_rules(text):
+            records += RECORD.pack(start, end, RULES.index(rule))
+        offsets.append(len(records) // RECORD.size)
+
+    # Written next to the target and renamed, so readers never map a partial
+    # file; the name is unique so workers building at once do not collide
+    with tempfile.NamedTemporaryFile(dir=os.path.dirname(os.path.abspath(path)), prefix=".tajweed_spans.",
+                                     delete=False) as out:
+        try:
+            out.write(HEADER.pack(MAGIC, FORMAT_VERSION, RULES_VERSION, len(corpus), corpus_checksum(corpus)))
+            out.write(struct.pack(f"<{len(offsets)}I", *offsets))
+            out.write(records)
+        except BaseException:
+            out.close()
+            os.unlink(out.name)
+            raise
+    # NamedTemporaryFile is private to its owner; the index is not
+    os.chmod(out.name, 0o644)
+    os.replace(out.name, path)
+    return offsets[-1]
+
+
+class TajweedSpanIndex:
+    """Read-only, memory-mapped view of a span index file."""
+
+    def __init__(self, path: str, corpus: Optional[QuranCorpus] = None):
+        """
+        Raises:
+            FileNotFoundError: if the file does not exist
+            SpanIndexStaleError: if it does not match the rules or the given corpus
+        """
+        self.path = path
+        with open(path, "rb") as source:
+            self._map = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, rules_version, count, checksum = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise SpanIndexStaleError(f"{path} is not a span index of format {FORMAT_VERSION}")
+            if rules_version != RULES_VERSION:
+                raise SpanIndexStaleError(f"{path} was built by rules version {rules_version}, not {RULES_VERSION}")
+            if corpus is not None and (count != len(corpus) or checksum != corpus_checksum(corpus)):
+                raise SpanIndexStaleError(f"{path} was built from a different corpus")
+        except (SpanIndexStaleError, struct.error):
+            self._map.close()
+            raise
+        self.count = count
+        self._records = HEADER.size + (count + 1) * OFFSET.size
+
+    def __len__(self) -> int:
+        return self.count
+
+    def spans(self, ayah_index: int) -> List[Span]:
+        """Spans of the ayah at ayah_index (mushaf order, as in QuranCorpus)."""
+        if not 0 <= ayah_index < self.count:
+            raise IndexError(ayah_index)
+        first, last = struct.unpack_from("<II", self._map, HEADER.size + ayah_index * OFFSET.size)
+        data = self._map[self._records + first * RECORD.size:self._records + last * RECORD.size]
+        return [(start, end, RULES[rule]) for start, end, rule in RECORD.iter_unpack(data)]
+
+    def close(self) -> None:
+        self._map.close()
+
+
+def load_span_index(corpus: QuranCorpus, path: str) -> TajweedSpanIndex:
+    """Open the span index at path, building it first when missing or stale."""
+    try:
+        return TajweedSpanIndex(path, corpus)
+    except (FileNotFoundError, SpanIndexStaleError) as e:
+        print(f"[TajweedSpanIndex] Building {path} ({e})")
+    started = time.perf_counter()
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    count = build_span_index(corpus, path)
+    print(f"[TajweedSpanIndex] Wrote {count} spans for {len(corpus)} ayat in {(time.perf_counter() - started) * 1000:.1f}ms")
+    return TajweedSpanIndex(path, corpus)
+
+
+class TajweedRulesService:
+    """
+    Tajweed rule spans for verses and arbitrary text.
+
+    Verbatim Qur'an text (whole ayat) is answered from the span index with
+    the corpus's diacritized text; anything else is run through the rule
+    engine on demand.
+    """
+
+    def __init__(self, corpus: Optional[QuranCorpus] = None, index: Optional[TajweedSpanIndex] = None):
+        self.corpus = corpus
+        self.index = index if corpus is not None else None
+
+    def annotate(self, text: str) -> Dict:
+        """
+        Returns:
+            Dict with the 'text' the spans refer to, 'spans' and 'source'
+            ("index" for whole ayat, "computed" otherwise)
+        """
+        if self.index is not None:
+            ayat = self.corpus.match_ayat(normalize(text, "standard").split())
+            if ayat is not None:
+                return self._from_index(ayat)
+        return {"text": text, "spans": self._as_dicts(find_rules(text)), "source": "computed"}
+
+    def annotate_reference(self, reference: str) -> Dict:
+        """
+        Spans of the corpus passage for a reference such as "2:255" or "1:1-7".
+        Needs the corpus.
+
+        Raises:
+            VerseReferenceError: if the reference is malformed or not in the corpus
+        """
+        passage = self.corpus.lookup(reference)
+        start = self.corpus.surah_offsets[passage["surah"]] + passage["first_ayah"] - 1
+        ayat = range(start, start + passage["last_ayah"] - passage["first_ayah"] + 1)
+        if self.index is None:
+            # No index: run the engine per ayah, exactly as the index was built
+            return self._join(ayat, lambda index: find_rules(self.corpus.texts[index]), "computed", passage["reference"])
+        return self._from_index(ayat, passage["reference"])
+
+    def _from_index(self, ayat, reference: str = "") -> Dict:
+        return self._join(ayat, self.index.spans, "index", reference)
+
+    def _join(self, ayat, spans_of, source: str, reference: str = "") -> Dict:
+        # Each ayah ends with a stop, so ayat are annotated separately and
+        # their spans shifted to the joined text
+        spans = []
+        offset = 0
+        texts = []
+        for index in ayat:
+            text = self.corpus.texts[index]
+            spans.extend((start + offset, end + offset, rule) for start, end, rule in spans_of(index))
+            texts.append(text)
+            offset += len(text) + 1
+        result = {"text": " ".join(texts), "spans": self._as_dicts(spans), "source": source}
+        if reference:
+            result["reference"] = reference
+        return result
+
+    @staticmethod
+    def _as_dicts(spans: List[Span]) -> List[Dict]:
+        return [{"start": start, "end": end, "rule": rule} for start, end, rule in spans]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute tajweed rule spans for the Qur'an corpus.")
+    parser.add_argument("db", nargs="?", default=os.getenv("QURAN_CORPUS_DB", "data/quran.db"))
+    parser.add_argument("out", nargs="?", default=os.getenv("TAJWEED_SPAN_INDEX", "data/tajweed_spans.bin"))
+    args = parser.parse_args()
+
+    corpus = QuranCorpus(args.db)
+    started = time.perf_counter()
+    count = build_span_index(corpus, args.out)
+    print(f"Wrote {count} spans for {len(corpus)} ayat to {args.out} "
+          f"({os.path.getsize(args.out)} bytes) in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
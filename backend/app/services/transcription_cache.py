@@ -0,0 +1,124 @@
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+class TranscriptionCache:
+    """
+    Content-addressed cache for transcription results.
+
+    Entries are keyed by a hash of the audio bytes plus everything that can
+    change the output (model, decoding options, prompt, tajweed setting).
+    The memory tier is an LRU bounded by entry count and TTL; the optional
+    SQLite tier survives restarts and refills the memory tier on hits.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 86400.0,
+                 db_path: Optional[str] = None):
+        self.max_entries = max(0, max_entries)
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path or None
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._db = None
+
+        if self.db_path:
+            try:
+                self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS transcriptions ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+                )
+                self._db.execute(
+                    "DELETE FROM transcriptions WHERE created_at < ?",
+                    (time.time() - self.ttl_seconds,)
+                )
+                self._db.commit()
+                print(f"[TranscriptionCache] Disk tier enabled at {self.db_path}")
+            except sqlite3.Error as e:
+                print(f"[TranscriptionCache] Warning: disk tier disabled: {e}")
+                self._db = None
+
+    @staticmethod
+    def make_key(audio_bytes: bytes, **params) -> str:
+        """Build a cache key from the audio content and output-affecting params."""
+        digest = hashlib.sha256(audio_bytes)
+        digest.update(json.dumps(params, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a cached result, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                created_at, value = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._memory_hits += 1
+                    return copy.deepcopy(value)
+                del self._entries[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM transcriptions WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] <= self.ttl_seconds:
+                    value = json.loads(row[0])
+                    self._store_in_memory(key, value, row[1])
+                    self._disk_hits += 1
+                    return copy.deepcopy(value)
+
+            self._misses += 1
+            return None
+
+    def set(self, key: str, value: Dict) -> None:
+        """Store a result in both tiers."""
+        now = time.time()
+        with self._lock:
+            # Deep copies both ways: callers mutate responses (words, metadata)
+            self._store_in_memory(key, copy.deepcopy(value), now)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO transcriptions (key, value, created_at) VALUES (?, ?, ?)",
+                        (key, json.dumps(value, ensure_ascii=False), now)
+                    )
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"[TranscriptionCache] Warning: could not persist entry: {e}")
+
+    def _store_in_memory(self, key: str, value: Dict, created_at: float) -> None:
+        if self.max_entries == 0:
+            return
+        self._entries[key] = (created_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def stats(self) -> Dict:
+        """Return hit/miss counters per tier."""
+        with self._lock:
+            hits = self._memory_hits + self._disk_hits
+            lookups = hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_tier": self._db is not None,
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
@@ -1,91 +1,152 @@
+import asyncio
 import os
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Try to import whisper, but make it optional
-try:
-    import whisper
-    WHISPER_AVAILABLE = True
-except ImportError:
-    WHISPER_AVAILABLE = False
-    whisper = None
-
 # Import tajweed service
 from app.services.tajweed_service import TajweedService
+from app.services.tajweed_pool import TajweedPool
+from app.services.inference_pool import (
+    InferencePool,
+    InferenceQueueFullError,
+    InferenceTimeoutError,
+)
+from app.services.micro_batcher import MicroBatcher
+from app.services.transcription_cache import TranscriptionCache
+from app.services.audio_decoder import SAMPLE_RATE, decode_audio, detect_audio_format
+from app.services.vad import EnergyVAD
+from app.services.asr_engines import EngineUnavailableError, create_engine, load_engine
+
+# Arabic context prompt that helps Whisper recognise Qur'anic recitation
+WHISPER_INITIAL_PROMPT = "بِسْمِ اللَّهِ الرَّحْمَٰنِ الرَّحِيمِ الْحَمْدُ لِلَّهِ رَبِّ الْعَالَمِينَ الرَّحْمَٰنِ الرَّحِيمِ مَالِكِ يَوْمِ الدِّينِ"
+
+# fast: greedy only; accurate: beam search; adaptive: greedy, then beam
+# search only when the greedy result's quality signals are poor
+DECODING_MODES = ("fast", "adaptive", "accurate")
 
 class TranscriptionService:
     """
     Service for transcribing audio to text.
-    Can use OpenAI Whisper or mock implementation.
+    Uses the ASR engine selected by ASR_ENGINE (OpenAI Whisper by default)
+    or a mock implementation when no engine can be loaded.
     """
     
-    def __init__(self):
+    def __init__(self, tajweed_service: Optional[TajweedService] = None,
+                 tajweed_pool: Optional[TajweedPool] = None):
         # HARDCODED FOR TESTING - force Whisper to be used
         self.use_whisper = True  # HARDCODED: os.getenv("USE_WHISPER", "false").lower() == "true"
         self.add_tajweed = os.getenv("ADD_TAJWEED", "true").lower() == "true"
         print(f"[TranscriptionService.__init__] HARDCODED use_whisper=True")
-        self.model = None
-        self.tajweed_service = TajweedService()
+        self.engine = None
+        self.model_name = None
+        # Share the app-wide TajweedService when given one
+        self.tajweed_service = tajweed_service or TajweedService()
+        # Mishkal runs in worker processes when given a pool, otherwise in a thread
+        self.tajweed_pool = tajweed_pool
+        # Resubmitted recordings are answered from here instead of re-running Whisper
+        self.cache = TranscriptionCache(
+            max_entries=int(os.getenv("TRANSCRIPTION_CACHE_SIZE", "512")),
+            ttl_seconds=float(os.getenv("TRANSCRIPTION_CACHE_TTL", "86400")),
+            db_path=os.getenv("TRANSCRIPTION_CACHE_DB", ""),
+        )
+        # Silence is trimmed before inference; silence-only uploads never reach the model
+        self.vad = None
+        if os.getenv("VAD_ENABLED", "true").lower() == "true":
+            self.vad = EnergyVAD(max_pause_ms=int(os.getenv("VAD_MAX_PAUSE_MS", "700")))
+        # Adaptive decoding escalates from greedy to beam search on poor quality signals
+        self.decoding_mode = os.getenv("WHISPER_DECODING_MODE", "adaptive")
+        if self.decoding_mode not in DECODING_MODES:
+            print(f"Warning: unknown WHISPER_DECODING_MODE '{self.decoding_mode}', using 'accurate'")
+            self.decoding_mode = "accurate"
+        self.escalation_thresholds = {
+            "avg_logprob": float(os.getenv("ADAPTIVE_LOGPROB_THRESHOLD", "-1.0")),
+            "compression_ratio": float(os.getenv("ADAPTIVE_COMPRESSION_THRESHOLD", "2.4")),
+            "no_speech_prob": float(os.getenv("ADAPTIVE_NO_SPEECH_THRESHOLD", "0.6")),
+        }
+        self.decoding_counts = {mode: 0 for mode in DECODING_MODES}
+        self.decoding_counts["escalations"] = 0
+        # Whisper runs on a bounded pool so it never blocks the event loop
+        self.inference_pool = InferencePool(
+            max_workers=int(os.getenv("WHISPER_WORKERS", "1")),
+            max_queue=int(os.getenv("WHISPER_QUEUE_SIZE", "8")),
+            job_timeout=float(os.getenv("WHISPER_JOB_TIMEOUT", "120")),
+            name="whisper",
+        )
+        # Concurrent short recordings are decoded together in one padded batch
+        self.batcher = MicroBatcher(
+            self._decode_batch,
+            max_batch_size=int(os.getenv("WHISPER_BATCH_SIZE", "8")),
+            max_wait_ms=float(os.getenv("WHISPER_BATCH_WAIT_MS", "10")),
+        )
         
-        if self.use_whisper and WHISPER_AVAILABLE:
+        if self.use_whisper:
             try:
-                # Load Whisper model - using "small" for better balance
-                # Options: tiny, base, small, medium, large
-                # Start with "small" - can upgrade to "medium" later if needed
-                model_name = os.getenv("WHISPER_MODEL", "small")  # Allow override via env
-                print(f"[Whisper] ========================================")
-                print(f"[Whisper] Attempting to load Whisper model: {model_name}")
-                print(f"[Whisper] USE_WHISPER env: {os.getenv('USE_WHISPER', 'NOT SET')}")
-                try:
-                    self.model = whisper.load_model(model_name)
-                    print(f"[Whisper] ✅ Model '{model_name}' loaded successfully!")
-                    print(f"[Whisper] ========================================")
-                except Exception as load_error:
-                    print(f"[Whisper] ❌ ERROR loading model '{model_name}': {load_error}")
-                    print(f"[Whisper] Trying 'small' model as fallback...")
-                    try:
-                        self.model = whisper.load_model("small")
-                        print(f"[Whisper] ✅ Fallback to 'small' model successful!")
-                        print(f"[Whisper] ========================================")
-                    except Exception as fallback_error:
-                        print(f"[Whisper] ❌ Fallback also failed: {fallback_error}")
-                        print(f"[Whisper] Falling back to mock transcription")
-                        print(f"[Whisper] ========================================")
-                        raise load_error
+                # Engine and model are chosen via ASR_ENGINE / WHISPER_MODEL
+                # Models: tiny, base, small, medium, large ("small" is a good balance)
+                engine = create_engine()
+                print(f"[ASR] ========================================")
+                print(f"[ASR] Attempting to load engine '{engine.name}' with model: {engine.model_name}")
+                print(f"[ASR] USE_WHISPER env: {os.getenv('USE_WHISPER', 'NOT SET')}")
+                engine = load_engine(engine)
+                self.engine = engine
+                self.model_name = engine.model_name
+                print(f"[ASR] ✅ Engine '{engine.name}' ready with model '{engine.model_name}'")
+                print(f"[ASR] ========================================")
+            except EngineUnavailableError as e:
+                print(f"Warning: ASR engine is not available ({e})")
+                print("Falling back to mock transcription")
+                self.use_whisper = False
             except Exception as e:
-                print(f"[Whisper] ❌ CRITICAL: Could not load Whisper model: {e}")
-                print(f"[Whisper] Error type: {type(e).__name__}")
+                print(f"[ASR] ❌ CRITICAL: Could not load ASR engine: {e}")
+                print(f"[ASR] Error type: {type(e).__name__}")
                 import traceback
                 traceback.print_exc()
-                print("[Whisper] Falling back to mock transcription")
+                print("[ASR] Falling back to mock transcription")
                 self.use_whisper = False
-                self.model = None
-        elif self.use_whisper and not WHISPER_AVAILABLE:
-            print("Warning: Whisper is not available (not installed or incompatible)")
-            print("Falling back to mock transcription")
-            self.use_whisper = False
     
-    async def transcribe(self, audio_bytes: bytes, filename: str = None) -> Dict:
+    @property
+    def model(self):
+        """The loaded engine's underlying model, or None in mock mode."""
+        return self.engine.model if self.engine is not None else None
+    
+    async def transcribe(self, audio_bytes: bytes, filename: str = None,
+                         decoding_mode: Optional[str] = None, postprocess: bool = True) -> Dict:
         """
         Transcribe audio bytes to text.
         
         Args:
             audio_bytes: Audio file content as bytes
             filename: Optional filename for reference
+            decoding_mode: "fast", "adaptive" or "accurate" (defaults to WHISPER_DECODING_MODE)
+            postprocess: Apply tajweed to the text; callers that run
+                postprocess themselves pass False
             
         Returns:
-            Dict with 'text' and optional 'confidence'
+            Dict with 'text', optional 'confidence' and 'cached'
+            
+        Raises:
+            ValueError: for an unknown decoding_mode
         """
+        decoding_mode = decoding_mode or self.decoding_mode
+        if decoding_mode not in DECODING_MODES:
+            raise ValueError(f"Unknown decoding mode '{decoding_mode}'. Choose one of: {', '.join(DECODING_MODES)}")
         print(f"[TranscriptionService] ========================================")
         print(f"[TranscriptionService] use_whisper={self.use_whisper}, model={self.model is not None}")
+        cache_key = None
         if self.use_whisper and self.model:
-            print("[TranscriptionService] ✅ Using Whisper for transcription")
-            result = await self._transcribe_with_whisper(audio_bytes, filename)
+            cache_key = self._cache_key(audio_bytes, decoding_mode, postprocess)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                print("[TranscriptionService] ✅ Returning cached transcription")
+                cached["cached"] = True
+                return cached
+            print(f"[TranscriptionService] ✅ Using ASR engine '{self.engine.name}' for transcription")
+            result = await self._transcribe_with_engine(audio_bytes, filename, decoding_mode)
         else:
-            print("[TranscriptionService] ⚠️  Using MOCK transcription (Whisper not available)")
+            print("[TranscriptionService] ⚠️  Using MOCK transcription (ASR engine not available)")
             if not self.use_whisper:
                 print("[TranscriptionService] Reason: use_whisper is False")
             if not self.model:
@@ -93,105 +154,278 @@ class TranscriptionService:
             result = await self._transcribe_mock(audio_bytes, filename)
         print(f"[TranscriptionService] ========================================")
         
-        # Add tajweed if enabled
-        if self.add_tajweed and result.get("text"):
-            original_text = result["text"]
-            tajweed_text = self.tajweed_service.add_tajweed(original_text)
-            result["text"] = tajweed_text
-            result["original_text"] = original_text  # Keep original for reference
+        if postprocess:
+            result.update(await self.postprocess(result.get("text", "")))
+        
+        # Mock output produced after a Whisper failure must not be cached
+        if cache_key is not None and not result.pop("fallback", False):
+            self.cache.set(cache_key, result)
+        result["cached"] = False
         
         return result
     
-    async def _transcribe_with_whisper(self, audio_bytes: bytes, filename: str) -> Dict:
-        """Transcribe using OpenAI Whisper."""
-        import tempfile
-        
-        # Determine file extension from filename or content
-        file_ext = ".wav"
-        if filename:
-            if filename.endswith('.m4a'):
-                file_ext = ".m4a"
-            elif filename.endswith('.mp3'):
-                file_ext = ".mp3"
-            elif filename.endswith('.wav'):
-                file_ext = ".wav"
-        
-        # If no extension, try to detect from content
-        if not filename or '.' not in filename:
-            # Check for common audio file signatures
-            if audio_bytes[:4] == b'ftyp' or (len(audio_bytes) > 4 and audio_bytes[4:8] == b'ftyp'):
-                file_ext = ".m4a"  # MP4/M4A container
-                print(f"[Whisper] Detected M4A format from content")
-            elif audio_bytes[:4] == b'RIFF':
-                file_ext = ".wav"
-                print(f"[Whisper] Detected WAV format from content")
-            elif audio_bytes[:3] == b'ID3' or (len(audio_bytes) > 1 and audio_bytes[:2] == b'\xff\xfb'):
-                file_ext = ".mp3"
-                print(f"[Whisper] Detected MP3 format from content")
+    def warm_up(self) -> None:
+        """
+        Run one short inference on synthetic audio so kernels, allocators and
+        tajweed resources are initialised before real traffic arrives.
+        """
+        if self.use_whisper and self.model:
+            import numpy as np
+            
+            # One second of faint noise: enough to exercise encoder and decoder
+            rng = np.random.default_rng(0)
+            audio = (rng.standard_normal(SAMPLE_RATE) * 0.01).astype(np.float32)
+            options = self._transcribe_options(self.decoding_mode)
+            options["verbose"] = None
+            self.engine.transcribe(audio, options)
+        if self.add_tajweed:
+            self.tajweed_service.add_tajweed("بسم الله الرحمن الرحيم")
+    
+    async def transcribe_segment(self, audio) -> Dict:
+        """
+        Transcribe one already-decoded utterance without post-processing.
+        Used by streaming transcription, which post-processes the stitched text.
         
-        print(f"[Whisper] Using file extension: {file_ext}")
+        Args:
+            audio: 16 kHz mono float32 numpy array
+            
+        Returns:
+            Dict with raw 'text' and 'confidence'
+        """
+        if self.use_whisper and self.model:
+            result = await self._run_engine(audio, self.decoding_mode)
+            return {"text": result["text"].strip(), "confidence": 0.95}
+        return await self._transcribe_mock(audio.tobytes(), None)
+    
+    async def postprocess(self, text: str) -> Dict:
+        """
+        postprocess_text without blocking the event loop: tajweed runs on the
+        tajweed pool's workers, or in a thread when there is no pool.
+        """
+        if not (self.add_tajweed and text):
+            return {"text": text}
+        if self.tajweed_pool is not None:
+            try:
+                return {"text": await self.tajweed_pool.add_tajweed(text), "original_text": text}
+            except Exception as e:
+                print(f"[TranscriptionService] Tajweed pool failed, diacritizing in a thread: {e}")
+        return await asyncio.to_thread(self.postprocess_text, text)
+    
+    def postprocess_text(self, text: str) -> Dict:
+        """
+        Apply the configured post-processing (tajweed) to transcribed text.
         
-        # Save audio bytes to temporary file with correct extension
-        with tempfile.NamedTemporaryFile(delete=False, suffix=file_ext) as tmp_file:
-            tmp_file.write(audio_bytes)
-            tmp_path = tmp_file.name
-            print(f"[Whisper] Wrote {len(audio_bytes)} bytes to {tmp_path}")
+        Returns:
+            Dict with final 'text' and, when tajweed was applied, 'original_text'
+        """
+        # Add tajweed if enabled
+        if self.add_tajweed and text:
+            tajweed_text = self.tajweed_service.add_tajweed(text)
+            return {
+                "text": tajweed_text,
+                "original_text": text  # Keep original for reference
+            }
+        return {"text": text}
+    
+    def _cache_key(self, audio_bytes: bytes, decoding_mode: str, postprocess: bool = True) -> str:
+        """Cache key covering the audio and every setting that changes the output."""
+        options = self._transcribe_options(decoding_mode)
+        options.pop("verbose", None)
+        return TranscriptionCache.make_key(
+            audio_bytes,
+            model=self.model_name,
+            engine=self.engine.name if self.engine else None,
+            decoding_mode=decoding_mode,
+            escalation_thresholds=self.escalation_thresholds if decoding_mode == "adaptive" else None,
+            options=options,
+            batched=self.batcher.max_batch_size > 1,
+            vad_max_pause_ms=self.vad.max_pause_ms if self.vad else None,
+            add_tajweed=self.add_tajweed and postprocess,
+        )
+    
+    async def _transcribe_with_engine(self, audio_bytes: bytes, filename: str, decoding_mode: str) -> Dict:
+        """Transcribe using the loaded ASR engine."""
+        # Extension and magic bytes decide how the upload is decoded
+        format_hint = detect_audio_format(audio_bytes, filename)
+        print(f"[ASR] Using format hint: {format_hint}")
         
         try:
-            print(f"[Whisper] ========================================")
-            print(f"[Whisper] Starting transcription...")
-            print(f"[Whisper] Audio file: {filename}")
-            print(f"[Whisper] Audio size: {len(audio_bytes)} bytes")
-            print(f"[Whisper] Temp file: {tmp_path}")
+            print(f"[ASR] ========================================")
+            print(f"[ASR] Starting transcription...")
+            print(f"[ASR] Audio file: {filename}")
+            print(f"[ASR] Audio size: {len(audio_bytes)} bytes")
+            
+            # Decoding and VAD scale with the clip length; keep them off the event loop
+            audio, vad_stats = await asyncio.to_thread(self._decode_and_trim, audio_bytes, format_hint)
+            if vad_stats is not None and not vad_stats["speech"]:
+                print(f"[ASR] ⚠️  No speech detected, skipping the model")
+                return {"text": "", "confidence": 0.0, "vad": vad_stats}
             
-            # Whisper can handle various audio formats including m4a
-            # Use task="transcribe" to ensure it transcribes (not translates)
-            # Use language="ar" for Arabic
-            # Use fp16=False for better compatibility
-            # Use initial_prompt to help with Arabic recognition
-            # Use temperature=0 for more deterministic results
-            # Use beam_size=5 for better accuracy (default is 5)
-            # Use condition_on_previous_text=True for better context
-            result = self.model.transcribe(
-                tmp_path, 
-                language="ar",  # Arabic language
-                task="transcribe",  # Transcribe, not translate
-                fp16=False,  # Use float32 for better compatibility
-                verbose=True,  # More verbose for debugging
-                temperature=0.0,  # More deterministic (less random)
-                beam_size=5,  # Beam search for better accuracy
-                best_of=5,  # Try multiple decodings, pick best
-                condition_on_previous_text=True,  # Use previous text for context
-                initial_prompt="بِسْمِ اللَّهِ الرَّحْمَٰنِ الرَّحِيمِ الْحَمْدُ لِلَّهِ رَبِّ الْعَالَمِينَ الرَّحْمَٰنِ الرَّحِيمِ مَالِكِ يَوْمِ الدِّينِ"  # Longer prompt with more Arabic context
-            )
+            result = await self._run_engine(audio, decoding_mode)
             transcribed_text = result["text"].strip()
             
             # Log for debugging
-            print(f"[Whisper] ========================================")
-            print(f"[Whisper] Transcription result: {transcribed_text}")
-            print(f"[Whisper] Detected language: {result.get('language', 'unknown')}")
-            print(f"[Whisper] Language probability: {result.get('language_probability', 'N/A')}")
-            print(f"[Whisper] ========================================")
+            print(f"[ASR] ========================================")
+            print(f"[ASR] Transcription result: {transcribed_text}")
+            print(f"[ASR] Detected language: {result.get('language', 'unknown')}")
+            print(f"[ASR] Language probability: {result.get('language_probability', 'N/A')}")
+            print(f"[ASR] ========================================")
             
             # If transcription is empty or seems wrong, log warning
             if not transcribed_text or len(transcribed_text) < 2:
-                print(f"[Whisper] ⚠️  WARNING: Transcription seems empty or too short")
-                print(f"[Whisper] This might indicate audio quality issues")
+                print(f"[ASR] ⚠️  WARNING: Transcription seems empty or too short")
+                print(f"[ASR] This might indicate audio quality issues")
             
-            return {
+            response = {
                 "text": transcribed_text,
-                "confidence": 0.95  # Whisper doesn't provide confidence, using placeholder
+                "confidence": 0.95,  # Engines don't provide confidence, using placeholder
+                "decoding": {
+                    "mode": decoding_mode,
+                    "escalated": result.get("escalated", False)
+                }
             }
+            if vad_stats is not None:
+                response["vad"] = vad_stats
+            return response
+        except (InferenceQueueFullError, InferenceTimeoutError):
+            # Capacity problems are reported to the caller, not masked by mock output
+            raise
         except Exception as e:
-            print(f"[Whisper] ERROR: Transcription failed: {e}")
+            print(f"[ASR] ERROR: Transcription failed: {e}")
             import traceback
             traceback.print_exc()
             # Fall back to mock if Whisper fails
-            print(f"[Whisper] Falling back to mock transcription")
-            return await self._transcribe_mock(audio_bytes, filename)
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+            print(f"[ASR] Falling back to mock transcription")
+            result = await self._transcribe_mock(audio_bytes, filename)
+            result["fallback"] = True
+            return result
+    
+    def _decode_and_trim(self, audio_bytes: bytes, format_hint: str) -> Tuple:
+        """
+        Decode straight to a 16 kHz float32 array (no temp file round-trip)
+        and trim silence when VAD is enabled.
+        
+        Returns:
+            (audio, VAD stats or None)
+        """
+        audio = decode_audio(audio_bytes, format_hint)
+        print(f"[ASR] Decoded {len(audio) / SAMPLE_RATE:.2f}s of audio")
+        if self.vad is None:
+            return audio, None
+        audio, vad_stats = self.vad.trim(audio)
+        print(f"[ASR] VAD removed {vad_stats['removed_seconds']:.2f}s of silence")
+        return audio, vad_stats
+    
+    async def _run_engine(self, audio, decoding_mode: str) -> Dict:
+        """
+        Run the ASR engine on a decoded array in the given decoding mode.
+        Adaptive mode decodes greedily first and re-runs with beam search
+        only when the greedy result's quality signals are below threshold.
+        """
+        self.decoding_counts[decoding_mode] += 1
+        if decoding_mode != "adaptive":
+            return await self._run_engine_pass(audio, decoding_mode)
+        
+        result = await self._run_engine_pass(audio, "fast")
+        reasons = self._escalation_reasons(result)
+        if not reasons:
+            return result
+        
+        print(f"[ASR] Escalating to beam search: {', '.join(reasons)}")
+        self.decoding_counts["escalations"] += 1
+        result = await self._run_engine_pass(audio, "accurate")
+        result["escalated"] = True
+        return result
+    
+    async def _run_engine_pass(self, audio, decoding_mode: str) -> Dict:
+        """One engine call, batched with concurrent requests when enabled."""
+        if self.batcher.max_batch_size > 1:
+            return await self.batcher.submit((audio, decoding_mode))
+        return await self.inference_pool.run(
+            self.engine.transcribe, audio, self._transcribe_options(decoding_mode)
+        )
+    
+    def _escalation_reasons(self, result: Dict) -> List[str]:
+        """
+        Quality checks on a greedy result, using the worst segment's
+        average log-prob, compression ratio and no-speech probability.
+        Results without these signals (e.g. the fake engine) never escalate.
+        """
+        segments = result.get("segments") or [result]
+        logprobs = [s["avg_logprob"] for s in segments if s.get("avg_logprob") is not None]
+        ratios = [s["compression_ratio"] for s in segments if s.get("compression_ratio") is not None]
+        no_speech = [s["no_speech_prob"] for s in segments if s.get("no_speech_prob") is not None]
+        thresholds = self.escalation_thresholds
+        
+        reasons = []
+        if logprobs and min(logprobs) < thresholds["avg_logprob"]:
+            reasons.append(f"avg_logprob {min(logprobs):.2f}")
+        if ratios and max(ratios) > thresholds["compression_ratio"]:
+            reasons.append(f"compression_ratio {max(ratios):.2f}")
+        # Text decoded from what is probably silence is likely hallucinated
+        if no_speech and max(no_speech) > thresholds["no_speech_prob"] and result.get("text", "").strip():
+            reasons.append(f"no_speech_prob {max(no_speech):.2f}")
+        return reasons
+    
+    def decoding_stats(self) -> Dict:
+        """Requests per decoding mode and how often adaptive mode escalated."""
+        adaptive = self.decoding_counts["adaptive"]
+        return {
+            "default_mode": self.decoding_mode,
+            "requests": {mode: self.decoding_counts[mode] for mode in DECODING_MODES},
+            "escalations": self.decoding_counts["escalations"],
+            "escalation_rate": round(self.decoding_counts["escalations"] / adaptive, 4) if adaptive else 0.0,
+            "thresholds": self.escalation_thresholds,
+        }
+    
+    def _transcribe_options(self, decoding_mode: str = "accurate") -> Dict:
+        """
+        Options for a full recording, in openai-whisper transcribe() keywords.
+        "fast" decodes greedily; anything else uses beam search.
+        """
+        # Use task="transcribe" to ensure it transcribes (not translates)
+        # Use language="ar" for Arabic
+        # Use fp16=False for better compatibility
+        # Use initial_prompt to help with Arabic recognition
+        # Use temperature=0 for more deterministic results
+        # Use beam_size=5 for better accuracy (default is 5)
+        # Use condition_on_previous_text=True for better context
+        greedy = decoding_mode == "fast"
+        return {
+            "language": "ar",  # Arabic language
+            "task": "transcribe",  # Transcribe, not translate
+            "fp16": False,  # Use float32 for better compatibility
+            "verbose": True,  # More verbose for debugging
+            "temperature": 0.0,  # More deterministic (less random)
+            "beam_size": None if greedy else 5,  # Beam search for better accuracy
+            "best_of": None if greedy else 5,  # Try multiple decodings, pick best
+            "condition_on_previous_text": True,  # Use previous text for context
+            "initial_prompt": WHISPER_INITIAL_PROMPT,
+        }
+    
+    async def _decode_batch(self, items: List) -> List:
+        """
+        Run one batch of (audio, decoding_mode) items on the inference pool.
+        Items are grouped by mode so each group is a single engine call.
+        """
+        return await self.inference_pool.run(self._decode_batch_sync, items)
+    
+    def _decode_batch_sync(self, items: List) -> List:
+        results: List = [None] * len(items)
+        groups: Dict[str, List[int]] = {}
+        for i, (_, decoding_mode) in enumerate(items):
+            groups.setdefault(decoding_mode, []).append(i)
+        
+        for decoding_mode, indices in groups.items():
+            try:
+                decoded = self.engine.transcribe_batch(
+                    [items[i][0] for i in indices], self._transcribe_options(decoding_mode)
+                )
+            except Exception as e:
+                decoded = [e] * len(indices)
+            for i, result in zip(indices, decoded):
+                results[i] = result
+        return results
     
     async def _transcribe_mock(self, audio_bytes: bytes, filename: str) -> Dict:
         """
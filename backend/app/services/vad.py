@@ -0,0 +1,121 @@
+from typing import Dict, Tuple
+
+# numpy ships with Whisper; VAD only runs on decoded audio
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+    np = None
+
+from app.services.audio_decoder import SAMPLE_RATE
+
+
+def frame_levels_db(audio, frame_samples: int):
+    """
+    RMS level of consecutive non-overlapping frames, in dBFS.
+    A trailing partial frame is ignored.
+    """
+    usable = len(audio) - len(audio) % frame_samples
+    frames = audio[:usable].reshape(-1, frame_samples)
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    return 20.0 * np.log10(rms + 1e-10)
+
+
+class EnergyVAD:
+    """
+    Cheap energy-based voice activity detection for whole recordings.
+
+    A frame is speech when its level is above both min_threshold_db and the
+    recording's noise floor (10th percentile level) plus margin_db; the
+    threshold never exceeds the peak level minus margin_db, so recordings
+    without any pause are kept whole. Speech
+    bursts shorter than min_speech_ms are treated as clicks. Leading and
+    trailing silence is cut (keeping padding_ms around speech) and internal
+    pauses longer than max_pause_ms are shortened to max_pause_ms.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, frame_ms: int = 30,
+                 min_threshold_db: float = -45.0, margin_db: float = 12.0,
+                 min_speech_ms: int = 90, padding_ms: int = 200,
+                 max_pause_ms: int = 700):
+        self.sample_rate = sample_rate
+        self.frame_ms = frame_ms
+        self.frame_samples = int(sample_rate * frame_ms / 1000)
+        self.min_threshold_db = min_threshold_db
+        self.margin_db = margin_db
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.padding_frames = padding_ms // frame_ms
+        self.max_pause_ms = max_pause_ms
+        self.max_pause_frames = max(1, max_pause_ms // frame_ms)
+
+    def trim(self, audio) -> Tuple["np.ndarray", Dict]:
+        """
+        Remove silence from a float32 recording.
+
+        Returns:
+            (trimmed audio, stats) where stats has original/kept/removed
+            seconds and 'speech' (False when the recording is silence only)
+        """
+        original_seconds = len(audio) / self.sample_rate
+        levels = frame_levels_db(audio, self.frame_samples)
+        speech = self._speech_frames(levels)
+
+        if not speech.any():
+            return audio[:0], self._stats(original_seconds, 0.0, speech=False)
+
+        # Grow speech regions by the padding on both sides
+        keep = speech.copy()
+        for shift in range(1, self.padding_frames + 1):
+            keep[:-shift] |= speech[shift:]
+            keep[shift:] |= speech[:-shift]
+
+        # Shorten long pauses between speech regions, keeping half of
+        # max_pause on each side so words are not glued together
+        edges = np.flatnonzero(np.diff(keep.astype(np.int8)))
+        starts = np.concatenate(([0], edges + 1))
+        ends = np.concatenate((edges + 1, [len(keep)]))
+        first_speech = int(np.argmax(keep))
+        last_speech = len(keep) - int(np.argmax(keep[::-1]))
+        half_pause = self.max_pause_frames // 2
+
+        pieces = []
+        for start, end in zip(starts, ends):
+            if keep[start]:
+                pieces.append((start, end))
+            elif not (first_speech < start and end < last_speech):
+                continue  # leading or trailing silence
+            elif end - start > self.max_pause_frames:
+                pieces.append((start, start + half_pause))
+                pieces.append((end - half_pause, end))
+            else:
+                pieces.append((start, end))
+
+        trimmed = np.concatenate([
+            audio[start * self.frame_samples:end * self.frame_samples] for start, end in pieces
+        ])
+        return trimmed, self._stats(original_seconds, len(trimmed) / self.sample_rate, speech=True)
+
+    def _speech_frames(self, levels):
+        if len(levels) == 0:
+            return np.zeros(0, dtype=bool)
+        noise_floor = float(np.percentile(levels, 10))
+        peak = float(levels.max())
+        threshold = max(self.min_threshold_db, min(noise_floor + self.margin_db, peak - self.margin_db))
+        speech = levels >= threshold
+
+        # Drop bursts too short to be speech (clicks, handling noise)
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], speech.astype(np.int8), [0]))))
+        for start, end in zip(edges[::2], edges[1::2]):
+            if end - start < self.min_speech_frames:
+                speech[start:end] = False
+        return speech
+
+    @staticmethod
+    def _stats(original_seconds: float, kept_seconds: float, speech: bool) -> Dict:
+        return {
+            "speech": speech,
+            "original_seconds": round(original_seconds, 3),
+            "kept_seconds": round(kept_seconds, 3),
+            "removed_seconds": round(original_seconds - kept_seconds, 3),
+        }
@@ -0,0 +1,159 @@
+import heapq
+import math
+import time
+from array import array
+from typing import Dict, Iterable, List, Set, Tuple
+
+from app.services.comparison_service import ComparisonService
+from app.services.quran_corpus import QuranCorpus
+
+
+def _grams(words: Iterable[str]) -> Set[str]:
+    """
+    Word unigrams and bigrams plus character trigrams of each word.
+
+    Word grams pin down the exact phrase; character trigrams (with word
+    boundaries marked) still match when the transcript misspells a word.
+    """
+    words = list(words)
+    grams = set(words)
+    grams.update(f"{first} {second}" for first, second in zip(words, words[1:]))
+    for word in words:
+        padded = f"#{word}#"
+        grams.update("~" + padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class VerseIndex:
+    """
+    Inverted n-gram index over the corpus for identifying recited verses.
+
+    Each gram maps to the sorted list of ayat containing it. A query only
+    walks the postings of its own grams, skipping grams found in more than
+    max_df_ratio of the corpus (they carry almost no information), so the
+    cost depends on the transcript, not the corpus size.
+
+    Candidates are scored by the IDF-weighted F1 of gram overlap: recall is
+    how much of the transcript an ayah explains, precision how much of the
+    ayah was recited. Top ayat are then extended to neighbouring ayat while
+    that improves the score, so a transcript spanning several ayat is
+    returned as a range.
+    """
+
+    def __init__(self, corpus: QuranCorpus, max_df_ratio: float = 0.05, min_max_df: int = 50):
+        started = time.perf_counter()
+        self.corpus = corpus
+        self.tokenizer = ComparisonService()
+        count = len(corpus)
+        self.max_df = max(min_max_df, int(count * max_df_ratio))
+
+        postings: Dict[str, List[int]] = {}
+        ayah_grams = []
+        for index, tokens in enumerate(corpus.tokens):
+            grams = _grams(tokens)
+            ayah_grams.append(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(index)
+
+        self.postings: Dict[str, array] = {gram: array("I", ayat) for gram, ayat in postings.items()}
+        self.idf: Dict[str, float] = {
+            gram: math.log((count + 1) / (len(ayat) + 0.5)) for gram, ayat in postings.items()
+        }
+        self.unknown_idf = math.log((count + 1) / 0.5)
+        # Total weight of each ayah's informative grams (the precision denominator)
+        self.ayah_mass = array("d", (
+            sum(self.idf[gram] for gram in grams if len(postings[gram]) <= self.max_df) or 1.0
+            for grams in ayah_grams
+        ))
+        self.build_seconds = time.perf_counter() - started
+        print(f"[VerseIndex] Indexed {count} ayat ({len(self.postings)} grams) in {self.build_seconds:.2f}s")
+
+    def search(self, text: str, top_k: int = 5) -> List[Dict]:
+        """
+        Find the ayat (or ranges of consecutive ayat) that best match text.
+
+        Returns:
+            Up to top_k candidates, best first, each with 'reference',
+            'surah', 'first_ayah', 'last_ayah', 'score' (0-1) and 'text'
+        """
+        grams = _grams(self.tokenizer.tokenize(text))
+        if not grams:
+            return []
+
+        informative = [gram for gram in grams if gram in self.postings and len(self.postings[gram]) <= self.max_df]
+        if not informative:
+            # Only common grams (e.g. a single frequent word): use the rarest ones
+            known = sorted((gram for gram in grams if gram in self.postings), key=lambda gram: len(self.postings[gram]))
+            informative = known[:5]
+        query_mass = sum(self.idf[gram] for gram in informative)
+        query_mass += self.unknown_idf * sum(1 for gram in grams if gram not in self.postings)
+        if not informative or query_mass <= 0:
+            return []
+
+        hits: Dict[int, List[str]] = {}
+        weights: Dict[int, float] = {}
+        for gram in informative:
+            idf = self.idf[gram]
+            for index in self.postings[gram]:
+                if index in weights:
+                    weights[index] += idf
+                    hits[index].append(gram)
+                else:
+                    weights[index] = idf
+                    hits[index] = [gram]
+
+        def score(first: int, last: int) -> float:
+            covered = set()
+            for index in range(first, last + 1):
+                covered.update(hits.get(index, ()))
+            matched = sum(self.idf[gram] for gram in covered)
+            if not matched:
+                return 0.0
+            recall = matched / query_mass
+            precision = min(1.0, matched / sum(self.ayah_mass[first:last + 1]))
+            return 2 * recall * precision / (recall + precision)
+
+        # Rough per-ayah ranking by matched weight before the exact F1
+        shortlist = heapq.nlargest(max(20, top_k * 4), weights, key=weights.__getitem__)
+
+        ranges: Dict[Tuple[int, int], float] = {}
+        for index in shortlist:
+            first = last = index
+            best = score(first, last)
+            surah = self.corpus.locations[index][0]
+            while True:
+                options = []
+                if first > 0 and self.corpus.locations[first - 1][0] == surah and first - 1 in hits:
+                    options.append((first - 1, last))
+                if last + 1 < len(self.corpus) and self.corpus.locations[last + 1][0] == surah and last + 1 in hits:
+                    options.append((first, last + 1))
+                scored = [(score(*option), option) for option in options]
+                if not scored or max(scored)[0] <= best:
+                    break
+                best, (first, last) = max(scored)
+            ranges[(first, last)] = best
+
+        ranked = sorted(ranges.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+        candidates = []
+        for (first, last), range_score in ranked:
+            surah, first_ayah = self.corpus.locations[first]
+            last_ayah = self.corpus.locations[last][1]
+            reference = f"{surah}:{first_ayah}" if first == last else f"{surah}:{first_ayah}-{last_ayah}"
+            candidates.append({
+                "reference": reference,
+                "surah": surah,
+                "first_ayah": first_ayah,
+                "last_ayah": last_ayah,
+                "score": round(range_score, 4),
+                "text": " ".join(self.corpus.texts[first:last + 1]),
+            })
+        return candidates
+
+    def stats(self) -> Dict:
+        return {
+            "ayat": len(self.corpus),
+            "grams": len(self.postings),
+            "postings": sum(len(ayat) for ayat in self.postings.values()),
+            "max_df": self.max_df,
+            "build_seconds": round(self.build_seconds, 3),
+        }
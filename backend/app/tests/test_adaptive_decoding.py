@@ -0,0 +1,71 @@
+import pytest
+from app.services.transcription_service import TranscriptionService
+
+def _service(monkeypatch, greedy_result):
+    """Service whose engine passes are scripted per decoding mode."""
+    service = TranscriptionService()
+    calls = []
+
+    async def fake_pass(audio, decoding_mode):
+        calls.append(decoding_mode)
+        if decoding_mode == "fast":
+            return dict(greedy_result)
+        return {"text": "بسم الله الرحمن الرحيم", "avg_logprob": -0.2}
+
+    monkeypatch.setattr(service, "_run_engine_pass", fake_pass)
+    return service, calls
+
+@pytest.mark.asyncio
+async def test_confident_greedy_result_is_kept(monkeypatch):
+    """Test that adaptive mode stops after greedy decoding when quality is good."""
+    service, calls = _service(monkeypatch, {
+        "text": "بسم الله", "segments": [{"avg_logprob": -0.3, "compression_ratio": 1.2, "no_speech_prob": 0.01}]
+    })
+
+    result = await service._run_engine(b"audio", "adaptive")
+
+    assert calls == ["fast"]
+    assert result["text"] == "بسم الله"
+    assert service.decoding_stats()["escalations"] == 0
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("segment", [
+    {"avg_logprob": -1.5, "compression_ratio": 1.2, "no_speech_prob": 0.01},
+    {"avg_logprob": -0.3, "compression_ratio": 3.1, "no_speech_prob": 0.01},
+    {"avg_logprob": -0.3, "compression_ratio": 1.2, "no_speech_prob": 0.9},
+])
+async def test_poor_greedy_result_escalates_to_beam_search(monkeypatch, segment):
+    """Test that each quality signal can trigger escalation."""
+    service, calls = _service(monkeypatch, {"text": "بسم", "segments": [segment]})
+
+    result = await service._run_engine(b"audio", "adaptive")
+
+    assert calls == ["fast", "accurate"]
+    assert result["escalated"] is True
+    stats = service.decoding_stats()
+    assert stats["escalations"] == 1
+    assert stats["escalation_rate"] == 1.0
+
+@pytest.mark.asyncio
+async def test_fixed_modes_never_escalate(monkeypatch):
+    """Test that fast and accurate run exactly one pass."""
+    service, calls = _service(monkeypatch, {"text": "بسم", "avg_logprob": -3.0})
+
+    await service._run_engine(b"audio", "fast")
+    await service._run_engine(b"audio", "accurate")
+
+    assert calls == ["fast", "accurate"]
+    assert service.decoding_stats()["requests"] == {"fast": 1, "adaptive": 0, "accurate": 1}
+
+def test_greedy_options_disable_beam_search():
+    """Test the decoding options used for each mode."""
+    service = TranscriptionService()
+
+    assert service._transcribe_options("fast")["beam_size"] is None
+    assert service._transcribe_options("accurate")["beam_size"] == 5
+
+@pytest.mark.asyncio
+async def test_unknown_mode_is_rejected():
+    """Test that an unknown decoding mode raises ValueError."""
+    with pytest.raises(ValueError):
+        await TranscriptionService().transcribe(b"audio" * 50, "a.wav", decoding_mode="turbo")
@@ -0,0 +1,156 @@
+import time
+from app.services.alignment import align_stream, align_words, MATCH, SUBSTITUTION, INSERTION, DELETION
+from app.services.comparison_service import ComparisonService
+
+def exact(a, b):
+    return 1.0 if a == b else 0.0
+
+def test_alignment_labels_every_operation():
+    """Test that each word gets match, substitution, insertion or deletion by index."""
+    verse = ["a", "b", "c", "d", "e"]
+    recognized = ["a", "x", "d", "e", "f"]
+
+    steps = align_words(verse, recognized, exact, threshold=0.75)
+
+    assert sorted(step[0] for step in steps) == sorted([MATCH, SUBSTITUTION, DELETION, MATCH, MATCH, INSERTION])
+    matches = [(step[1], step[2]) for step in steps if step[0] == MATCH]
+    assert matches == [(0, 0), (3, 2), (4, 3)]
+    assert steps[-1] == (INSERTION, None, 4, 0.0)
+
+def test_repeated_words_are_aligned_by_position():
+    """Test that a skipped repeated word is reported at its own position."""
+    service = ComparisonService()
+    verse = "الرحمن الرحيم مالك يوم الدين الرحمن الرحيم"
+    recognized = "الرحمن الرحيم مالك يوم الدين الرحيم"
+
+    result = service.compare(recognized, verse)
+
+    missed = [c for c in result["word_comparisons"] if not c["match"]]
+    assert len(missed) == 1
+    assert missed[0]["position"] == 5
+    assert missed[0]["operation"] == DELETION
+    assert result["matched_words"] == 6
+
+def test_extra_words_are_appended_after_verse_words():
+    """Test that insertions keep the old trailing-entry format."""
+    service = ComparisonService()
+
+    result = service.compare("بسم الله الله الرحمن الرحيم", "بسم الله الرحمن الرحيم")
+
+    assert result["match_percentage"] == 100.0
+    extra = result["word_comparisons"][4:]
+    assert len(extra) == 1
+    assert extra[0]["verse"] == "" and extra[0]["match"] is False
+    assert extra[0]["operation"] == INSERTION
+    assert extra[0]["recognized_index"] in (1, 2)
+
+def test_band_limits_similarity_calls():
+    """Test that only cells near the diagonal are scored."""
+    calls = []
+
+    def counting(a, b):
+        calls.append((a, b))
+        return 0.0
+
+    words = [f"w{i}" for i in range(200)]
+    shifted = [f"v{i}" for i in range(200)]
+    align_words(words, shifted, counting, threshold=0.75, band=5)
+
+    assert len(calls) <= 200 * 11
+
+def test_page_sized_comparison_is_fast():
+    """Test that a 600-word page with a few recitation errors compares quickly."""
+    service = ComparisonService()
+    vocabulary = ["الله", "الرحمن", "الرحيم", "الحمد", "لله", "رب", "العالمين", "مالك", "يوم", "الدين"]
+    verse_words = [vocabulary[(i * 7) % len(vocabulary)] + str(i % 13) for i in range(600)]
+    recognized_words = list(verse_words)
+    del recognized_words[100]
+    recognized_words.insert(300, "زائدة")
+    recognized_words[450] = "خطأ"
+
+    started = time.perf_counter()
+    result = service.compare(" ".join(recognized_words), " ".join(verse_words))
+    elapsed = time.perf_counter() - started
+
+    assert result["total_words"] == 600
+    assert result["matched_words"] >= 597
+    assert elapsed < 5.0
+
+def surah_words(count):
+    """Distinct-enough words with the repetition of a real surah."""
+    vocabulary = ["الله", "الرحمن", "الرحيم", "الحمد", "لله", "رب", "العالمين", "مالك", "يوم", "الدين", "اياك", "نعبد"]
+    return [vocabulary[(i * 7) % len(vocabulary)] + str(i % 31) for i in range(count)]
+
+def test_stream_matches_banded_alignment_on_short_input():
+    """Test that the chunked alignment agrees with align_words when nothing drifts."""
+    verse = ["a", "b", "c", "d", "e"]
+    recognized = ["a", "x", "d", "e", "f"]
+
+    assert list(align_stream(verse, recognized, exact, threshold=0.75)) == align_words(verse, recognized, exact, threshold=0.75)
+
+def test_stream_resyncs_after_skipped_phrase():
+    """Test that a skipped 40-word phrase far beyond the band only affects those words."""
+    verse = surah_words(2000)
+    recognized = verse[:500] + verse[540:]
+
+    steps = list(align_stream(verse, recognized, exact, threshold=0.75, band=10))
+
+    deleted = [step[1] for step in steps if step[0] == DELETION]
+    assert deleted == list(range(500, 540))
+    assert sum(1 for step in steps if step[0] == MATCH) == 1960
+    assert sorted(step[1] for step in steps if step[1] is not None) == list(range(2000))
+    assert sorted(step[2] for step in steps if step[2] is not None) == list(range(1960))
+
+def test_stream_resyncs_after_repeated_phrase():
+    """Test that a repeated phrase is reported as insertions, not as drift."""
+    verse = surah_words(1500)
+    recognized = verse[:800] + verse[780:800] + verse[800:]
+
+    steps = list(align_stream(verse, recognized, exact, threshold=0.75))
+
+    assert sum(1 for step in steps if step[0] == INSERTION) == 20
+    assert sum(1 for step in steps if step[0] == MATCH) == 1500
+
+def test_long_passage_compare_uses_anchored_alignment():
+    """Test that compare resyncs on a whole-surah passage with a skipped phrase."""
+    service = ComparisonService()
+    verse_words = surah_words(1000)
+    recognized_words = verse_words[:300] + verse_words[330:]
+    recognized_words[700] = "خطأ"
+
+    result = service.compare(" ".join(recognized_words), " ".join(verse_words))
+
+    assert result["matched_words"] == 969
+    missed = [c["position"] for c in result["word_comparisons"] if not c["match"]]
+    assert missed[:30] == list(range(300, 330))
+    assert len(result["word_comparisons"]) == 1000
+
+def test_iter_compare_tokens_yields_in_recitation_order():
+    """Test that streamed comparisons interleave insertions where they were recited."""
+    service = ComparisonService()
+    verse = service.tokenize("بسم الله الرحمن الرحيم")
+    recognized = service.tokenize("بسم الله زائدة الرحمن الرحيم")
+
+    entries = list(service.iter_compare_tokens(recognized, verse))
+
+    assert [entry["position"] for entry in entries] == [0, 1, None, 2, 3]
+    assert entries[2]["operation"] == INSERTION and entries[2]["recognized"] == "زائده"
+
+def test_stream_time_is_linear_in_passage_length():
+    """Test that a 10-minute recitation against a long surah aligns in linear time."""
+    def run(count):
+        verse = surah_words(count)
+        recognized = list(verse)
+        for position in range(50, count, 97):
+            recognized[position] = "خطأ"
+        for position in range(count - 300, 100, -400):
+            del recognized[position:position + 15]
+        started = time.perf_counter()
+        for _ in align_stream(verse, recognized, exact, threshold=0.75):
+            pass
+        return time.perf_counter() - started
+
+    small, large = run(2000), run(16000)
+
+    assert large < 5.0
+    assert large < small * 8 * 3
@@ -0,0 +1,39 @@
+import pytest
+from app.services.arabic_normalizer import normalize, normalize_batch, LEVELS
+
+def test_diacritics_level_keeps_letters():
+    """Test that only marks and tatweel are removed at the diacritics level."""
+    assert normalize("بِسْمِ اللَّهِ الرَّحْمَٰنِ الرَّحِيمِ", "diacritics") == "بسم الله الرحمن الرحيم"
+    assert normalize("إِيَّاكَ نَعْبُدُ", "diacritics") == "إياك نعبد"
+    assert normalize("الرحــمن", "diacritics") == "الرحمن"
+
+def test_uthmani_annotation_marks_are_removed():
+    """Test that Qur'anic pause marks and small letters do not leak into words."""
+    assert normalize("ٱلْكِتَٰبُ لَا رَيْبَ ۛ فِيهِ ۛ هُدًى", "standard") == "الكتب لا ريب فيه هدي"
+    assert normalize("۞ إِنَّ", "standard") == "ان"
+
+def test_standard_level_unifies_letter_variants():
+    """Test alef, alef maksura and ta marbuta folding."""
+    assert normalize("أحد إله آمن ٱلحمد", "standard") == "احد اله امن الحمد"
+    assert normalize("على الصلاة", "standard") == normalize("علي الصلاه", "standard")
+
+def test_search_level_folds_hamza():
+    """Test that hamza carriers fold only at the search level."""
+    assert normalize("مؤمن شيء", "standard") == "مؤمن شيء"
+    assert normalize("مؤمن شيء", "search") == "مومن شي"
+
+def test_whitespace_is_collapsed():
+    """Test that whitespace runs become single spaces."""
+    assert normalize("  بسم \n\t الله  ") == "بسم الله"
+
+def test_batch_matches_single_calls():
+    """Test that batch normalization equals normalizing one by one."""
+    texts = ["بِسْمِ اللَّهِ", "", "  الرَّحْمَٰنِ  ", "a\x00b"]
+    for level in LEVELS:
+        assert normalize_batch(texts, level) == [normalize(text, level) for text in texts]
+    assert normalize_batch([]) == []
+
+def test_unknown_level_is_rejected():
+    """Test that an unknown level raises ValueError."""
+    with pytest.raises(ValueError):
+        normalize("بسم", "aggressive")
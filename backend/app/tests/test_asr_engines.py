@@ -0,0 +1,94 @@
+import io
+import struct
+import wave
+
+import pytest
+from app.services import asr_engines
+from app.services.asr_engines import ENGINES, EngineUnavailableError, create_engine, load_engine, preload_engine
+from app.services.transcription_service import TranscriptionService
+
+np = pytest.importorskip("numpy")
+
+def test_unknown_engine_is_rejected():
+    """Test that a typo in ASR_ENGINE fails loudly."""
+    with pytest.raises(ValueError):
+        create_engine("whisper-typo")
+
+def test_engine_selected_from_env(monkeypatch):
+    """Test that ASR_ENGINE and WHISPER_MODEL pick the engine."""
+    monkeypatch.setenv("ASR_ENGINE", "fake")
+    monkeypatch.setenv("WHISPER_MODEL", "tiny")
+
+    engine = create_engine()
+
+    assert engine.name == "fake"
+    assert engine.model_name == "tiny"
+    assert set(ENGINES) >= {"whisper", "whisper-int8", "faster-whisper", "fake"}
+
+def test_fake_engine_is_deterministic_and_reports():
+    """Test the fake engine's output and the shared report format."""
+    engine = create_engine("fake")
+    engine.load()
+    audio = np.zeros(16000, dtype=np.float32)
+
+    first = engine.transcribe(audio, {"language": "ar"})
+    second = engine.transcribe_batch([audio, audio], {"language": "ar"})
+
+    assert first["text"] == "بسم الله الرحمن الرحيم"
+    assert [r["text"] for r in second] == [first["text"]] * 2
+    report = engine.report()
+    assert report["engine"] == "fake"
+    assert report["latency_ms"]["count"] == 2
+    assert report["audio_seconds"] == 3.0
+    assert set(report["memory_mb"]) == {"rss", "peak", "load_delta"}
+
+def test_missing_runtime_raises_unavailable():
+    """Test that engines without their runtime report EngineUnavailableError."""
+    for name, module in (("whisper", "whisper"), ("faster-whisper", "faster_whisper")):
+        try:
+            __import__(module)
+            continue
+        except ImportError:
+            pass
+        with pytest.raises(EngineUnavailableError):
+            create_engine(name).load()
+
+def test_preloaded_engine_is_reused(monkeypatch):
+    """Test that workers forked after preload_engine use its engine instead of loading again."""
+    monkeypatch.setattr(asr_engines, "_preloaded", {})
+    monkeypatch.setenv("ASR_CPU_THREADS", "2")
+    preloaded = preload_engine("fake", "tiny")
+    threads = []
+    monkeypatch.setattr(preloaded, "set_threads", threads.append)
+
+    assert load_engine(create_engine("fake", "tiny")) is preloaded
+    assert threads == [2]
+    # Another model is loaded as usual
+    other = load_engine(create_engine("fake", "small"))
+    assert other is not preloaded and other.model is not None
+
+def test_engines_that_are_not_fork_safe_are_not_preloaded(monkeypatch):
+    """Test that faster-whisper is left for each worker to load."""
+    monkeypatch.setattr(asr_engines, "_preloaded", {})
+
+    assert preload_engine("faster-whisper") is None
+    assert asr_engines._preloaded == {}
+
+@pytest.mark.asyncio
+async def test_service_transcribes_through_selected_engine(monkeypatch):
+    """Test the full decode, batch and engine path with the fake engine."""
+    monkeypatch.setenv("ASR_ENGINE", "fake")
+    monkeypatch.setenv("ADD_TAJWEED", "false")
+    service = TranscriptionService()
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(struct.pack("<1600h", *([1000] * 1600)))
+
+    result = await service.transcribe(buffer.getvalue(), "recording.wav")
+
+    assert service.engine.name == "fake"
+    assert result["text"] == "بسم الله الرحمن الرحيم"
+    assert service.engine.report()["latency_ms"]["count"] == 1
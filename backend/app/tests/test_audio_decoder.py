@@ -0,0 +1,37 @@
+import io
+import struct
+import wave
+
+import pytest
+from app.services.audio_decoder import SAMPLE_RATE, decode_audio, detect_audio_format
+
+np = pytest.importorskip("numpy")
+
+def _wav_bytes(samples, sample_rate=SAMPLE_RATE, channels=1):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(struct.pack(f"<{len(samples)}h", *samples))
+    return buffer.getvalue()
+
+def test_detect_format_from_extension_and_magic_bytes():
+    """Test that the filename wins and magic bytes are used without one."""
+    assert detect_audio_format(b"RIFF" + b"\x00" * 40, "recording.m4a") == "m4a"
+    assert detect_audio_format(b"\x00\x00\x00\x18ftypM4A ", "recording") == "m4a"
+    assert detect_audio_format(b"ID3\x04", None) == "mp3"
+    assert detect_audio_format(b"RIFF" + b"\x00" * 40, None) == "wav"
+
+def test_decode_pcm_wav_in_memory():
+    """Test that 16 kHz PCM WAV is decoded natively to float32."""
+    audio = decode_audio(_wav_bytes([0, 16384, -16384, 32767]), "wav")
+
+    assert audio.dtype == np.float32
+    assert np.allclose(audio, [0.0, 0.5, -0.5, 32767 / 32768])
+
+def test_decode_stereo_wav_is_downmixed():
+    """Test that interleaved stereo frames are averaged to mono."""
+    audio = decode_audio(_wav_bytes([16384, 0, -16384, 0], channels=2), "wav")
+
+    assert np.allclose(audio, [0.25, -0.25])
@@ -0,0 +1,91 @@
+import json
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.batch_comparison import BatchComparer
+from app.services.comparison_service import ComparisonService
+
+client = TestClient(app)
+
+VERSE = "بِسْمِ اللَّهِ الرَّحْمَٰنِ الرَّحِيمِ"
+
+@pytest.mark.asyncio
+async def test_batch_results_match_single_comparisons_in_order():
+    """Test that chunked process-pool results equal one-by-one comparisons."""
+    service = ComparisonService()
+    comparer = BatchComparer(service, max_workers=2, chunk_size=3)
+    pairs = [
+        ("بسم الله الرحمن الرحيم", VERSE),
+        ("بسم الله الرحيم", VERSE),
+        ("الحمد لله رب العالمين", "الْحَمْدُ لِلَّهِ رَبِّ الْعَالَمِينَ"),
+        ("مالك يوم", "مَالِكِ يَوْمِ الدِّينِ"),
+    ] * 3
+    try:
+        results = await comparer.compare_many(pairs)
+    finally:
+        comparer.shutdown()
+
+    assert [result["index"] for result in results] == list(range(len(pairs)))
+    for (recognized, verse), result in zip(pairs, results):
+        expected = service.compare(recognized, verse)
+        assert result["success"] is True
+        assert result["word_comparisons"] == expected["word_comparisons"]
+        assert result["match_percentage"] == expected["match_percentage"]
+
+@pytest.mark.asyncio
+async def test_batch_workers_use_the_parent_settings():
+    """Test that non-default settings reach the workers, not just the threshold."""
+    service = ComparisonService()
+    service.char_diff = False
+    service.normalization_level = "diacritics"
+    comparer = BatchComparer(service, max_workers=2, chunk_size=1)
+    pairs = [("بسم الله الرحيم", VERSE), ("إياك نعبد", "إِيَّاكَ نَعْبُدُ")]
+    try:
+        results = await comparer.compare_many(pairs)
+    finally:
+        comparer.shutdown()
+
+    for (recognized, verse), result in zip(pairs, results):
+        expected = service.compare(recognized, verse)
+        assert result["word_comparisons"] == expected["word_comparisons"]
+        assert result["match_percentage"] == expected["match_percentage"]
+        assert all("char_diff" not in entry for entry in result["word_comparisons"])
+
+def test_repeated_verses_are_tokenized_once():
+    """Test that each distinct verse is shipped to workers once per chunk."""
+    comparer = BatchComparer(ComparisonService(), chunk_size=10)
+
+    chunks = comparer._chunks([("a", VERSE), ("b", VERSE), ("c", "مالك يوم الدين")] * 4)
+
+    assert len(chunks) == 2
+    verses, items = chunks[0]
+    assert len(verses) == 2
+    assert [item[0] for item in items] == list(range(10))
+
+def test_batch_endpoint_reports_per_item_errors():
+    """Test that an invalid item fails alone."""
+    payload = {"items": [
+        {"recognized_text": "بسم الله", "verse_text": VERSE, "verse_reference": "1:1"},
+        {"recognized_text": "بسم الله", "verse_text": "   "},
+    ]}
+
+    response = client.post("/compare_verse/batch", json=payload)
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert results[0]["success"] is True and results[0]["verse_reference"] == "1:1"
+    assert results[1]["success"] is False and "verse_text" in results[1]["error"]
+
+def test_batch_endpoint_streams_ndjson():
+    """Test NDJSON streaming returns one line per item in order."""
+    payload = {"stream": True, "items": [
+        {"recognized_text": "بسم الله الرحمن الرحيم", "verse_text": VERSE} for _ in range(5)
+    ]}
+
+    response = client.post("/compare_verse/batch", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["index"] for line in lines] == list(range(5))
+    assert all(line["match_percentage"] == 100.0 for line in lines)
@@ -0,0 +1,81 @@
+import random
+from app.services.char_diff import char_diff, char_edits, edit_distance, SUBSTITUTE, INSERT, DELETE
+from app.services.comparison_service import ComparisonService
+
+def levenshtein(a, b):
+    row = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        previous, row[0] = row[:], i
+        for j in range(1, len(b) + 1):
+            row[j] = min(previous[j] + 1, row[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+    return row[-1]
+
+def apply_edits(word, edits):
+    out, i = [], 0
+    for operation, position, _, _, found in edits:
+        out.extend(word[i:position])
+        i = position
+        if operation == SUBSTITUTE:
+            out.append(found)
+            i += 1
+        elif operation == DELETE:
+            i += 1
+        else:
+            out.append(found)
+    out.extend(word[i:])
+    return "".join(out)
+
+def test_bit_parallel_distance_matches_levenshtein():
+    """Test the bit-parallel distance and traceback against the textbook DP."""
+    rng = random.Random(3)
+    for _ in range(3000):
+        a = "".join(rng.choice("ابت") for _ in range(rng.randint(0, 10)))
+        b = "".join(rng.choice("ابت") for _ in range(rng.randint(0, 10)))
+        edits = char_edits(a, b)
+        assert edit_distance(a, b) == levenshtein(a, b)
+        assert len(edits) == levenshtein(a, b)
+        assert apply_edits(a, edits) == b
+
+def test_long_words_exceed_machine_word_width():
+    """Test that words longer than 64 letters still diff correctly."""
+    a = "بسم" * 30
+    b = a[:40] + "ت" + a[41:-2]
+
+    assert edit_distance(a, b) == 3
+    assert apply_edits(a, char_edits(a, b)) == b
+
+def test_char_diff_reports_letter_positions():
+    """Test substitute, insert and delete edits with their positions."""
+    assert char_diff("الرحيم", "الرحمن") == [
+        {"op": SUBSTITUTE, "position": 4, "recognized_position": 4, "expected": "ي", "found": "م"},
+        {"op": SUBSTITUTE, "position": 5, "recognized_position": 5, "expected": "م", "found": "ن"},
+    ]
+    assert char_diff("نعبد", "نعبدو") == [
+        {"op": INSERT, "position": 4, "recognized_position": 4, "expected": None, "found": "و"},
+    ]
+    assert char_diff("مالك", "ملك") == [
+        {"op": DELETE, "position": 1, "recognized_position": 1, "expected": "ا", "found": None},
+    ]
+
+def test_comparison_adds_char_diff_to_differing_words():
+    """Test that mismatched and fuzzy-matched words carry a char_diff, exact ones an empty list."""
+    service = ComparisonService()
+
+    result = service.compare("بسم الله الرحمان", "بسم الله الرحمن الرحيم")
+
+    by_position = {entry["position"]: entry for entry in result["word_comparisons"]}
+    assert by_position[0]["char_diff"] == []
+    assert by_position[2]["char_diff"] == [
+        {"op": INSERT, "position": 5, "recognized_position": 5, "expected": None, "found": "ا"},
+    ]
+    assert by_position[3]["operation"] == "deletion"
+    assert by_position[3]["char_diff"] == []
+
+def test_char_diff_can_be_disabled():
+    """Test that the letter diff is optional."""
+    service = ComparisonService()
+    service.char_diff = False
+
+    result = service.compare("بسم الله", "بسم الله")
+
+    assert "char_diff" not in result["word_comparisons"][0]
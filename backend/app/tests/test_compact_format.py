@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.comparison_service import ComparisonService
+from app.services.compact_format import compact_word_comparisons, expand_word_comparisons
+
+client = TestClient(app)
+
+VERSE = "الحمد لله رب العالمين الرحمن الرحيم مالك يوم الدين"
+
+def test_compact_round_trips_word_comparisons():
+    """Test that the columnar form expands back to the full entries."""
+    result = ComparisonService().compare("الحمد لله رب العالمين زائدة الرحمان الرحيم ملك الدين", VERSE)
+
+    compact = compact_word_comparisons(result["word_comparisons"])
+
+    assert compact["count"] == len(result["word_comparisons"])
+    assert compact["match"] == "".join("1" if entry["match"] else "0" for entry in result["word_comparisons"])
+    assert set(compact["operation"]) <= set("msdi")
+    assert expand_word_comparisons(compact) == result["word_comparisons"]
+
+def test_compare_verse_compact_format():
+    """Test that the compact format is opt-in and carries the same totals."""
+    payload = {"recognized_text": "الحمد لله رب العالمين الرحمن", "verse_text": VERSE}
+
+    full = client.post("/compare_verse", json=payload).json()
+    compact = client.post("/compare_verse", json={**payload, "format": "compact"}).json()
+
+    assert "format" not in full and isinstance(full["word_comparisons"], list)
+    assert compact["format"] == "compact"
+    assert compact["word_comparisons"]["match"] == "111110000"
+    assert compact["matched_words"] == full["matched_words"] == 5
+    assert expand_word_comparisons(compact["word_comparisons"]) == full["word_comparisons"]
+
+def test_unknown_format_is_rejected():
+    """Test that only the documented formats are accepted."""
+    response = client.post("/compare_verse", json={"recognized_text": "بسم", "verse_text": "بسم", "format": "xml"})
+
+    assert response.status_code == 422
+
+def test_large_responses_are_compressed():
+    """Test that responses above the size threshold are gzip-encoded and small ones are not."""
+    page = " ".join([VERSE] * 40)
+
+    large = client.post("/compare_verse", json={"recognized_text": page, "verse_text": page}, headers={"Accept-Encoding": "gzip"})
+    small = client.post("/compare_verse", json={"recognized_text": "بسم", "verse_text": "بسم"}, headers={"Accept-Encoding": "gzip"})
+
+    assert large.headers["content-encoding"] in ("gzip", "br")
+    assert large.json()["total_words"] == 360
+    assert "content-encoding" not in small.headers
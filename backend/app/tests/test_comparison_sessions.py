@@ -0,0 +1,112 @@
+import random
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.comparison_service import ComparisonService
+from app.services.comparison_sessions import ComparisonSessionStore
+
+client = TestClient(app)
+
+LETTERS = "ابتثجحخدذرزسشصضطظعغفقكلمنهوي"
+
+def recitation(rng, verse, vocabulary):
+    """Imitate ASR output: dropped, misspelled and extra words."""
+    words = []
+    for word in verse:
+        roll = rng.random()
+        if roll < 0.07:
+            continue
+        if roll < 0.15:
+            word = word[:-1] + rng.choice(LETTERS)
+        words.append(word)
+        if roll > 0.95:
+            words.append(rng.choice(vocabulary))
+    return words
+
+def test_appended_words_match_a_full_comparison():
+    """Test that streaming words into a session ends with the same result as compare."""
+    service = ComparisonService()
+    store = ComparisonSessionStore(service)
+    rng = random.Random(5)
+    vocabulary = ["".join(rng.choice(LETTERS) for _ in range(rng.randint(2, 6))) for _ in range(300)]
+
+    for _ in range(100):
+        verse = [rng.choice(vocabulary) for _ in range(rng.randint(1, 60))]
+        recognized = recitation(rng, verse, vocabulary)
+        session = store.create(verse)
+        for start in range(0, len(recognized), 4):
+            session.append(recognized[start:start + 4])
+
+        expected = service.compare_tokens(recognized, verse)
+        result = session.result()
+        # Repeated words can make equally good alignments differ, not the totals
+        assert result["matched_words"] == expected["matched_words"]
+        assert len(result["word_comparisons"]) == len(expected["word_comparisons"])
+        assert sum(entry["match"] for entry in result["word_comparisons"]) == result["matched_words"]
+
+def test_replaced_ayah_returns_only_changed_entries():
+    """Test that re-recording a few words reports just those words."""
+    service = ComparisonService()
+    session = ComparisonSessionStore(service).create(service.tokenize(
+        "الحمد لله رب العالمين الرحمن الرحيم مالك يوم الدين اياك نعبد واياك نستعين"
+    ))
+    session.append(service.tokenize("الحمد لله رب العالمين الرحمن الرحيم قال يوم الدين اياك نعبد واياك نستعين"))
+    assert session.result()["matched_words"] == 12
+
+    delta = session.replace(6, 9, service.tokenize("مالك يوم الدين"))
+
+    assert [entry["position"] for entry in delta["changed"]] == [6]
+    assert delta["changed"][0]["match"] is True
+    assert delta["matched_words"] == 13
+    assert delta["version"] == 2
+
+def test_replace_with_fewer_words_shifts_later_entries():
+    """Test that later entries keep their comparison and get shifted recognized indices."""
+    service = ComparisonService()
+    verse = service.tokenize("قل هو الله احد الله الصمد لم يلد ولم يولد")
+    session = ComparisonSessionStore(service).create(verse)
+    session.append(service.tokenize("قل هو هو الله احد الله الصمد لم يلد ولم يولد"))
+
+    delta = session.replace(1, 3, service.tokenize("هو"))
+
+    assert delta["extra_words"] == []
+    assert delta["matched_words"] == 10
+    assert session.result()["word_comparisons"] == service.compare_tokens(session.recognized_words, verse)["word_comparisons"]
+
+def test_store_evicts_least_recently_used_and_idle_sessions():
+    """Test that session memory is bounded by count and idle time."""
+    store = ComparisonSessionStore(ComparisonService(), max_sessions=2, idle_seconds=60)
+    first = store.create(["بسم"])
+    second = store.create(["الله"])
+    store.get(first.id)
+    store.create(["الرحمن"])
+
+    assert store.get(second.id) is None
+    assert store.get(first.id) is first
+
+    first.last_used -= 120
+    assert store.get(first.id) is None
+    assert store.stats()["expirations"] == 1
+    assert store.stats()["evictions"] == 1
+
+def test_session_endpoints():
+    """Test create, append, fetch and delete over the API."""
+    response = client.post("/compare_verse/sessions", json={
+        "verse_text": "بِسْمِ اللَّهِ الرَّحْمَٰنِ الرَّحِيمِ",
+        "recognized_text": "بسم الله"
+    })
+    assert response.status_code == 200
+    data = response.json()
+    session_id = data["session_id"]
+    assert data["matched_words"] == 2
+    assert len(data["word_comparisons"]) == 4
+
+    response = client.post(f"/compare_verse/sessions/{session_id}/words", json={"recognized_text": "الرحمن الرحيم"})
+    assert response.status_code == 200
+    delta = response.json()
+    assert [entry["position"] for entry in delta["changed"]] == [2, 3]
+    assert delta["match_percentage"] == 100.0
+
+    assert client.get(f"/compare_verse/sessions/{session_id}").json()["matched_words"] == 4
+    assert client.delete(f"/compare_verse/sessions/{session_id}").status_code == 200
+    assert client.get(f"/compare_verse/sessions/{session_id}").status_code == 404
+    assert client.post(f"/compare_verse/sessions/{session_id}/words", json={"recognized_text": "بسم"}).status_code == 404
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from app.services.inference_pool import (
+    InferencePool,
+    InferenceQueueFullError,
+    InferenceTimeoutError,
+)
+
+@pytest.mark.asyncio
+async def test_job_runs_off_event_loop():
+    """Test that a blocking job does not stall other coroutines."""
+    pool = InferencePool(max_workers=1, max_queue=1, job_timeout=5)
+    ticks = []
+
+    async def ticker():
+        for _ in range(5):
+            ticks.append(time.perf_counter())
+            await asyncio.sleep(0.01)
+
+    result, _ = await asyncio.gather(
+        pool.run(lambda: (time.sleep(0.2), threading.current_thread().name)[1]),
+        ticker()
+    )
+
+    assert result.startswith("inference")
+    assert len(ticks) == 5
+    assert pool.stats()["completed"] == 1
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_full():
+    """Test that jobs beyond workers + queue are rejected with a retry hint."""
+    pool = InferencePool(max_workers=1, max_queue=1, job_timeout=5)
+    release = threading.Event()
+
+    running = asyncio.ensure_future(pool.run(release.wait))
+    queued = asyncio.ensure_future(pool.run(release.wait))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(InferenceQueueFullError) as exc_info:
+        await pool.run(release.wait)
+    assert exc_info.value.retry_after >= 1
+
+    stats = pool.stats()
+    assert stats["running"] == 1
+    assert stats["queue_depth"] == 1
+    assert stats["rejected"] == 1
+
+    release.set()
+    await asyncio.gather(running, queued)
+    assert pool.stats()["queue_depth"] == 0
+
+@pytest.mark.asyncio
+async def test_job_timeout():
+    """Test that a job exceeding its timeout raises InferenceTimeoutError."""
+    pool = InferencePool(max_workers=1, max_queue=0, job_timeout=5)
+
+    with pytest.raises(InferenceTimeoutError):
+        await pool.run(time.sleep, 0.3, timeout=0.05)
+
+    assert pool.stats()["timeouts"] == 1
@@ -54,6 +54,26 @@ def test_compare_verse_endpoint():
     assert "word_comparisons" in data
     assert "total_words" in data
 
+def test_compare_verse_stream_endpoint():
+    """Test that a long comparison streams word lines followed by a summary."""
+    import json
+    payload = {
+        "recognized_text": "بسم الله زائدة الرحمن الرحيم",
+        "verse_text": "بِسْمِ اللَّهِ الرَّحْمَٰنِ الرَّحِيمِ"
+    }
+
+    response = client.post("/compare_verse/stream", json=payload)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    words, summary = lines[:-1], lines[-1]
+    assert [line["position"] for line in words] == [0, 1, None, 2, 3]
+    assert all(line["type"] == "word" for line in words)
+    assert summary["type"] == "summary"
+    assert summary["total_words"] == 4
+    assert summary["matched_words"] == 4
+
 @pytest.mark.asyncio
 async def test_full_workflow():
     """Integration test: transcribe audio then compare with verse."""
@@ -80,3 +100,125 @@ async def test_full_workflow():
     compare_data = compare_response.json()
     assert "match_percentage" in compare_data
 
+
+def test_ready_endpoint_after_warm_up():
+    """Test that /ready turns 200 once the startup warm-up has finished."""
+    import time
+    from app.services.registry import registry
+
+    with TestClient(app) as warm_client:
+        for _ in range(100):
+            if registry.status in ("ready", "failed"):
+                break
+            time.sleep(0.05)
+        response = warm_client.get("/ready")
+        health = warm_client.get("/health")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ready"
+    assert "warm_up_seconds" in response.json()["timings"]
+    assert health.json()["status"] == "healthy"
+
+
+def test_recite_endpoint_single_round_trip():
+    """Test that /recite returns transcription, comparison and timings together."""
+    files = {
+        "audio_file": ("test_audio.wav", b"fake audio content for recitation " * 10, "audio/wav")
+    }
+    data = {
+        "verse_text": "بِسْمِ اللَّهِ الرَّحْمَٰنِ الرَّحِيمِ",
+        "verse_reference": "1:1"
+    }
+
+    response = client.post("/recite", files=files, data=data)
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["success"] is True
+    assert body["text"]
+    assert body["verse_reference"] == "1:1"
+    assert body["comparison"]["total_words"] == 4
+    assert "word_comparisons" in body["comparison"]
+    assert {"transcribe_ms", "compare_ms", "total_ms"} <= set(body["timings"])
+
+
+def test_recite_endpoint_requires_a_verse():
+    """Test that /recite rejects requests without verse text or reference."""
+    files = {
+        "audio_file": ("test_audio.wav", b"fake audio content for recitation " * 10, "audio/wav")
+    }
+
+    response = client.post("/recite", files=files)
+
+    assert response.status_code == 400
+
+
+def test_registry_builds_services_independently(monkeypatch):
+    """Test that a slow build only holds up callers of that service, and runs once."""
+    import threading
+    from app.services import registry as registry_module
+
+    building = threading.Event()
+    release = threading.Event()
+    builds = []
+
+    class SlowCorpus:
+        def __init__(self, path):
+            builds.append(path)
+            building.set()
+            release.wait(5)
+    monkeypatch.setattr(registry_module, "QuranCorpus", SlowCorpus)
+
+    services = registry_module.ServiceRegistry()
+    results = []
+    callers = [threading.Thread(target=lambda: results.append(services.corpus())) for _ in range(2)]
+    for caller in callers:
+        caller.start()
+    assert building.wait(5)
+
+    # Other services are not behind the corpus build
+    assert services.comparison() is services.comparison()
+    assert not results
+
+    release.set()
+    for caller in callers:
+        caller.join(5)
+    assert len(builds) == 1
+    assert results[0] is results[1]
+
+
+@pytest.mark.asyncio
+async def test_routes_answer_while_a_service_builds(monkeypatch):
+    """Test that a route waiting for a service build does not block the event loop."""
+    import asyncio
+    import threading
+    from app.services import registry as registry_module
+    from app.services.quran_corpus import CorpusUnavailableError
+    from app.services.registry import registry
+
+    building = threading.Event()
+    release = threading.Event()
+    built = threading.Event()
+
+    def slow_corpus(path):
+        building.set()
+        release.wait(5)
+        built.set()
+        raise CorpusUnavailableError("not built in this test")
+    monkeypatch.setattr(registry_module, "QuranCorpus", slow_corpus)
+    monkeypatch.setattr(registry, "_corpus", None)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as async_client:
+        stream = asyncio.create_task(async_client.post(
+            "/compare_verse/stream", json={"recognized_text": "بسم الله", "verse_reference": "1:1"}
+        ))
+        assert await asyncio.to_thread(building.wait, 5)
+
+        health = await asyncio.wait_for(async_client.get("/health"), 2)
+        assert health.status_code == 200
+        assert not built.is_set()
+
+        release.set()
+        response = await stream
+    assert response.status_code == 503
@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+from app.services.micro_batcher import MicroBatcher
+
+@pytest.mark.asyncio
+async def test_concurrent_requests_share_a_batch():
+    """Test that requests arriving together are processed in one batch."""
+    batches = []
+
+    async def process(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait_ms=20)
+    results = await asyncio.gather(*(batcher.submit(i) for i in range(6)))
+
+    assert results == [0, 2, 4, 6, 8, 10]
+    assert batches == [[0, 1, 2, 3], [4, 5]]
+    assert batcher.stats()["avg_batch_size"] == 3.0
+
+@pytest.mark.asyncio
+async def test_lone_request_flushes_after_max_wait():
+    """Test that a single request is not held longer than the wait window."""
+    async def process(items):
+        return items
+
+    batcher = MicroBatcher(process, max_batch_size=8, max_wait_ms=5)
+    result = await asyncio.wait_for(batcher.submit("x"), timeout=1.0)
+
+    assert result == "x"
+    assert batcher.stats()["batches"] == 1
+
+@pytest.mark.asyncio
+async def test_per_item_errors_reach_only_their_caller():
+    """Test that an Exception result fails only the matching request."""
+    async def process(items):
+        return [ValueError("bad") if item == "bad" else item for item in items]
+
+    batcher = MicroBatcher(process, max_batch_size=2, max_wait_ms=50)
+    good, bad = await asyncio.gather(
+        batcher.submit("good"), batcher.submit("bad"), return_exceptions=True
+    )
+
+    assert good == "good"
+    assert isinstance(bad, ValueError)
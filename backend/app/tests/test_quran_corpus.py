@@ -0,0 +1,99 @@
+import time
+from pathlib import Path
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.quran_corpus import (
+    QuranCorpus, VerseReferenceError, CorpusUnavailableError, build_corpus_db, parse_reference
+)
+from app.services.registry import registry
+
+SAMPLE = Path(__file__).parent / "data" / "quran_sample.txt"
+
+@pytest.fixture
+def corpus(tmp_path):
+    db_path = tmp_path / "quran.db"
+    assert build_corpus_db(str(SAMPLE), str(db_path)) == 11
+    return QuranCorpus(str(db_path))
+
+@pytest.fixture
+def corpus_in_registry(corpus, monkeypatch):
+    monkeypatch.setattr(registry, "_corpus", corpus)
+    return corpus
+
+def test_lookup_single_ayah_and_range(corpus):
+    """Test that single ayat and ranges resolve to text and tokens."""
+    ayah = corpus.lookup("112:1")
+    assert ayah["text"] == "قُلْ هُوَ اللَّهُ أَحَدٌ"
+    assert ayah["tokens"] == ("قل", "هو", "الله", "احد")
+
+    fatiha = corpus.lookup("1:1-7")
+    assert fatiha["reference"] == "1:1-7"
+    assert fatiha["tokens"][:4] == ("بسم", "الله", "الرحمن", "الرحيم")
+    assert len(fatiha["tokens"]) == sum(len(corpus.lookup(f"1:{i}")["tokens"]) for i in range(1, 8))
+
+@pytest.mark.parametrize("reference", ["2:255", "1:0", "1:6-9", "1:5-2", "fatiha", "1:a"])
+def test_invalid_references_are_rejected(corpus, reference):
+    """Test malformed and out-of-range references."""
+    with pytest.raises(VerseReferenceError):
+        corpus.lookup(reference)
+
+def test_parse_reference():
+    """Test the reference formats."""
+    assert parse_reference("2:255") == (2, 255, None)
+    assert parse_reference(" 1:1-7 ") == (1, 1, 7)
+
+def test_missing_database_is_reported(tmp_path):
+    """Test that a missing database raises CorpusUnavailableError."""
+    with pytest.raises(CorpusUnavailableError):
+        QuranCorpus(str(tmp_path / "missing.db"))
+
+def test_store_reports_load_time_and_memory(corpus):
+    """Test that load time and memory figures are recorded."""
+    stats = corpus.stats()
+    assert stats["ayat"] == 11
+    assert stats["surahs"] == 2
+    assert stats["load_seconds"] < 1.0
+    assert 0 < stats["memory_mb"] < 1.0
+
+def test_lookup_is_constant_time(corpus):
+    """Test that resolving a reference does not scan the corpus."""
+    started = time.perf_counter()
+    for _ in range(10000):
+        corpus.lookup("112:4")
+    assert time.perf_counter() - started < 1.0
+
+def test_compare_verse_by_reference(corpus_in_registry):
+    """Test that /compare_verse accepts a reference instead of verse text."""
+    client = TestClient(app)
+
+    response = client.post("/compare_verse", json={
+        "recognized_text": "بسم الله الرحمن الرحيم الحمد لله رب العالمين",
+        "verse_reference": "1:1-2"
+    })
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_words"] == 8
+    assert data["match_percentage"] == 100.0
+    assert data["verse_reference"] == "1:1-2"
+
+def test_compare_verse_reports_bad_reference(corpus_in_registry):
+    """Test that an unknown reference is a client error."""
+    client = TestClient(app)
+
+    response = client.post("/compare_verse", json={"recognized_text": "بسم", "verse_reference": "9:999"})
+
+    assert response.status_code == 400
+
+def test_batch_comparison_by_reference(corpus_in_registry):
+    """Test that batch items can use references."""
+    client = TestClient(app)
+
+    response = client.post("/compare_verse/batch", json={"items": [
+        {"recognized_text": "قل هو الله احد", "verse_reference": "112:1"},
+        {"recognized_text": "الله الصمد", "verse_reference": "112:2"},
+    ]})
+
+    assert response.status_code == 200
+    assert [r["match_percentage"] for r in response.json()["results"]] == [100.0, 100.0]
@@ -0,0 +1,43 @@
+import gc
+import os
+from app.services import server_mode
+
+def test_worker_threads_split_the_cores(monkeypatch):
+    """Test that workers x threads does not exceed the cores, with at least one thread each."""
+    monkeypatch.delenv("WORKER_THREADS", raising=False)
+
+    assert server_mode.worker_threads(2, cpu_count=8) == 4
+    assert server_mode.worker_threads(3, cpu_count=8) == 2
+    assert server_mode.worker_threads(16, cpu_count=8) == 1
+
+    monkeypatch.setenv("WORKER_THREADS", "3")
+    assert server_mode.worker_threads(2, cpu_count=8) == 3
+
+def test_comparison_pools_split_the_cores(monkeypatch):
+    """Test that each worker's batch comparison pool defaults to its share of the cores."""
+    monkeypatch.delenv("COMPARISON_WORKERS", raising=False)
+    server_mode.limit_process_pools(4, cpu_count=8)
+    assert os.environ["COMPARISON_WORKERS"] == "2"
+
+    # An explicit setting wins, and every worker keeps at least one process
+    monkeypatch.setenv("COMPARISON_WORKERS", "3")
+    server_mode.limit_process_pools(4, cpu_count=8)
+    assert os.environ["COMPARISON_WORKERS"] == "3"
+    monkeypatch.delenv("COMPARISON_WORKERS")
+    server_mode.limit_process_pools(16, cpu_count=8)
+    assert os.environ["COMPARISON_WORKERS"] == "1"
+
+def test_configure_worker_sets_thread_limits(monkeypatch):
+    """Test that a forked worker gets its thread count and garbage collection back."""
+    # Set first so monkeypatch restores them afterwards
+    for name in server_mode.THREAD_ENV_VARS + ("ASR_CPU_THREADS",):
+        monkeypatch.setenv(name, "1")
+    gc.disable()
+    try:
+        server_mode.configure_worker(3)
+
+        assert gc.isenabled()
+        assert all(os.environ[name] == "3" for name in server_mode.THREAD_ENV_VARS)
+        assert os.environ["ASR_CPU_THREADS"] == "3"
+    finally:
+        gc.enable()
@@ -0,0 +1,33 @@
+import random
+import pytest
+from app.services.comparison_service import (
+    word_similarity, thresholded_similarity, similarity_cache_stats
+)
+
+LETTERS = "ابتثجحخدذرزسشصضطظعغفقكلمنهوي"
+
+@pytest.mark.parametrize("threshold", [0.5, 0.6, 0.75, 0.9])
+def test_prefilters_never_change_the_decision(threshold):
+    """Test that prefiltered scores agree with the full score around the threshold."""
+    rng = random.Random(7)
+    words = ["".join(rng.choice(LETTERS[:8]) for _ in range(rng.randint(1, 8))) for _ in range(120)]
+
+    for word1 in words[:40]:
+        for word2 in words:
+            full = word_similarity(word1, word2)
+            fast = thresholded_similarity(word1, word2, threshold)
+            if full >= threshold:
+                assert fast == pytest.approx(full)
+            else:
+                assert fast < threshold
+
+def test_similarity_cache_counts_repeated_pairs():
+    """Test that repeated pairs are served from the shared cache."""
+    before = similarity_cache_stats()
+
+    thresholded_similarity("الرحمن", "الرحيم", 0.75)
+    thresholded_similarity("الرحمن", "الرحيم", 0.75)
+
+    after = similarity_cache_stats()
+    assert after["hits"] >= before["hits"] + 1
+    assert after["max_entries"] > 0
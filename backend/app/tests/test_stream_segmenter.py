@@ -0,0 +1,62 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+
+np = pytest.importorskip("numpy")
+
+from app.services.stream_segmenter import StreamSegmenter
+
+SAMPLE_RATE = 16000
+
+def _tone(seconds):
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype("<i2").tobytes()
+
+def _silence(seconds):
+    return np.zeros(int(SAMPLE_RATE * seconds), dtype="<i2").tobytes()
+
+def test_stream_is_cut_at_pauses():
+    """Test that two utterances separated by a pause become two segments."""
+    segmenter = StreamSegmenter()
+    stream = _silence(0.5) + _tone(1.0) + _silence(1.0) + _tone(0.8)
+
+    # Feed in uneven chunks, like a network stream
+    segments = []
+    for i in range(0, len(stream), 3001):
+        segments += segmenter.feed(stream[i:i + 3001])
+    segments += segmenter.flush()
+
+    assert len(segments) == 2
+    first_start, first_audio = segments[0]
+    assert first_start == pytest.approx(0.35, abs=0.05)
+    assert 1.0 <= len(first_audio) / SAMPLE_RATE <= 1.4
+    assert segments[1][0] == pytest.approx(2.35, abs=0.05)
+
+def test_silence_produces_no_segments():
+    """Test that a silent stream yields nothing to transcribe."""
+    segmenter = StreamSegmenter()
+
+    assert segmenter.feed(_silence(2.0)) == []
+    assert segmenter.flush() == []
+
+def test_websocket_streams_partials_then_final():
+    """Test the streaming endpoint end to end in mock mode."""
+    client = TestClient(app)
+
+    with client.websocket_connect("/transcribe_audio/stream") as websocket:
+        websocket.send_bytes(_tone(1.0) + _silence(1.0))
+        websocket.send_bytes(_tone(1.0))
+        websocket.send_json({"type": "end"})
+
+        messages = []
+        while True:
+            message = websocket.receive_json()
+            messages.append(message)
+            if message["type"] == "final":
+                break
+
+    partials = [m for m in messages if m["type"] == "partial"]
+    assert sorted(m["segment"] for m in partials) == [0, 1]
+    final = messages[-1]
+    assert len(final["segments"]) == 2
+    assert final["text"]
@@ -0,0 +1,49 @@
+import os
+from app.services.tajweed_lexicon import TajweedLexicon, build_lexicon, DEFAULT_LEXICON_PATH
+from app.services.tajweed_service import TajweedService
+
+SAMPLE = os.path.join(os.path.dirname(__file__), "data", "quran_sample.txt")
+
+def test_only_whole_words_are_replaced():
+    """Test that a lexicon word inside a longer word is left alone."""
+    lexicon = TajweedLexicon({"رب": "رَبِّ", "برب": "بِرَبِّ"})
+
+    assert lexicon.apply("رب برب عرب") == "رَبِّ بِرَبِّ عرب"
+
+def test_punctuation_and_unknown_words_are_kept():
+    """Test that text around known words passes through unchanged."""
+    lexicon = TajweedLexicon({"الله": "اللَّهِ"})
+
+    assert lexicon.apply("قال الله، (الله) 12") == "قال اللَّهِ، (اللَّهِ) 12"
+
+def test_spelling_variants_match():
+    """Test that alef and hamza variants of a word find its entry."""
+    lexicon = TajweedLexicon({"إياك": "إِيَّاكَ"})
+
+    assert lexicon.apply("اياك") == "إِيَّاكَ"
+    assert lexicon.lookup("إياك") == "إِيَّاكَ"
+
+def test_default_lexicon_file_loads():
+    """Test that the shipped lexicon is read once and used by the fallback."""
+    lexicon = TajweedLexicon.load(DEFAULT_LEXICON_PATH)
+    service = TajweedService()
+
+    assert len(lexicon) >= 40
+    assert service._fallback_tajweed("الحمد لله رب العالمين") == "الْحَمْدُ لله رَبِّ الْعَالَمِينَ"
+
+def test_missing_lexicon_is_empty(tmp_path):
+    """Test that a missing file leaves text unchanged instead of failing."""
+    lexicon = TajweedLexicon.load(str(tmp_path / "missing.txt"))
+
+    assert len(lexicon) == 0
+    assert lexicon.apply("بسم الله") == "بسم الله"
+
+def test_build_lexicon_from_diacritized_corpus(tmp_path):
+    """Test that every corpus word is written with its diacritized form."""
+    path = str(tmp_path / "lexicon.txt")
+
+    count = build_lexicon(SAMPLE, path)
+    lexicon = TajweedLexicon.load(path)
+
+    assert count == len(lexicon) > 0
+    assert lexicon.apply("الحمد لله رب العالمين") == "الْحَمْدُ لِلَّهِ رَبِّ الْعَالَمِينَ"
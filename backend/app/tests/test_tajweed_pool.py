@@ -0,0 +1,91 @@
+import asyncio
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.tajweed_pool import TajweedPool
+from app.services.tajweed_service import TajweedService
+
+class FakeMishkal:
+    """Diacritizes each word with a fatha, fails on 'خطأ' and counts calls."""
+    def __init__(self):
+        self.calls = []
+
+    def tashkeel(self, text):
+        self.calls.append(text)
+        if "خطأ" in text:
+            raise ValueError("cannot diacritize")
+        return " ".join(word + "َ" for word in text.split())
+
+def make_pool(mishkal, max_workers=0):
+    service = TajweedService()
+    service.mishkal = mishkal
+    service.available = True
+    return TajweedPool(service, max_workers=max_workers, chunk_size=2)
+
+def test_batch_deduplicates_and_keeps_order():
+    """Test that texts equal up to diacritics are diacritized once and results follow the input."""
+    mishkal = FakeMishkal()
+    pool = make_pool(mishkal)
+
+    results = asyncio.run(pool.add_tajweed_many(["كتب الدرس", "قرأ", "كَتَبَ الدرس", "قرأ"]))
+
+    assert [result["index"] for result in results] == [0, 1, 2, 3]
+    assert all(result["success"] for result in results)
+    assert sorted(mishkal.calls) == sorted(["كتب الدرس", "قرأ"])
+    assert results[0]["text_with_tajweed"] == results[2]["text_with_tajweed"] == "كتبَ الدرسَ"
+    assert results[2]["original_text"] == "كَتَبَ الدرس"
+    # Results are cached in the parent like single requests
+    assert pool.tajweed_service.add_tajweed("قرأ") == "قرأَ"
+    assert len(mishkal.calls) == 2
+
+def test_batch_reports_errors_per_item():
+    """Test that a blank or failing text does not fail the rest of the batch."""
+    pool = make_pool(FakeMishkal())
+
+    def diacritize(text):
+        if text == "خطأ":
+            raise RuntimeError("worker died")
+        return "mishkal", text + "ُ"
+    pool.tajweed_service.diacritize = diacritize
+
+    results = asyncio.run(pool.add_tajweed_many(["قرأ", "  ", "خطأ"]))
+
+    assert results[0] == {"index": 0, "success": True, "text_with_tajweed": "قرأُ", "original_text": "قرأ"}
+    assert results[1] == {"index": 1, "success": False, "error": "Text is required"}
+    assert results[2] == {"index": 2, "success": False, "error": "worker died"}
+
+def test_single_text_matches_the_service():
+    """Test that the pool's add_tajweed gives the same text as TajweedService."""
+    pool = make_pool(FakeMishkal())
+
+    assert asyncio.run(pool.add_tajweed("بسم الله")) == "بسمَ اللهَ"
+    assert asyncio.run(pool.add_tajweed("")) == ""
+    # Only diacritics: nothing reaches Mishkal or the tier counts
+    assert asyncio.run(pool.add_tajweed("َ")) == ""
+    assert pool.tajweed_service.stats()["hits"]["mishkal"] == 1
+
+def test_process_pool_workers_diacritize():
+    """Test that texts sent to worker processes come back in order."""
+    pool = make_pool(FakeMishkal(), max_workers=2)
+    texts = ["الله", "الرحمن", "الرحيم", "الله", "العالمين"]
+    try:
+        results = asyncio.run(pool.add_tajweed_many(texts))
+    finally:
+        pool.shutdown()
+
+    # Mishkal is not installed in the workers, so they use the lexicon fallback
+    expected = [pool.tajweed_service._fallback_tajweed(text) for text in texts]
+    assert [result["text_with_tajweed"] for result in results] == expected
+    assert pool.tajweed_service.stats()["hits"]["fallback"] == 4
+
+def test_batch_endpoint():
+    """Test the /add_tajweed/batch endpoint's shape and limits."""
+    client = TestClient(app)
+
+    response = client.post("/add_tajweed/batch", json={"texts": ["بسم الله", ""]})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 2
+    assert data["results"][0]["success"] is True
+    assert data["results"][1] == {"index": 1, "success": False, "error": "Text is required"}
+
+    assert client.post("/add_tajweed/batch", json={"texts": []}).status_code == 400
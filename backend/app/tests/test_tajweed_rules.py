@@ -0,0 +1,170 @@
+import asyncio
+import threading
+from pathlib import Path
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.registry import registry
+from app.services.quran_corpus import QuranCorpus, build_corpus_db
+from app.services.tajweed_rules import find_rules
+from app.services.tajweed_span_index import (
+    SpanIndexStaleError,
+    TajweedRulesService,
+    TajweedSpanIndex,
+    build_span_index,
+    load_span_index,
+)
+
+SAMPLE = Path(__file__).parent / "data" / "quran_sample.txt"
+
+@pytest.fixture
+def corpus(tmp_path):
+    db_path = tmp_path / "quran.db"
+    build_corpus_db(str(SAMPLE), str(db_path))
+    return QuranCorpus(str(db_path))
+
+def rules(text):
+    """(covered text, rule) pairs, easier to read than offsets."""
+    return [(text[start:end], rule) for start, end, rule in find_rules(text)]
+
+def test_noon_sakinah_and_tanween():
+    """Test iqlab, ikhfa and idgham after noon sakinah and tanween, and izhar."""
+    assert ("نْ بَ", "iqlab") in rules("مِنْ بَعْدِ ذَلِكَ")
+    assert ("نْ شَ", "ikhfa") in rules("مِنْ شَرِّ مَا")
+    assert ("نْ يَ", "idgham") in rules("مَنْ يَعْمَلْ")
+    assert ("ن لَّ", "idgham") in rules("وَلَمْ يَكُن لَّهُ كُفُوًا أَحَدٌ")
+    # Tanween's alef seat is skipped
+    assert ("عًا بَ", "iqlab") in rules("سَمِيعًا بَصِيرًا")
+    # Izhar before throat letters, and no idgham inside one word
+    assert rules("مِنْ عِلْمٍ") == []
+    assert not any(rule == "idgham" for _, rule in rules("الدُّنْيَا"))
+
+def test_meem_sakinah_and_ghunna():
+    """Test ikhfa and idgham shafawi and ghunna on a doubled noon or meem."""
+    assert ("مْ بِ", "ikhfa") in rules("تَرْمِيهِمْ بِحِجَارَةٍ")
+    assert ("مْ مَ", "idgham") in rules("لَهُمْ مَا")
+    assert rules("إِنَّ") == [("نَّ", "ghunna")]
+
+def test_qalqala():
+    """Test qalqala on sukun and on the last letter at the stop."""
+    assert rules("لَمْ يَلِدْ وَلَمْ يُولَدْ").count(("دْ", "qalqala")) == 2
+    assert rules("قُلْ هُوَ اللَّهُ أَحَدٌ") == [("دٌ", "qalqala")]
+
+def test_madd_lengths():
+    """Test natural, hamza-following and sukun-following madd."""
+    assert ("قَا", "madd_2") in rules("قَالَ رَبُّكَ")
+    assert ("جَا", "madd_4") in rules("جَاءَ نَصْرُ")
+    assert ("نَّا", "madd_4") in rules("إِنَّا أَعْطَيْنَاكَ")
+    assert ("ضَّا", "madd_6") in rules("وَلَا الضَّالِّينَ")
+    # Shortened before hamzat al-wasl
+    assert ("لَا", "madd_2") not in rules("وَلَا الضَّالِّينَ")
+    # Dagger alef
+    assert ("مَٰ", "madd_2") in rules("الرَّحْمَٰنِ الرَّحِيمِ")
+
+def test_undiacritized_text_has_no_spans():
+    """Test that plain text is not mistaken for text full of sukun."""
+    assert find_rules("بسم الله الرحمن الرحيم من بعد") == []
+
+def test_span_index_matches_the_engine(corpus, tmp_path):
+    """Test that every ayah's indexed spans equal computing them on demand."""
+    path = str(tmp_path / "spans.bin")
+    build_span_index(corpus, path)
+    index = TajweedSpanIndex(path, corpus)
+
+    assert len(index) == len(corpus)
+    for ayah in range(len(corpus)):
+        assert index.spans(ayah) == find_rules(corpus.texts[ayah])
+
+def test_stale_index_is_rebuilt(corpus, tmp_path):
+    """Test that an index built from another corpus is detected and rebuilt."""
+    path = str(tmp_path / "spans.bin")
+    build_span_index(corpus, path)
+    corpus.texts[0] = corpus.texts[0] + " "
+
+    with pytest.raises(SpanIndexStaleError):
+        TajweedSpanIndex(path, corpus)
+    index = load_span_index(corpus, path)
+    assert len(index) == len(corpus)
+
+def test_concurrent_builds_do_not_collide(corpus, tmp_path):
+    """Test that workers building the same index at once each write their own temp file."""
+    path = str(tmp_path / "spans.bin")
+    errors = []
+
+    def build():
+        try:
+            build_span_index(corpus, path)
+        except Exception as e:
+            errors.append(e)
+    builders = [threading.Thread(target=build) for _ in range(4)]
+    for builder in builders:
+        builder.start()
+    for builder in builders:
+        builder.join()
+
+    assert errors == []
+    # No temp files left behind
+    assert sorted(entry.name for entry in tmp_path.iterdir()) == ["quran.db", "spans.bin"]
+    assert len(TajweedSpanIndex(path, corpus)) == len(corpus)
+
+def test_service_uses_the_index_for_whole_ayat(corpus, tmp_path):
+    """Test that verbatim ayat come from the index and other text is computed."""
+    service = TajweedRulesService(corpus, load_span_index(corpus, str(tmp_path / "spans.bin")))
+
+    passage = service.annotate_reference("112:3-4")
+    assert passage["source"] == "index"
+    assert passage["reference"] == "112:3-4"
+    # Each ayah is annotated on its own (it ends with a stop), then shifted
+    first, second = corpus.texts[-2], corpus.texts[-1]
+    offset = len(first) + 1
+    expected = find_rules(first) + [(start + offset, end + offset, rule) for start, end, rule in find_rules(second)]
+    assert passage["text"] == f"{first} {second}"
+    assert [(span["start"], span["end"], span["rule"]) for span in passage["spans"]] == expected
+
+    # Undiacritized whole ayat get the corpus text and its spans
+    recited = service.annotate("لم يلد ولم يولد ولم يكن له كفوا أحد")
+    assert recited["text"] == passage["text"]
+    assert recited["spans"] == passage["spans"]
+
+    computed = service.annotate("مِنْ بَعْدِ")
+    assert computed["source"] == "computed"
+    assert computed["spans"][0] == {"start": 2, "end": 7, "rule": "iqlab"}
+
+def test_rules_endpoint():
+    """Test /add_tajweed/rules on text and its input validation."""
+    client = TestClient(app)
+
+    response = client.post("/add_tajweed/rules", json={"text": "مِنْ بَعْدِ"})
+    assert response.status_code == 200
+    assert {"start": 2, "end": 7, "rule": "iqlab"} in response.json()["spans"]
+
+    assert client.post("/add_tajweed/rules", json={}).status_code == 400
+
+@pytest.mark.asyncio
+async def test_rules_endpoint_does_not_block_while_the_index_builds(monkeypatch):
+    """Test that other requests are answered while /add_tajweed/rules builds the span index."""
+    building = threading.Event()
+    release = threading.Event()
+    built = threading.Event()
+
+    def slow_tajweed_rules():
+        building.set()
+        release.wait(5)
+        built.set()
+        return TajweedRulesService()
+    monkeypatch.setattr(registry, "tajweed_rules", slow_tajweed_rules)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        rules_request = asyncio.create_task(client.post("/add_tajweed/rules", json={"text": "مِنْ بَعْدِ"}))
+        assert await asyncio.to_thread(building.wait, 5)
+
+        health = await asyncio.wait_for(client.get("/health"), 2)
+        assert health.status_code == 200
+        assert not built.is_set()
+
+        release.set()
+        response = await rules_request
+    assert response.status_code == 200
+    assert {"start": 2, "end": 7, "rule": "iqlab"} in response.json()["spans"]
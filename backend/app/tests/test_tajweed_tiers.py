@@ -0,0 +1,91 @@
+from pathlib import Path
+import pytest
+from app.services.quran_corpus import QuranCorpus, build_corpus_db
+from app.services.tajweed_service import TajweedService
+
+SAMPLE = Path(__file__).parent / "data" / "quran_sample.txt"
+
+class FakeMishkal:
+    """Diacritizes each word with a fatha and counts calls."""
+    def __init__(self):
+        self.calls = []
+
+    def tashkeel(self, text):
+        self.calls.append(text)
+        return " ".join(word + "َ" for word in text.split())
+
+@pytest.fixture
+def corpus(tmp_path):
+    db_path = tmp_path / "quran.db"
+    build_corpus_db(str(SAMPLE), str(db_path))
+    return QuranCorpus(str(db_path))
+
+@pytest.fixture
+def mishkal():
+    return FakeMishkal()
+
+def make_service(corpus, mishkal):
+    service = TajweedService(corpus=corpus)
+    service.mishkal = mishkal
+    service.available = True
+    return service
+
+def test_verbatim_ayat_come_from_the_corpus(corpus, mishkal):
+    """Test that whole ayat get their canonical diacritization without Mishkal."""
+    service = make_service(corpus, mishkal)
+
+    result = service.add_tajweed("قل هو الله أحد الله الصمد")
+
+    assert result == "قُلْ هُوَ اللَّهُ أَحَدٌ اللَّهُ الصَّمَدُ"
+    assert mishkal.calls == []
+    assert service.stats()["hits"]["corpus"] == 1
+
+def test_mishkal_runs_once_per_sentence(corpus, mishkal):
+    """Test that repeated non-Qur'an text is served from the sentence cache."""
+    service = make_service(corpus, mishkal)
+
+    first = service.add_tajweed("كتب الطالب الدرس")
+    second = service.add_tajweed("كتب الطالب الدرس")
+
+    assert first == second
+    assert mishkal.calls == ["كتب الطالب الدرس"]
+    assert service.stats()["hits"]["sentence_cache"] == 1
+
+def test_known_words_are_composed_from_the_word_cache(corpus, mishkal):
+    """Test that a new sentence made of seen words skips Mishkal."""
+    service = make_service(corpus, mishkal)
+    service.add_tajweed("كتب الطالب الدرس")
+
+    result = service.add_tajweed("الدرس كتب")
+
+    assert result == "الدرسَ كتبَ"
+    assert len(mishkal.calls) == 1
+    stats = service.stats()
+    assert stats["hits"] == {"corpus": 0, "sentence_cache": 0, "word_cache": 1, "mishkal": 1, "fallback": 0}
+    assert stats["hit_rates"]["word_cache"] == 0.5
+
+def test_partial_word_hits_still_run_mishkal(corpus, mishkal):
+    """Test that one unseen word sends the whole sentence to Mishkal."""
+    service = make_service(corpus, mishkal)
+    service.add_tajweed("كتب الطالب")
+
+    service.add_tajweed("كتب المعلم")
+
+    assert mishkal.calls == ["كتب الطالب", "كتب المعلم"]
+
+def test_without_mishkal_the_lexicon_is_used(corpus):
+    """Test that misses fall back to the lexicon when Mishkal is unavailable."""
+    service = TajweedService(corpus=corpus)
+    service.available = False
+
+    assert service.add_tajweed("بسم الله كتب") == "بِسْمِ اللَّهِ كتب"
+    assert service.stats()["hits"]["fallback"] == 1
+
+def test_diacritics_only_text_is_not_counted(corpus, mishkal):
+    """Test that text emptied by removing diacritics records no tier hit."""
+    service = make_service(corpus, mishkal)
+
+    assert service.add_tajweed("َ ُ").strip() == ""
+    assert service.lookup("") is None
+    assert mishkal.calls == []
+    assert sum(service.stats()["hits"].values()) == 0
@@ -0,0 +1,82 @@
+import pytest
+from app.services.transcription_cache import TranscriptionCache
+from app.services.transcription_service import TranscriptionService
+from app.services.asr_engines import create_engine
+
+def test_key_depends_on_audio_and_settings():
+    """Test that any output-affecting setting changes the cache key."""
+    key = TranscriptionCache.make_key(b"audio", model="small", add_tajweed=True)
+
+    assert key == TranscriptionCache.make_key(b"audio", add_tajweed=True, model="small")
+    assert key != TranscriptionCache.make_key(b"audio!", model="small", add_tajweed=True)
+    assert key != TranscriptionCache.make_key(b"audio", model="small", add_tajweed=False)
+
+def test_lru_eviction_and_ttl(monkeypatch):
+    """Test that the memory tier honours its size and TTL limits."""
+    now = [1000.0]
+    monkeypatch.setattr("app.services.transcription_cache.time.time", lambda: now[0])
+    cache = TranscriptionCache(max_entries=2, ttl_seconds=60)
+
+    cache.set("a", {"text": "a"})
+    cache.set("b", {"text": "b"})
+    assert cache.get("a") == {"text": "a"}  # "a" becomes most recent
+    cache.set("c", {"text": "c"})
+
+    assert cache.get("b") is None
+    assert cache.get("c") == {"text": "c"}
+
+    now[0] += 61
+    assert cache.get("a") is None
+
+    stats = cache.stats()
+    assert stats["memory_hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["evictions"] == 1
+
+def test_callers_cannot_mutate_cached_entries():
+    """Test that nested words and metadata are copied in and out of the cache."""
+    cache = TranscriptionCache()
+    value = {"text": "بسم", "words": [{"word": "بسم", "start": 0.0}], "metadata": {"engine": "fake"}}
+
+    cache.set("a", value)
+    value["words"][0]["word"] = "changed"
+    first = cache.get("a")
+    first["words"].append({"word": "extra"})
+    first["metadata"]["engine"] = "changed"
+
+    assert cache.get("a") == {"text": "بسم", "words": [{"word": "بسم", "start": 0.0}], "metadata": {"engine": "fake"}}
+
+def test_disk_tier_survives_restart(tmp_path):
+    """Test that entries persisted to SQLite are found by a new instance."""
+    db_path = str(tmp_path / "transcriptions.db")
+    TranscriptionCache(max_entries=4, db_path=db_path).set("key", {"text": "بسم الله"})
+
+    cache = TranscriptionCache(max_entries=4, db_path=db_path)
+
+    assert cache.get("key") == {"text": "بسم الله"}
+    assert cache.stats()["disk_hits"] == 1
+
+@pytest.mark.asyncio
+async def test_service_serves_repeat_upload_from_cache(monkeypatch):
+    """Test that the second identical upload skips Whisper."""
+    service = TranscriptionService()
+    service.use_whisper = True
+    service.engine = create_engine("fake")
+    service.engine.load()
+    service.add_tajweed = False
+    service.cache = TranscriptionCache(max_entries=4)
+    calls = []
+
+    async def fake_whisper(audio_bytes, filename, decoding_mode):
+        calls.append(filename)
+        return {"text": "بسم الله", "confidence": 0.95}
+
+    monkeypatch.setattr(service, "_transcribe_with_engine", fake_whisper)
+
+    first = await service.transcribe(b"same recording", "a.m4a")
+    second = await service.transcribe(b"same recording", "b.m4a")
+
+    assert first["cached"] is False
+    assert second["cached"] is True
+    assert second["text"] == first["text"]
+    assert calls == ["a.m4a"]
@@ -0,0 +1,95 @@
+import io
+import wave
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services.transcription_service import TranscriptionService
+from app.services.vad import EnergyVAD
+
+SAMPLE_RATE = 16000
+
+def _tone(seconds):
+    t = np.arange(int(SAMPLE_RATE * seconds)) / SAMPLE_RATE
+    return (0.3 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+
+def _silence(seconds, level=0.0):
+    rng = np.random.default_rng(0)
+    return (rng.standard_normal(int(SAMPLE_RATE * seconds)) * level).astype(np.float32)
+
+def test_leading_and_trailing_silence_is_trimmed():
+    """Test that silence at both ends is cut down to the padding."""
+    vad = EnergyVAD(padding_ms=210)
+    audio = np.concatenate([_silence(2.0, 0.001), _tone(1.5), _silence(3.0, 0.001)])
+
+    trimmed, stats = vad.trim(audio)
+
+    assert stats["speech"] is True
+    assert 1.8 <= stats["kept_seconds"] <= 2.0
+    assert stats["removed_seconds"] == pytest.approx(6.5 - stats["kept_seconds"], abs=0.001)
+    assert len(trimmed) / SAMPLE_RATE == pytest.approx(stats["kept_seconds"], abs=0.001)
+
+def test_long_internal_pause_is_collapsed():
+    """Test that a pause between ayat is shortened but not removed."""
+    vad = EnergyVAD(padding_ms=0, max_pause_ms=600)
+    audio = np.concatenate([_tone(1.0), _silence(4.0), _tone(1.0)])
+
+    _, stats = vad.trim(audio)
+
+    assert stats["kept_seconds"] == pytest.approx(2.6, abs=0.05)
+
+def test_continuous_speech_is_kept_whole():
+    """Test that a recording without pauses is not trimmed."""
+    _, stats = EnergyVAD().trim(_tone(3.0))
+
+    assert stats["removed_seconds"] < 0.05
+
+def test_silence_only_is_detected():
+    """Test that a silent recording reports no speech."""
+    trimmed, stats = EnergyVAD().trim(_silence(3.0, 0.0005))
+
+    assert stats["speech"] is False
+    assert len(trimmed) == 0
+
+@pytest.mark.asyncio
+async def test_silent_upload_never_reaches_the_model(monkeypatch):
+    """Test that the service short-circuits silence-only recordings."""
+    monkeypatch.setenv("ASR_ENGINE", "fake")
+    service = TranscriptionService()
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(np.zeros(SAMPLE_RATE * 2, dtype="<i2").tobytes())
+
+    result = await service.transcribe(buffer.getvalue(), "silence.wav")
+
+    assert result["text"] == ""
+    assert result["vad"]["speech"] is False
+    assert service.engine.report()["latency_ms"]["count"] == 0
+
+@pytest.mark.asyncio
+async def test_vad_runs_off_the_event_loop(monkeypatch):
+    """Test that silence trimming runs in a worker thread, not on the event loop."""
+    import threading
+    monkeypatch.setenv("ASR_ENGINE", "fake")
+    service = TranscriptionService()
+    trim = service.vad.trim
+    threads = []
+
+    def recording_trim(audio):
+        threads.append(threading.get_ident())
+        return trim(audio)
+    monkeypatch.setattr(service.vad, "trim", recording_trim)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes((_tone(1.0) * 32767).astype("<i2").tobytes())
+
+    await service.transcribe(buffer.getvalue(), "tone.wav")
+
+    assert threads and threads[0] != threading.get_ident()
@@ -0,0 +1,56 @@
+from pathlib import Path
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+from app.services.quran_corpus import QuranCorpus, build_corpus_db
+from app.services.registry import registry
+from app.services.verse_index import VerseIndex
+
+SAMPLE = Path(__file__).parent / "data" / "quran_sample.txt"
+
+@pytest.fixture
+def corpus(tmp_path):
+    db_path = tmp_path / "quran.db"
+    build_corpus_db(str(SAMPLE), str(db_path))
+    return QuranCorpus(str(db_path))
+
+@pytest.fixture
+def index(corpus):
+    return VerseIndex(corpus)
+
+def test_identifies_single_ayah(index):
+    """Test that an exact transcript finds its ayah first."""
+    candidates = index.search("مالك يوم الدين")
+
+    assert candidates[0]["reference"] == "1:4"
+    assert candidates[0]["score"] > 0.9
+
+def test_identifies_ayah_despite_misspellings(index):
+    """Test that character n-grams survive ASR spelling errors."""
+    candidates = index.search("اهدنا السراط المستقيم")
+
+    assert candidates[0]["reference"] == "1:6"
+
+def test_identifies_range_of_ayat(index):
+    """Test that a transcript spanning consecutive ayat returns a range."""
+    candidates = index.search("قل هو الله احد الله الصمد لم يلد ولم يولد")
+
+    assert candidates[0]["reference"] == "112:1-3"
+
+def test_unknown_text_returns_no_candidates(index):
+    """Test that text without any indexed grams finds nothing."""
+    assert index.search("xyz qwe") == []
+
+def test_identify_verse_endpoint_compares_candidates(corpus, index, monkeypatch):
+    """Test that candidates are compared and the best one is returned."""
+    monkeypatch.setattr(registry, "_corpus", corpus)
+    monkeypatch.setattr(registry, "_verse_index", index)
+    client = TestClient(app)
+
+    response = client.post("/identify_verse", json={"recognized_text": "الحمد لله رب العالمين", "top_k": 3})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["candidates"]) <= 3
+    assert data["best"]["reference"] == "1:2"
+    assert data["best"]["comparison"]["match_percentage"] == 100.0
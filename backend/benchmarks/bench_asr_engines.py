@@ -0,0 +1,116 @@
+"""
+Compare ASR engines on this machine.
+
+Loads each engine, transcribes the same audio several times and prints
+every engine's report (load time, latency percentiles, real-time factor,
+memory) side by side.
+
+Usage (from backend/):
+    python -m benchmarks.bench_asr_engines --engines whisper whisper-int8 faster-whisper \
+        --audio app/tests/data/test_verse.wav --runs 5
+
+Engines are benchmarked one per process when --isolate is set so memory
+figures are not polluted by previously loaded models.
+"""
+import argparse
+import json
+import subprocess
+import sys
+
+import numpy as np
+
+from app.services.asr_engines import EngineUnavailableError, create_engine
+from app.services.audio_decoder import SAMPLE_RATE, decode_audio, detect_audio_format
+from app.services.transcription_service import WHISPER_INITIAL_PROMPT
+
+# The service's default decoding settings
+OPTIONS = {
+    "language": "ar",
+    "task": "transcribe",
+    "fp16": False,
+    "temperature": 0.0,
+    "beam_size": 5,
+    "best_of": 5,
+    "condition_on_previous_text": True,
+    "initial_prompt": WHISPER_INITIAL_PROMPT,
+}
+
+
+def load_audio(path):
+    if not path:
+        # Five seconds of a quiet tone; fine for latency, meaningless for accuracy
+        t = np.arange(SAMPLE_RATE * 5) / SAMPLE_RATE
+        return (0.1 * np.sin(2 * np.pi * 220 * t)).astype(np.float32)
+    with open(path, "rb") as audio_file:
+        audio_bytes = audio_file.read()
+    return decode_audio(audio_bytes, detect_audio_format(audio_bytes, path))
+
+
+def run_engine(name, model, audio, runs, batch):
+    engine = create_engine(name, model)
+    try:
+        engine.load()
+    except EngineUnavailableError as e:
+        return {"engine": name, "error": str(e)}
+
+    options = dict(OPTIONS)
+    # First call primes kernels and allocators; keep it out of the figures
+    engine.transcribe(audio, options)
+    engine._latencies.clear()
+    engine._audio_seconds = 0.0
+
+    text = ""
+    for _ in range(runs):
+        if batch > 1:
+            text = engine.transcribe_batch([audio] * batch, options)[0]["text"]
+        else:
+            text = engine.transcribe(audio, options)["text"]
+
+    report = engine.report()
+    report["text"] = text.strip()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--engines", nargs="+", default=["whisper", "whisper-int8", "faster-whisper"])
+    parser.add_argument("--model", default="small")
+    parser.add_argument("--audio", help="Audio file to transcribe (defaults to a synthetic tone)")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--batch", type=int, default=1, help="Recordings per transcribe_batch call")
+    parser.add_argument("--isolate", action="store_true", help="Run each engine in its own process")
+    parser.add_argument("--json", action="store_true", help="Print reports as one JSON line")
+    args = parser.parse_args()
+
+    reports = []
+    for name in args.engines:
+        if args.isolate and len(args.engines) > 1:
+            cmd = [sys.executable, "-m", "benchmarks.bench_asr_engines", "--json", "--engines", name,
+                   "--model", args.model, "--runs", str(args.runs), "--batch", str(args.batch)]
+            if args.audio:
+                cmd += ["--audio", args.audio]
+            output = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+            reports.append(json.loads(output.strip().splitlines()[-1])[0])
+        else:
+            reports.append(run_engine(name, args.model, load_audio(args.audio), args.runs, args.batch))
+
+    if args.json:
+        print(json.dumps(reports, ensure_ascii=False))
+        return
+
+    print(f"{'engine':<16}{'load s':>8}{'avg ms':>10}{'p95 ms':>10}{'RTF':>8}{'RSS MB':>9}{'load MB':>9}")
+    for report in reports:
+        if "error" in report:
+            print(f"{report['engine']:<16}  unavailable: {report['error']}")
+            continue
+        print(
+            f"{report['engine']:<16}{report['load_seconds']:>8.2f}"
+            f"{report['latency_ms']['avg']:>10.1f}{report['latency_ms']['p95']:>10.1f}"
+            f"{report['real_time_factor']:>8.3f}{report['memory_mb']['rss'] or 0:>9.1f}"
+            f"{report['memory_mb']['load_delta']:>9.1f}"
+        )
+    print(json.dumps(reports, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
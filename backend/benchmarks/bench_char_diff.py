@@ -0,0 +1,78 @@
+"""
+Cost of the per-word letter diff in the verse comparison.
+
+Runs the same verse/transcript pairs as bench_similarity with the diff
+off, on with a cold cache and on with a warm cache, and times the
+bit-parallel diff against a plain DP over the mismatched word pairs alone.
+
+Usage (from backend/):
+    python -m benchmarks.bench_char_diff --rounds 20
+"""
+import argparse
+import random
+import time
+
+from app.services.char_diff import char_edits, edit_distance
+from app.services.comparison_service import ComparisonService
+from benchmarks.bench_similarity import VERSES, make_transcript
+
+
+def run(pairs, rounds, enabled, cold=False):
+    service = ComparisonService()
+    service.char_diff = enabled
+    started = time.perf_counter()
+    for _ in range(rounds):
+        if cold:
+            char_edits.cache_clear()
+        for transcript, verse in pairs:
+            service.compare(transcript, verse)
+    return time.perf_counter() - started
+
+
+def dp_distance(a, b):
+    row = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        previous, row[0] = row[:], i
+        for j in range(1, len(b) + 1):
+            row[j] = min(previous[j] + 1, row[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+    return row[-1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--attempts", type=int, default=20, help="Transcripts per verse")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pairs = [(make_transcript(verse, rng), verse) for verse in VERSES for _ in range(args.attempts)]
+    comparisons = len(pairs) * args.rounds
+    run(pairs, 1, True)
+
+    timings = {
+        "off": run(pairs, args.rounds, False),
+        "on (cold)": run(pairs, args.rounds, True, cold=True),
+        "on (warm)": run(pairs, args.rounds, True),
+    }
+    print(f"{comparisons} comparisons ({len(pairs)} verse/transcript pairs x {args.rounds} rounds)")
+    for name, seconds in timings.items():
+        overhead = (seconds / timings["off"] - 1) * 100
+        print(f"  {name:<10} {seconds * 1000 / comparisons:8.3f} ms/comparison  {overhead:+6.1f}%")
+
+    service = ComparisonService()
+    words = []
+    for transcript, verse in pairs:
+        for entry in service.compare(transcript, verse)["word_comparisons"]:
+            if entry["verse"] and entry["recognized"] and entry["verse"] != entry["recognized"]:
+                words.append((entry["verse"], entry["recognized"]))
+    for name, distance in (("dp", dp_distance), ("bit-parallel", edit_distance)):
+        started = time.perf_counter()
+        for _ in range(args.rounds):
+            for verse_word, recognized_word in words:
+                distance(verse_word, recognized_word)
+        seconds = time.perf_counter() - started
+        print(f"  {name:<12} {seconds * 1e6 / (len(words) * args.rounds):6.2f} us/word pair ({len(words)} pairs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Benchmark the shared Arabic normalizer against the previous implementation.
+
+The previous code stripped a diacritics string with a per-character
+generator and a `not in` test, then collapsed whitespace with a regex.
+The new one is a single precompiled str.translate pass; normalize_batch
+translates many strings in one call.
+
+Usage (from backend/):
+    python -m benchmarks.bench_normalizer --rounds 2000
+"""
+import argparse
+import re
+import time
+
+from app.services.arabic_normalizer import normalize, normalize_batch
+
+TEXTS = [
+    "بِسْمِ اللَّهِ الرَّحْمَٰنِ الرَّحِيمِ",
+    "الْحَمْدُ لِلَّهِ رَبِّ الْعَالَمِينَ",
+    "صِرَاطَ الَّذِينَ أَنْعَمْتَ عَلَيْهِمْ غَيْرِ الْمَغْضُوبِ عَلَيْهِمْ وَلَا الضَّالِّينَ",
+    "ٱللَّهُ لَآ إِلَٰهَ إِلَّا هُوَ ٱلْحَىُّ ٱلْقَيُّومُ ۚ لَا تَأْخُذُهُۥ سِنَةٌ وَلَا نَوْمٌ ۚ لَّهُۥ مَا فِى ٱلسَّمَٰوَٰتِ وَمَا فِى ٱلْأَرْضِ",
+    "قل هو الله احد الله الصمد",
+]
+
+
+def legacy_normalize(text):
+    diacritics = "ًٌٍَُِّْٰۖۗۘۙۚۛۜ"
+    normalized = "".join(char for char in text if char not in diacritics)
+    return re.sub(r'\s+', ' ', normalized).strip()
+
+
+def timed(fn, rounds):
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    words = [word for text in TEXTS for word in text.split()]
+    cases = {
+        "verses": TEXTS,
+        "words": words,
+    }
+    for name, texts in cases.items():
+        count = len(texts) * args.rounds
+        legacy = timed(lambda: [legacy_normalize(text) for text in texts], args.rounds)
+        single = timed(lambda: [normalize(text) for text in texts], args.rounds)
+        batch = timed(lambda: normalize_batch(texts), args.rounds)
+        print(f"{name} ({count} strings)")
+        for label, seconds in (("legacy", legacy), ("normalize", single), ("normalize_batch", batch)):
+            print(f"  {label:<16} {seconds * 1e6 / count:7.2f} us/string  {legacy / seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Micro-benchmark for word-similarity scoring in the verse comparison.
+
+Compares realistic verse/transcript pairs three ways:
+  full       - SequenceMatcher for every pair the alignment looks at
+  prefilter  - length and quick-ratio bounds, no cache
+  cached     - bounds plus the shared LRU (the service default), measured
+               after one warm-up pass as on a long-running server
+
+Usage (from backend/):
+    python -m benchmarks.bench_similarity --rounds 20
+"""
+import argparse
+import random
+import time
+
+from app.services import comparison_service
+from app.services.comparison_service import ComparisonService, word_similarity, thresholded_similarity
+
+VERSES = [
+    "بسم الله الرحمن الرحيم",
+    "الحمد لله رب العالمين",
+    "الرحمن الرحيم",
+    "مالك يوم الدين",
+    "اياك نعبد واياك نستعين",
+    "اهدنا الصراط المستقيم",
+    "صراط الذين انعمت عليهم غير المغضوب عليهم ولا الضالين",
+    "الله لا اله الا هو الحي القيوم لا تاخذه سنة ولا نوم له ما في السماوات وما في الارض "
+    "من ذا الذي يشفع عنده الا باذنه يعلم ما بين ايديهم وما خلفهم ولا يحيطون بشيء من علمه "
+    "الا بما شاء وسع كرسيه السماوات والارض ولا يئوده حفظهما وهو العلي العظيم",
+    "قل هو الله احد الله الصمد لم يلد ولم يولد ولم يكن له كفوا احد",
+    "قل اعوذ برب الناس ملك الناس اله الناس من شر الوسواس الخناس",
+]
+
+
+def make_transcript(verse, rng):
+    """Imitate ASR output: dropped, repeated and misspelled words."""
+    words = []
+    for word in verse.split():
+        roll = rng.random()
+        if roll < 0.05:
+            continue
+        if roll < 0.15 and len(word) > 2:
+            position = rng.randrange(len(word))
+            word = word[:position] + rng.choice("اتنيوه") + word[position + 1:]
+        words.append(word)
+        if roll > 0.97:
+            words.append(word)
+    return " ".join(words)
+
+
+def run(pairs, rounds, scorer):
+    service = ComparisonService()
+    original = comparison_service.thresholded_similarity
+    comparison_service.thresholded_similarity = scorer
+    try:
+        started = time.perf_counter()
+        for _ in range(rounds):
+            for transcript, verse in pairs:
+                service.compare(transcript, verse)
+        return time.perf_counter() - started
+    finally:
+        comparison_service.thresholded_similarity = original
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--attempts", type=int, default=20, help="Transcripts per verse")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    pairs = [(make_transcript(verse, rng), verse) for verse in VERSES for _ in range(args.attempts)]
+    comparisons = len(pairs) * args.rounds
+
+    def full(word1, word2, threshold):
+        return word_similarity(word1, word2)
+
+    # Same bounds without the cache
+    prefilter = thresholded_similarity.__wrapped__
+
+    thresholded_similarity.cache_clear()
+    run(pairs, 1, thresholded_similarity)
+
+    timings = {
+        "full": run(pairs, args.rounds, full),
+        "prefilter": run(pairs, args.rounds, prefilter),
+        "cached": run(pairs, args.rounds, thresholded_similarity),
+    }
+
+    baseline = timings["full"]
+    print(f"{comparisons} comparisons ({len(pairs)} verse/transcript pairs x {args.rounds} rounds)")
+    for name, seconds in timings.items():
+        print(f"  {name:<10} {seconds * 1000 / comparisons:8.3f} ms/comparison  {baseline / seconds:5.1f}x")
+    print(f"  cache: {comparison_service.similarity_cache_stats()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Tajweed rule spans: memory-mapped index lookup vs running the rule engine.
+
+Uses the corpus at --db (default QURAN_CORPUS_DB). Without one, a synthetic
+diacritized corpus of the real corpus's size (6,236 ayat) is generated.
+Queries are single ayat and short ayah ranges, answered through
+TajweedRulesService both ways, plus the one-time cost of building and
+opening the index.
+
+Usage (from backend/):
+    python -m benchmarks.bench_tajweed_rules --queries 2000
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.services.quran_corpus import QuranCorpus, build_corpus_db
+from app.services.tajweed_span_index import TajweedRulesService, TajweedSpanIndex, build_span_index
+
+LETTERS = "ابتثجحخدذرزسشصضطظعغفقكلمنهويءأ"
+MARKS = ["َ", "ُ", "ِ", "ْ", "َّ", "ُّ", "ِّ"]
+LONG_VOWELS = {"َ": "ا", "ُ": "و", "ِ": "ي"}
+TANWEEN = ["ً", "ٌ", "ٍ"]
+AYAT = 6236
+
+
+def synthetic_word(rng):
+    letters = []
+    for _ in range(rng.randint(2, 6)):
+        mark = rng.choice(MARKS)
+        letters.append(rng.choice(LETTERS) + mark)
+        if mark in LONG_VOWELS and rng.random() < 0.25:
+            letters.append(LONG_VOWELS[mark])
+    if rng.random() < 0.15:
+        letters[-1] = letters[-1][0] + rng.choice(TANWEEN)
+    return "".join(letters)
+
+
+def synthetic_corpus(directory, rng):
+    source = os.path.join(directory, "synthetic.txt")
+    with open(source, "w", encoding="utf-8") as out:
+        surah, ayah = 1, 0
+        for _ in range(AYAT):
+            ayah += 1
+            words = [synthetic_word(rng) for _ in range(rng.randint(3, 30))]
+            out.write(f"{surah}|{ayah}|{' '.join(words)}\n")
+            if rng.random() < 0.02:
+                surah, ayah = surah + 1, 0
+    db_path = os.path.join(directory, "synthetic.db")
+    build_corpus_db(source, db_path)
+    return db_path
+
+
+def make_reference(corpus, rng):
+    start = rng.randrange(len(corpus))
+    surah, first = corpus.locations[start]
+    last = first
+    while last < corpus.surah_lengths[surah] and rng.random() < 0.3:
+        last += 1
+    return f"{surah}:{first}" if first == last else f"{surah}:{first}-{last}"
+
+
+def time_queries(service, references):
+    latencies = []
+    for reference in references:
+        started = time.perf_counter()
+        service.annotate_reference(reference)
+        latencies.append((time.perf_counter() - started) * 1e6)
+    latencies.sort()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.getenv("QURAN_CORPUS_DB", "data/quran.db"))
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = args.db
+        if not os.path.exists(db_path):
+            print(f"{db_path} not found; using a synthetic {AYAT}-ayah corpus")
+            db_path = synthetic_corpus(directory, rng)
+        corpus = QuranCorpus(db_path)
+
+        path = os.path.join(directory, "spans.bin")
+        started = time.perf_counter()
+        spans = build_span_index(corpus, path)
+        build_seconds = time.perf_counter() - started
+        started = time.perf_counter()
+        index = TajweedSpanIndex(path, corpus)
+        open_ms = (time.perf_counter() - started) * 1000
+        print(f"Index: {spans} spans for {len(corpus)} ayat, {os.path.getsize(path) / 1024:.0f} KB, "
+              f"built in {build_seconds:.2f}s, opened in {open_ms:.2f} ms")
+
+        references = [make_reference(corpus, rng) for _ in range(args.queries)]
+        results = {
+            "index lookup": time_queries(TajweedRulesService(corpus, index), references),
+            "on demand": time_queries(TajweedRulesService(corpus, None), references),
+        }
+        index.close()
+
+    print(f"{len(references)} queries (single ayat and ranges):")
+    for name, latencies in results.items():
+        print(f"  {name:<13} p50 {statistics.median(latencies):8.1f} us  "
+              f"p95 {latencies[int(len(latencies) * 0.95)]:8.1f} us  mean {statistics.fmean(latencies):8.1f} us")
+    speedup = statistics.fmean(results["on demand"]) / statistics.fmean(results["index lookup"])
+    print(f"  index lookup is {speedup:.1f}x faster on average")
+
+
+if __name__ == "__main__":
+    main()
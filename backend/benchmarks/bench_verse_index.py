@@ -0,0 +1,110 @@
+"""
+Query latency and accuracy of the verse identification index.
+
+Uses the corpus at --db (default QURAN_CORPUS_DB). Without one, a synthetic
+corpus with the real corpus's shape (114 surahs, 6,236 ayat, Zipf-distributed
+vocabulary) is generated so the index can still be measured at full scale.
+
+Queries are ayat and short ayah ranges with dropped and misspelled words,
+imitating ASR output.
+
+Usage (from backend/):
+    python -m benchmarks.bench_verse_index --queries 500
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from app.services.quran_corpus import QuranCorpus, build_corpus_db
+from app.services.verse_index import VerseIndex
+
+LETTERS = "ابتثجحخدذرزسشصضطظعغفقكلمنهوي"
+AYAT = 6236
+SURAHS = 114
+
+
+def synthetic_corpus(directory, rng):
+    vocabulary = ["".join(rng.choice(LETTERS) for _ in range(rng.randint(2, 7))) for _ in range(15000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    lengths = [max(1, int(rng.paretovariate(1.5) * 3)) for _ in range(SURAHS)]
+    scale = AYAT / sum(lengths)
+    lengths = [max(3, round(length * scale)) for length in lengths]
+    lengths[0] += AYAT - sum(lengths)
+
+    source = os.path.join(directory, "synthetic.txt")
+    with open(source, "w", encoding="utf-8") as out:
+        for surah, length in enumerate(lengths, start=1):
+            for ayah in range(1, length + 1):
+                words = rng.choices(vocabulary, weights, k=rng.randint(3, 30))
+                out.write(f"{surah}|{ayah}|{' '.join(words)}\n")
+    db_path = os.path.join(directory, "synthetic.db")
+    build_corpus_db(source, db_path)
+    return db_path
+
+
+def make_query(corpus, rng):
+    start = rng.randrange(len(corpus))
+    surah = corpus.locations[start][0]
+    stop = start + 1
+    while stop < len(corpus) and corpus.locations[stop][0] == surah and rng.random() < 0.3:
+        stop += 1
+    expected = {corpus.locations[index] for index in range(start, stop)}
+
+    words = []
+    for tokens in corpus.tokens[start:stop]:
+        for word in tokens:
+            roll = rng.random()
+            if roll < 0.08:
+                continue
+            if roll < 0.2 and len(word) > 2:
+                position = rng.randrange(len(word))
+                word = word[:position] + rng.choice(LETTERS) + word[position + 1:]
+            words.append(word)
+    return " ".join(words), expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.getenv("QURAN_CORPUS_DB", "data/quran.db"))
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = args.db
+        if not os.path.exists(db_path):
+            print(f"{db_path} not found; using a synthetic {AYAT}-ayah corpus")
+            db_path = synthetic_corpus(directory, rng)
+        corpus = QuranCorpus(db_path)
+        index = VerseIndex(corpus)
+
+    queries = [make_query(corpus, rng) for _ in range(args.queries)]
+    latencies = []
+    top1 = topk = 0
+    for text, expected in queries:
+        started = time.perf_counter()
+        candidates = index.search(text, top_k=args.top_k)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+        found = []
+        for candidate in candidates:
+            found.append({(candidate["surah"], ayah) for ayah in range(candidate["first_ayah"], candidate["last_ayah"] + 1)})
+        if found and found[0] & expected:
+            top1 += 1
+        if any(ayat & expected for ayat in found):
+            topk += 1
+
+    latencies.sort()
+    print(f"Index: {index.stats()}")
+    print(f"Corpus: {corpus.stats()}")
+    print(f"{len(queries)} queries: p50 {statistics.median(latencies):.2f} ms, "
+          f"p95 {latencies[int(len(latencies) * 0.95)]:.2f} ms, max {latencies[-1]:.2f} ms")
+    print(f"Top-1 hit rate {top1 / len(queries):.1%}, top-{args.top_k} hit rate {topk / len(queries):.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Memory per worker of the multi-process server (gunicorn.conf.py).
+
+Starts the server with 1, 2, 4... workers, with models preloaded in the
+master (shared copy-on-write) and, for comparison, loaded by every worker
+(PRELOAD_MODELS=false). Once it is ready and has served some
+transcriptions, it reads /proc/<pid>/smaps_rollup for the master and each
+worker:
+
+- RSS: resident pages, shared ones counted in full in every process
+- PSS: resident pages with shared ones divided among their sharers
+- USS: pages only this process uses (what killing it would free)
+
+Total PSS is the real footprint of the whole server. Linux only. The ASR
+engine and model come from the environment as for the server, e.g.:
+
+Usage (from backend/):
+    ASR_ENGINE=whisper WHISPER_MODEL=small python -m benchmarks.bench_worker_memory --workers 1 2 4
+"""
+import argparse
+import io
+import math
+import os
+import signal
+import socket
+import statistics
+import struct
+import subprocess
+import sys
+import time
+import wave
+
+import httpx
+
+
+def smaps_mb(pid):
+    """RSS, PSS and USS of a process in MB."""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as rollup:
+        for line in rollup:
+            parts = line.split()
+            if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                fields[parts[0][:-1]] = int(parts[1]) / 1024
+    return {
+        "rss": fields.get("Rss", 0.0),
+        "pss": fields.get("Pss", 0.0),
+        "uss": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0),
+    }
+
+
+def children(pid):
+    found = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as stat:
+                # The command name may contain spaces; the parent pid follows the closing parenthesis
+                parent = int(stat.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if parent == pid:
+            found.append(int(entry))
+    return sorted(found)
+
+
+def tone_wav(seconds=2.0, rate=16000):
+    """A 440 Hz tone, loud enough to pass voice activity detection."""
+    frames = b"".join(
+        struct.pack("<h", int(8000 * math.sin(2 * math.pi * 440 * index / rate)))
+        for index in range(int(seconds * rate))
+    )
+    out = io.BytesIO()
+    with wave.open(out, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(frames)
+    return out.getvalue()
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def measure(workers, preload, requests, startup_timeout):
+    port = free_port()
+    env = dict(
+        os.environ,
+        WEB_CONCURRENCY=str(workers),
+        BIND=f"127.0.0.1:{port}",
+        PRELOAD_MODELS="true" if preload else "false",
+        # Mishkal process pools would add processes of their own
+        TAJWEED_WORKERS="0",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"],
+        env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout
+        with httpx.Client(timeout=120) as client:
+            ready = 0
+            # /ready answers from whichever worker accepts; ask until enough of them say so
+            while ready < workers * 3:
+                if time.monotonic() > deadline or server.poll() is not None:
+                    raise RuntimeError(f"server with {workers} worker(s) did not become ready")
+                try:
+                    ready += client.get(f"{base}/ready").status_code == 200
+                except httpx.HTTPError:
+                    pass
+                time.sleep(0.2)
+            audio = tone_wav()
+            for _ in range(requests):
+                client.post(f"{base}/transcribe_audio", files={"audio_file": ("tone.wav", audio, "audio/wav")})
+
+        master = smaps_mb(server.pid)
+        per_worker = [smaps_mb(pid) for pid in children(server.pid)]
+    finally:
+        server.send_signal(signal.SIGTERM)
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            server.kill()
+    return master, per_worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--requests", type=int, default=20, help="Transcriptions sent before measuring")
+    parser.add_argument("--startup-timeout", type=float, default=600.0)
+    parser.add_argument("--preload-only", action="store_true", help="Skip the per-worker loading comparison")
+    args = parser.parse_args()
+
+    print(f"Engine {os.getenv('ASR_ENGINE', 'whisper')}, model {os.getenv('WHISPER_MODEL', 'small')}, "
+          f"{os.cpu_count()} CPU(s); MB per process")
+    print(f"{'mode':<10} {'workers':>7} {'master PSS':>10} {'worker RSS':>10} {'worker PSS':>10} "
+          f"{'worker USS':>10} {'total PSS':>10}")
+    modes = [True] if args.preload_only else [True, False]
+    for preload in modes:
+        for workers in args.workers:
+            master, per_worker = measure(workers, preload, args.requests, args.startup_timeout)
+            total = master["pss"] + sum(worker["pss"] for worker in per_worker)
+            print(f"{'preload' if preload else 'per-worker':<10} {len(per_worker):>7} {master['pss']:>10.1f} "
+                  f"{statistics.fmean(worker['rss'] for worker in per_worker):>10.1f} "
+                  f"{statistics.fmean(worker['pss'] for worker in per_worker):>10.1f} "
+                  f"{statistics.fmean(worker['uss'] for worker in per_worker):>10.1f} {total:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Multi-process server: gunicorn with uvicorn workers and shared model memory.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Models are loaded once in the master and inherited by the workers (see
+app.services.server_mode). WEB_CONCURRENCY sets the number of workers and
+WORKER_THREADS the intra-op threads of each (default: cores / workers),
+as does COMPARISON_WORKERS for each worker's batch comparison pool.
+PRELOAD_MODELS=false makes every worker load its own copy, e.g. to
+compare memory with benchmarks.bench_worker_memory.
+"""
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services import server_mode
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn_worker.UvicornWorker"
+# Whisper requests can take a while on CPU; InferencePool enforces its own timeout
+timeout = int(os.getenv("WORKER_TIMEOUT", "180"))
+graceful_timeout = 30
+preload_models = os.getenv("PRELOAD_MODELS", "true").lower() == "true"
+# Import the app in the master so forked workers share its modules
+preload_app = preload_models
+threads_per_worker = server_mode.worker_threads(workers)
+server_mode.limit_process_pools(workers)
+
+if preload_models:
+    server_mode.prepare_master()
+
+
+def when_ready(server):
+    if preload_models:
+        server.log.info("Preloading models before forking %d worker(s)", workers)
+        server_mode.preload()
+
+
+def post_fork(server, worker):
+    server_mode.configure_worker(threads_per_worker)
+    server.log.info("Worker %s: %d intra-op thread(s)", worker.pid, threads_per_worker)
@@ -1,7 +1,11 @@
-import { transcriptionAPI, comparisonAPI } from '../services/api';
+import apiClient, { transcriptionAPI, comparisonAPI, recitationAPI } from '../services/api';
 import axios from 'axios';
 
-jest.mock('axios');
+// api.js creates its client on import, so axios.create is mocked before
+// that; tests stub requests on the exported client
+jest.mock('axios', () => ({
+  create: jest.fn(() => ({ post: jest.fn() })),
+}));
 
 describe('API Services', () => {
   beforeEach(() => {
@@ -95,6 +99,77 @@ describe('API Services', () => {
         comparisonAPI.compareVerse('text1', 'text2')
       ).rejects.toThrow('Failed to compare verse');
     });
+
+    it('should identify the recited verse', async () => {
+      apiClient.post.mockResolvedValue({
+        data: {
+          success: true,
+          candidates: [{ reference: '1:2', score: 0.98, match_percentage: 100.0 }],
+          best: { reference: '1:2', comparison: { match_percentage: 100.0 } },
+        },
+      });
+
+      const result = await comparisonAPI.identifyVerse('الحمد لله رب العالمين', 3);
+
+      expect(apiClient.post).toHaveBeenCalledWith('/identify_verse', {
+        recognized_text: 'الحمد لله رب العالمين',
+        top_k: 3,
+      });
+      expect(result.best.reference).toBe('1:2');
+    });
   });
-});
 
+  describe('openTranscriptionStream', () => {
+    it('should queue audio until open and dispatch server messages', () => {
+      const sockets = [];
+      global.WebSocket = jest.fn().mockImplementation((url) => {
+        const socket = { url, readyState: 0, send: jest.fn(), close: jest.fn() };
+        sockets.push(socket);
+        return socket;
+      });
+      const onPartial = jest.fn();
+      const onFinal = jest.fn();
+
+      const stream = transcriptionAPI.openTranscriptionStream({ onPartial, onFinal });
+      stream.sendAudio('chunk-1');
+
+      const socket = sockets[0];
+      expect(socket.url).toMatch(/^ws.*\/transcribe_audio\/stream$/);
+      expect(socket.send).not.toHaveBeenCalled();
+
+      socket.readyState = 1;
+      socket.onopen();
+      stream.end();
+      expect(socket.send).toHaveBeenNthCalledWith(1, 'chunk-1');
+      expect(socket.send).toHaveBeenNthCalledWith(2, JSON.stringify({ type: 'end' }));
+
+      socket.onmessage({ data: JSON.stringify({ type: 'partial', segment: 0, text: 'بسم' }) });
+      socket.onmessage({ data: JSON.stringify({ type: 'final', text: 'بسم الله' }) });
+      expect(onPartial).toHaveBeenCalledWith(expect.objectContaining({ segment: 0 }));
+      expect(onFinal).toHaveBeenCalledWith(expect.objectContaining({ text: 'بسم الله' }));
+    });
+  });
+
+  describe('recitationAPI', () => {
+    it('should return transcription and comparison in one response', async () => {
+      apiClient.post.mockResolvedValue({
+        data: {
+          success: true,
+          text: 'بِسْمِ اللَّهِ الرَّحْمَٰنِ الرَّحِيمِ',
+          comparison: { match_percentage: 100.0, word_comparisons: [] },
+          timings: { transcribe_ms: 120.5, compare_ms: 0.4, total_ms: 121.2 },
+        },
+      });
+
+      const formData = new FormData();
+      formData.append('audio_file', { uri: 'test.m4a', type: 'audio/m4a' });
+      formData.append('verse_text', 'بِسْمِ اللَّهِ الرَّحْمَٰنِ الرَّحِيمِ');
+
+      const result = await recitationAPI.recite(formData);
+
+      expect(apiClient.post).toHaveBeenCalledWith('/recite', formData, expect.any(Object));
+      expect(result.comparison.match_percentage).toBe(100.0);
+      expect(result.timings.total_ms).toBeDefined();
+    });
+  });
+});
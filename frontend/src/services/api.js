@@ -37,6 +37,52 @@ export const transcriptionAPI = {
       );
     }
   },
+
+  /**
+   * Open a streaming transcription session over WebSocket
+   * Audio chunks must be 16 kHz mono 16-bit PCM (ArrayBuffer)
+   * @param {Object} handlers - onPartial, onFinal and onError callbacks
+   * @returns {Object} Session with sendAudio(chunk), end() and close()
+   */
+  openTranscriptionStream: (handlers = {}) => {
+    const wsUrl = API_BASE_URL.replace(/^http/, 'ws') + '/transcribe_audio/stream';
+    const socket = new WebSocket(wsUrl);
+    socket.binaryType = 'arraybuffer';
+    const pending = [];
+
+    socket.onopen = () => {
+      // Flush chunks recorded before the connection was ready
+      pending.splice(0).forEach((chunk) => socket.send(chunk));
+    };
+    socket.onmessage = (event) => {
+      const message = JSON.parse(event.data);
+      if (message.type === 'partial') {
+        handlers.onPartial?.(message);
+      } else if (message.type === 'final') {
+        handlers.onFinal?.(message);
+      } else if (message.type === 'error') {
+        handlers.onError?.(message);
+      }
+    };
+    socket.onerror = (error) => {
+      console.error('Streaming transcription error:', error);
+      handlers.onError?.({ type: 'error', detail: 'Streaming connection failed' });
+    };
+
+    const send = (data) => {
+      if (socket.readyState === 1) {
+        socket.send(data);
+      } else {
+        pending.push(data);
+      }
+    };
+
+    return {
+      sendAudio: (chunk) => send(chunk),
+      end: () => send(JSON.stringify({ type: 'end' })),
+      close: () => socket.close(),
+    };
+  },
 };
 
 export const comparisonAPI = {
@@ -62,6 +108,51 @@ export const comparisonAPI = {
       );
     }
   },
+
+  /**
+   * Identify which verse was recited from the transcript alone
+   * @param {string} recognizedText - Text recognized from audio
+   * @param {number} topK - Number of candidate verses to return
+   * @returns {Promise<Object>} Candidates with scores and the best match's comparison
+   */
+  identifyVerse: async (recognizedText, topK = 5) => {
+    try {
+      const response = await apiClient.post('/identify_verse', {
+        recognized_text: recognizedText,
+        top_k: topK,
+      });
+      return response.data;
+    } catch (error) {
+      console.error('Identification error:', error);
+      throw new Error(
+        error.response?.data?.detail || 'Failed to identify verse'
+      );
+    }
+  },
+};
+
+export const recitationAPI = {
+  /**
+   * Transcribe a recitation and compare it with a verse in one request
+   * @param {FormData} formData - FormData with audio_file, verse_text and optional verse_reference
+   * @returns {Promise<Object>} Transcription fields plus comparison and per-stage timings
+   */
+  recite: async (formData) => {
+    try {
+      const response = await apiClient.post('/recite', formData, {
+        headers: {
+          'Content-Type': 'multipart/form-data',
+        },
+        timeout: 60000, // Same budget as transcription
+      });
+      return response.data;
+    } catch (error) {
+      console.error('Recitation error:', error);
+      throw new Error(
+        error.response?.data?.detail || 'Failed to check recitation'
+      );
+    }
+  },
 };
 
 export default apiClient;